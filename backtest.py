@@ -0,0 +1,175 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from signal_core import STRATEGY_TICKERS, state_history, strategy_scalars
+
+# --- [백테스트 엔진] ---
+# get_daily_signals_and_report() 와 같은 신호 로직(signal_core: BASE_WEIGHTS, N_BAND 이격도 밴드,
+# SCALAR_MAP, ^TNX 200일 MA 채권 스위칭)을 전체 기간에 대해 벡터 연산으로 계산합니다.
+#
+# 매매 규칙:
+#   t일 종가 기준 목표 비중(스케일러 × 기본 비중)을 t+1일 수익률에 적용
+#   Tactical_Bond 는 t일에 선택된 채권(IEF or TLT)의 t+1일 수익률을 받음
+#   남은 비중은 수익률 0% 현금
+
+TRADING_DAYS = 252
+
+
+def load_price_file(path):
+    """로컬 종가 파일(CSV 또는 Parquet, 날짜 인덱스 × 티커 컬럼)을 읽습니다."""
+    if path.endswith('.parquet'):
+        close_df = pd.read_parquet(path)
+    else:
+        close_df = pd.read_csv(path, index_col=0, parse_dates=True)
+    close_df.index = pd.DatetimeIndex(close_df.index)
+    return close_df.sort_index().ffill()
+
+
+def signal_history(close_df, ma_windows, n_band, scalar_map, rate_ma_window,
+                   bond_mode='synthetic', rising_bond='IEF', falling_bond='TLT', ma_cache=None):
+    """전체 기간의 스케일러 (3, T) 와 금리 상승 여부 (T,) 를 계산합니다 (signal_core 와 같은 로직)."""
+    strategy = {
+        'bond_mode': bond_mode, 'n_band': n_band, 'ma_windows': ma_windows, 'scalar_map': scalar_map,
+        'rate_ma_window': rate_ma_window, 'rising_bond': rising_bond, 'falling_bond': falling_bond,
+    }
+    history = state_history(close_df, strategy, ma_cache)
+    return {
+        'dates': close_df.index,
+        'scalars': strategy_scalars(history['states'], history['is_rising'], strategy),
+        'is_rising': history['is_rising'],
+    }
+
+
+def asset_returns(close_df, tickers=('QQQ', 'GLD', 'IEF', 'TLT')):
+    closes = close_df[list(tickers)].to_numpy(dtype=np.float64).T
+    returns = np.full(closes.shape, np.nan)
+    returns[:, 1:] = closes[:, 1:] / closes[:, :-1] - 1.0
+    return returns
+
+
+def target_weights(scalars, is_rising, base_weights):
+    """(4, T) 실제 보유 비중 (QQQ, GLD, IEF, TLT). scalars (3, ..., T) 처럼 앞쪽 축이 더 있어도 됨."""
+    base = np.array([base_weights[ticker] for ticker in STRATEGY_TICKERS]).reshape((-1,) + (1,) * (np.ndim(scalars) - 1))
+    invested = base * scalars
+    return np.stack([
+        invested[0],
+        invested[1],
+        np.where(is_rising, invested[2], 0.0),
+        np.where(is_rising, 0.0, invested[2]),
+    ])
+
+
+def portfolio_returns(weights, returns):
+    # t일 비중 -> t+1일 수익률 (weights / returns: (4, ..., T))
+    daily = np.zeros(weights.shape[1:])
+    daily[..., 1:] = np.nansum(weights[..., :-1] * returns[..., 1:], axis=0)
+    return daily
+
+
+def performance_metrics(daily_returns, weights, dates):
+    equity = np.cumprod(1.0 + daily_returns)
+    years = (dates[-1] - dates[0]).days / 365.25
+    volatility = daily_returns.std(ddof=1) * np.sqrt(TRADING_DAYS)
+    drawdown = equity / np.maximum.accumulate(equity) - 1.0
+    turnover = np.abs(np.diff(weights, axis=1)).sum(axis=0) / 2.0 # 편도(one-way) 기준
+    return {
+        'sharpe': daily_returns.mean() / daily_returns.std(ddof=1) * np.sqrt(TRADING_DAYS),
+        'cagr': equity[-1] ** (1.0 / years) - 1.0,
+        'mdd': drawdown.min(),
+        'volatility': volatility,
+        'annual_turnover': turnover.sum() / years,
+    }
+
+
+def run_backtest(close_df, base_weights, ma_windows, n_band, scalar_map, rate_ma_window,
+                 bond_mode='synthetic', start=None, end=None, ma_cache=None, returns=None):
+    """전략 1회 백테스트. 반환: metrics, equity(Series), returns(Series), weights(DataFrame)."""
+    history = signal_history(close_df, ma_windows, n_band, scalar_map, rate_ma_window, bond_mode, ma_cache=ma_cache)
+    if returns is None:
+        returns = asset_returns(close_df)
+    return backtest_history(history, base_weights, returns, start, end)
+
+
+def period_mask(dates, start=None, end=None):
+    """[start, end] 구간의 bool 마스크. 구간에 데이터가 없으면 요청 구간과 데이터 구간을 담은 ValueError."""
+    mask = np.ones(len(dates), dtype=bool)
+    if start is not None:
+        mask &= dates >= pd.Timestamp(start)
+    if end is not None:
+        mask &= dates <= pd.Timestamp(end)
+    if not mask.any():
+        available = f"{dates[0]:%Y-%m-%d} ~ {dates[-1]:%Y-%m-%d}" if len(dates) else "없음"
+        raise ValueError(f"요청 구간 {start or '처음'} ~ {end or '끝'} 에 데이터가 없습니다 (데이터: {available})")
+    return mask
+
+
+def backtest_history(history, base_weights, returns, start=None, end=None):
+    """이미 계산한 신호 이력(signal_history)에 기본 비중만 적용합니다. 반환은 run_backtest 와 같음."""
+    weights = target_weights(history['scalars'], history['is_rising'], base_weights)
+    daily = portfolio_returns(weights, returns)
+
+    dates = history['dates']
+    mask = period_mask(dates, start, end)
+    # 구간 첫날은 전날 비중의 수익률이 아닌 시작점(0%)으로 처리
+    daily_in = daily[mask].copy()
+    daily_in[0] = 0.0
+    dates_in = dates[mask]
+
+    return {
+        'metrics': performance_metrics(daily_in, weights[:, mask], dates_in),
+        'equity': pd.Series(np.cumprod(1.0 + daily_in), index=dates_in, name='equity'),
+        'returns': pd.Series(daily_in, index=dates_in, name='returns'),
+        'weights': pd.DataFrame(weights[:, mask].T, index=dates_in, columns=['QQQ', 'GLD', 'IEF', 'TLT']),
+    }
+
+
+def format_metrics(metrics):
+    lines = [
+        "| 지표 | 성과 |",
+        "| :--- | :--- |",
+        f"| **샤프 지수 (Sharpe Ratio)** | **{metrics['sharpe']:.4f}** |",
+        f"| **연평균 수익률 (CAGR)** | **{metrics['cagr']:.2%}** |",
+        f"| **최대 낙폭 (MDD)** | **{metrics['mdd']:.2%}** |",
+        f"| **연평균 변동성 (Volatility)** | {metrics['volatility']:.2%} |",
+        f"| 연간 회전율 (Turnover) | {metrics['annual_turnover']:.2f} |",
+    ]
+    return "\n".join(lines)
+
+
+def _strategy_params(bond_mode):
+    # 일일 신호 스크립트의 파라미터를 그대로 사용
+    if bond_mode == 'synthetic':
+        import daily_signal_generator as strategy
+    else:
+        import daily_signal_generator_채권실물자산 as strategy
+    return {
+        'base_weights': strategy.BASE_WEIGHTS,
+        'ma_windows': strategy.MA_WINDOWS,
+        'n_band': strategy.N_BAND,
+        'scalar_map': strategy.SCALAR_MAP,
+        'rate_ma_window': strategy.RATE_MA_WINDOW,
+    }
+
+
+# --- [메인 실행] ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adaptive-Hysteresis-TAA 백테스트 (오프라인)")
+    parser.add_argument('--prices', default=os.environ.get('TAA_PRICE_FILE', 'prices.csv'),
+                        help="종가 파일 (CSV/Parquet, 컬럼: QQQ, GLD, IEF, TLT, ^TNX)")
+    parser.add_argument('--mode', choices=['synthetic', 'real'], default='synthetic')
+    parser.add_argument('--start', default='2005-09-06')
+    parser.add_argument('--end', default='2024-12-31')
+    args = parser.parse_args()
+
+    try:
+        close_df = load_price_file(args.prices)
+        result = run_backtest(close_df, bond_mode=args.mode, start=args.start, end=args.end, **_strategy_params(args.mode))
+        print(f"백테스트 ({args.mode}) {args.start} ~ {args.end}")
+        print(format_metrics(result['metrics']))
+    except Exception as e:
+        print(f"오류가 발생했습니다: {e}", file=sys.stderr)
+        sys.exit(1)
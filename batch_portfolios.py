@@ -0,0 +1,166 @@
+import argparse
+import hashlib
+import json
+import sys
+
+import numpy as np
+
+from flip_triggers import flip_triggers
+from hysteresis_engine import hysteresis_states
+from signal_core import (
+    STRATEGY_TICKERS, build_report, cached_rolling_means, load_market_data, needs_rebalance, signal_series,
+    strategy_scalars, strategy_tickers,
+)
+from state_snapshot import build_snapshot
+
+# --- [다중 포트폴리오 배치 실행] ---
+# 여러 구독 계좌(BASE_WEIGHTS / N_BAND / SCALAR_MAP 등이 서로 다른 설정)를 한 번에 처리합니다.
+# 이격도 상태는 서로 다른 신호 정의(시리즈, 윈도우, 밴드, 활성 구간, 시작 위치)마다 한 번만
+# 계산하고, 각 포트폴리오는 공유된 상태로부터 목표 비중/현금/리밸런싱 여부만 계산합니다.
+# 따라서 비용은 구독자 수가 아니라 서로 다른 신호 정의의 수에 비례합니다.
+#
+# 설정 파일 예시 (JSON 리스트, 생략한 키는 daily_signal_generator.py 의 값 사용, name 생략 시 portfolio_<순서>):
+#   [{"name": "account_a", "base_weights": {"QQQ": 0.5, "GLD": 0.2, "Tactical_Bond": 0.3}},
+#    {"name": "account_b", "bond_mode": "real", "n_band": 0.02}]
+
+
+def portfolio_strategy(config, defaults, index=0):
+    strategy = dict(defaults)
+    strategy.update(config)
+    # 이름이 없으면 기본 전략 이름(스냅샷 / 저널 파일명)을 물려받지 않도록 설정 순서로 이름을 붙임
+    strategy['name'] = config.get('name', f"portfolio_{index}")
+    strategy['title'] = config.get('title', f"Adaptive-Hysteresis-TAA ({strategy['name']})")
+    strategy['scalar_map'] = {int(k): float(v) for k, v in strategy['scalar_map'].items()}
+    return strategy
+
+
+def _active_digest(row):
+    if row is None or row.all():
+        return None
+    return hashlib.sha1(np.packbits(row).tobytes()).hexdigest()
+
+
+def shared_states(all_prices_df, strategies):
+    """포트폴리오별 (S, W, T) 상태를 서로 다른 신호 정의당 한 번씩만 계산해 반환합니다."""
+    ma_cache = {}
+    definitions = {} # key -> (price, ma, active, start_index)
+    layouts = []
+
+    for strategy in strategies:
+        series = signal_series(all_prices_df, strategy, ma_cache)
+        start_index = max(strategy['ma_windows']) - 1
+        ma = cached_rolling_means(series['prices'], series['cache_keys'], strategy['ma_windows'], ma_cache)
+        layout = []
+        for s_idx, cache_key in enumerate(series['cache_keys']):
+            active = None if series['active'] is None else series['active'][s_idx]
+            digest = _active_digest(active)
+            row = []
+            for w_idx, window in enumerate(strategy['ma_windows']):
+                key = (cache_key, window, strategy['n_band'], digest, start_index)
+                if key not in definitions:
+                    definitions[key] = (series['prices'][s_idx], ma[s_idx, w_idx], active, start_index)
+                row.append(key)
+            layout.append(row)
+        layouts.append((series, layout))
+
+    # 시작 위치별로 모아서 이격도 엔진을 한 번씩 호출
+    states_by_key = {}
+    by_start = {}
+    for key, definition in definitions.items():
+        by_start.setdefault(definition[3], []).append(key)
+    for start_index, keys in by_start.items():
+        prices = np.stack([definitions[key][0] for key in keys])
+        ma = np.stack([definitions[key][1] for key in keys])[:, None, :]
+        active = np.stack([
+            np.ones(prices.shape[1], dtype=bool) if definitions[key][2] is None else definitions[key][2]
+            for key in keys
+        ])
+        n_band = np.array([key[2] for key in keys])[:, None, None]
+        states = hysteresis_states(prices, ma * (1.0 + n_band), ma * (1.0 - n_band), start_index, active=active)
+        for i, key in enumerate(keys):
+            states_by_key[key] = states[i, 0]
+
+    results = []
+    for strategy, (series, layout) in zip(strategies, layouts):
+        states = np.stack([[states_by_key[key] for key in row] for row in layout])
+        ma_last = np.array([[ma_cache[(key[0], key[1])][-1] for key in row] for row in layout])
+        snapshot = build_snapshot(
+            None, all_prices_df.index, series['prices'], series['rate_prices'], states, series['is_rising'],
+            strategy['ma_windows'], strategy['rate_ma_window'],
+            {ticker: all_prices_df[ticker].to_numpy(dtype=np.float64) for ticker in strategy_tickers(strategy)},
+        )
+        results.append({
+            'names': series['names'],
+            'dates': list(all_prices_df.index),
+            'prices': series['prices'],
+            'ma_last': ma_last,
+            'states': states,
+            'is_rising': series['is_rising'],
+            'triggers': None if snapshot is None else flip_triggers(snapshot, strategy),
+        })
+    return results, len(definitions)
+
+
+def portfolio_summary(signal, strategy):
+    scalars = strategy_scalars(signal['states'][:, :, -2:], signal['is_rising'][-2:], strategy)
+    base = np.array([strategy['base_weights'][ticker] for ticker in STRATEGY_TICKERS])
+    today = base * scalars[:, -1]
+    yesterday = base * scalars[:, -2]
+    current_bond = strategy['rising_bond'] if signal['is_rising'][-1] else strategy['falling_bond']
+    return {
+        'name': strategy['name'],
+        'date': signal['dates'][-1].strftime('%Y-%m-%d'),
+        'active_bond': current_bond,
+        'weights': {ticker: float(w) for ticker, w in zip(STRATEGY_TICKERS, today)},
+        'cash': float(1.0 - today.sum()),
+        'yesterday_weights': {ticker: float(w) for ticker, w in zip(STRATEGY_TICKERS, yesterday)},
+        'yesterday_cash': float(1.0 - yesterday.sum()),
+        'rebalance': needs_rebalance(scalars),
+        # 내일 종가 기준 전환가 (시리즈_윈도우: 가격) / ^TNX 채권 전환 금리
+        'flip_triggers': None if signal['triggers'] is None else {
+            f"{name}_{window}": float(signal['triggers']['trigger'][s_idx, w_idx])
+            for s_idx, name in enumerate(signal['names'])
+            for w_idx, window in enumerate(strategy['ma_windows'])
+        },
+        'rate_switch': None if signal['triggers'] is None else signal['triggers']['rate_switch'],
+    }
+
+
+def run_batch(configs, period="400d", defaults=None, provider=None):
+    if defaults is None:
+        import daily_signal_generator
+        defaults = daily_signal_generator.STRATEGY
+    strategies = [portfolio_strategy(config, defaults, i) for i, config in enumerate(configs)]
+
+    tickers = []
+    for strategy in strategies:
+        tickers += [ticker for ticker in strategy_tickers(strategy) if ticker not in tickers]
+    all_prices_df = load_market_data(tickers, period, provider)
+
+    signals, n_definitions = shared_states(all_prices_df, strategies)
+    return strategies, signals, n_definitions
+
+
+# --- [메인 실행] ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="다중 포트폴리오 신호 배치 실행")
+    parser.add_argument('config', help="포트폴리오 설정 JSON 파일 (리스트)")
+    parser.add_argument('--format', choices=['json', 'report'], default='json')
+    args = parser.parse_args()
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            configs = json.load(f)
+
+        strategies, signals, n_definitions = run_batch(configs)
+        print(f"... 포트폴리오 {len(strategies)}개 / 신호 정의 {n_definitions}개 ...", file=sys.stderr)
+
+        if args.format == 'json':
+            summaries = [portfolio_summary(signal, strategy) for signal, strategy in zip(signals, strategies)]
+            print(json.dumps(summaries, ensure_ascii=False, indent=2))
+        else:
+            print("\n\n".join(build_report(signal, strategy) for signal, strategy in zip(signals, strategies)))
+
+    except Exception as e:
+        print(f"오류가 발생했습니다: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,344 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import rolling_stats
+from hysteresis_engine import hysteresis_states
+from signal_core import (
+    RATE_TICKER, STRATEGY_TICKERS, build_report, compute_signal, signal_series, strategy_scalars,
+)
+
+# --- [오프라인 벤치마크] ---
+# 합성 랜덤워크 가격(네트워크 없음)으로 단계별 소요 시간을 측정합니다.
+#   prepare    : ffill + 금리 MA + Tactical_Bond 시리즈 구성
+#   rolling_ma : 전체 티커 × MA_WINDOWS 이동평균
+#   hysteresis : 밴드 + 이격도 상태
+#   report     : 전략 신호 계산 + 텔레그램 리포트 생성
+#   legacy_loop: 원래 get_daily_signals_and_report() 의 일별 반복문 (비교용)
+#
+# 동등성 검사:
+#   * legacy_loop 의 오늘/어제 MA 상태, 스케일러, 비중 == signal_core 결과
+#   * hysteresis_states 전체 이력 == 순수 파이썬 기준 반복문 (큰 크기는 일부 티커만 표본 검사)
+#
+# 결과는 커밋 해시/버전과 함께 JSON 으로 저장되며, --compare 로 이전 결과와 비교할 수 있습니다.
+
+SIZES = {
+    '400d_x5': (400, 5),
+    '10y_x50': (2520, 50),
+    '20y_x200': (5040, 200),
+    '50y_x1000': (12600, 1000),
+}
+FIXTURE_END = '2024-12-31' # 커밋 간 비교를 위해 고정
+REFERENCE_MAX_CELLS = 2_000_000 # 기준 반복문 검사 상한 (티커 × 윈도우 × 봉)
+
+
+def make_fixture(n_days, n_tickers, seed=0, holiday_rate=0.005):
+    """전략 티커(QQQ, GLD, IEF, TLT, ^TNX) + 추가 티커의 랜덤워크 종가 DataFrame."""
+    rng = np.random.default_rng(seed)
+    n_assets = max(n_tickers - 1, 4)
+    log_returns = rng.normal(0.0003, 0.012, size=(n_days, n_assets))
+    prices = 100.0 * np.exp(np.cumsum(log_returns, axis=0))
+    rates = np.clip(3.0 + np.cumsum(rng.normal(0.0, 0.05, size=n_days)), 0.1, None)
+
+    columns = ['QQQ', 'GLD', 'IEF', 'TLT'] + [f"SYN{i:04d}" for i in range(n_assets - 4)]
+    close_df = pd.DataFrame(prices, columns=columns,
+                            index=pd.bdate_range(end=FIXTURE_END, periods=n_days))
+    close_df.insert(4, RATE_TICKER, rates)
+
+    # 휴일 등 빈 값 (첫 행 제외) -> ffill 대상
+    holes = rng.random(close_df.shape) < holiday_rate
+    holes[0] = False
+    return close_df.mask(holes)
+
+
+def legacy_signal(all_prices_df, strategy):
+    """원래 스크립트의 일별 반복문 (동등성 검사 기준). 오늘/어제 상태와 스케일러를 반환합니다."""
+    MA_WINDOWS = strategy['ma_windows']
+    N_BAND = strategy['n_band']
+    BOND_RISING_RATE = strategy['rising_bond']
+    BOND_FALLING_RATE = strategy['falling_bond']
+    core_tickers = ['QQQ', 'GLD']
+    is_synthetic = strategy['bond_mode'] == 'synthetic'
+
+    rate_prices = all_prices_df[RATE_TICKER]
+    rate_ma = rate_prices.rolling(window=strategy['rate_ma_window']).mean()
+    is_rising_rates = (rate_prices > rate_ma)
+
+    if is_synthetic:
+        bond_prices = pd.Series(
+            np.where(is_rising_rates, all_prices_df[BOND_RISING_RATE], all_prices_df[BOND_FALLING_RATE]),
+            index=all_prices_df.index,
+        )
+        bond_prices.name = 'Tactical_Bond'
+        analysis_tickers = ['QQQ', 'GLD', 'Tactical_Bond']
+        prices_for_ma = pd.concat([all_prices_df[['QQQ', 'GLD']], bond_prices], axis=1)
+    else:
+        analysis_tickers = ['QQQ', 'GLD', BOND_RISING_RATE, BOND_FALLING_RATE]
+        prices_for_ma = all_prices_df[analysis_tickers]
+
+    ma_lines = {}
+    upper_bands = {}
+    lower_bands = {}
+    for ticker in analysis_tickers:
+        for window in MA_WINDOWS:
+            ma_key = f"{ticker}_{window}"
+            ma_lines[ma_key] = prices_for_ma[ticker].rolling(window=window).mean()
+            upper_bands[ma_key] = ma_lines[ma_key] * (1.0 + N_BAND)
+            lower_bands[ma_key] = ma_lines[ma_key] * (1.0 - N_BAND)
+
+    yesterday_ma_states = {f"{ticker}_{window}": 0.0 for ticker in analysis_tickers for window in MA_WINDOWS}
+    today_scalars = pd.Series(0.0, index=STRATEGY_TICKERS)
+    yesterday_scalars = pd.Series(0.0, index=STRATEGY_TICKERS)
+    today_ma_states_dict = yesterday_ma_states.copy()
+    yesterday_ma_states_dict = yesterday_ma_states.copy()
+
+    def next_state(ma_key, ticker, i):
+        yesterday_state = yesterday_ma_states[ma_key]
+        price = prices_for_ma[ticker].iloc[i]
+        upper = upper_bands[ma_key].iloc[i]
+        lower = lower_bands[ma_key].iloc[i]
+        if pd.isna(upper): return 0.0
+        elif yesterday_state == 1.0: return 1.0 if price >= lower else 0.0
+        else: return 1.0 if price > upper else 0.0
+
+    start_index = max(MA_WINDOWS) - 1
+    for i in range(start_index, len(prices_for_ma)):
+        today_scores = pd.Series(0, index=STRATEGY_TICKERS)
+        current_ma_states = {}
+
+        for ticker in (STRATEGY_TICKERS if is_synthetic else core_tickers):
+            score = 0
+            for window in MA_WINDOWS:
+                ma_key = f"{ticker}_{window}"
+                current_ma_states[ma_key] = next_state(ma_key, ticker, i)
+                score += current_ma_states[ma_key]
+            today_scores[ticker] = score
+
+        if not is_synthetic:
+            is_rising = is_rising_rates.iloc[i]
+            bond_ticker_to_check = BOND_RISING_RATE if is_rising else BOND_FALLING_RATE
+            bond_score = 0
+            for window in MA_WINDOWS:
+                ma_key = f"{bond_ticker_to_check}_{window}"
+                current_ma_states[ma_key] = next_state(ma_key, bond_ticker_to_check, i)
+                bond_score += current_ma_states[ma_key]
+            today_scores['Tactical_Bond'] = bond_score
+
+            other_bond_ticker = BOND_FALLING_RATE if is_rising else BOND_RISING_RATE
+            for window in MA_WINDOWS:
+                ma_key = f"{other_bond_ticker}_{window}"
+                current_ma_states[ma_key] = yesterday_ma_states[ma_key]
+
+        if i == len(prices_for_ma) - 2:
+            yesterday_scalars = today_scores.map(strategy['scalar_map'])
+            yesterday_ma_states_dict = current_ma_states
+        if i == len(prices_for_ma) - 1:
+            today_scalars = today_scores.map(strategy['scalar_map'])
+            today_ma_states_dict = current_ma_states
+
+        yesterday_ma_states = current_ma_states
+
+    return {
+        'today_states': today_ma_states_dict,
+        'yesterday_states': yesterday_ma_states_dict,
+        'today_scalars': today_scalars.to_numpy(dtype=np.float64),
+        'yesterday_scalars': yesterday_scalars.to_numpy(dtype=np.float64),
+    }
+
+
+def reference_states(prices, upper, lower, start_index):
+    """(N, W, T) 이격도 상태를 봉 단위 순수 파이썬 반복문으로 계산 (원래 규칙 그대로)."""
+    n, w, t = upper.shape
+    states = np.zeros((n, w, t))
+    for s in range(n):
+        for k in range(w):
+            state = 0.0
+            for i in range(start_index, t):
+                if np.isnan(upper[s, k, i]): state = 0.0
+                elif state == 1.0: state = 1.0 if prices[s, i] >= lower[s, k, i] else 0.0
+                else: state = 1.0 if prices[s, i] > upper[s, k, i] else 0.0
+                states[s, k, i] = state
+    return states
+
+
+def check_legacy(close_df, strategy):
+    """원래 반복문 vs signal_core: 오늘/어제 MA 상태, 스케일러, 비중이 같은지 확인."""
+    legacy = legacy_signal(close_df, strategy)
+    signal = compute_signal(close_df, strategy, use_snapshot=False)
+    scalars = strategy_scalars(signal['states'][:, :, -2:], signal['is_rising'][-2:], strategy)
+    base = np.array([strategy['base_weights'][ticker] for ticker in STRATEGY_TICKERS])
+
+    mismatches = []
+    for day, col in (('today', -1), ('yesterday', -2)):
+        for t_idx, name in enumerate(signal['names']):
+            for w_idx, window in enumerate(strategy['ma_windows']):
+                ma_key = f"{name}_{window}"
+                if legacy[f'{day}_states'][ma_key] != signal['states'][t_idx, w_idx, col]:
+                    mismatches.append(f"{day} state {ma_key}")
+        if not np.array_equal(legacy[f'{day}_scalars'], scalars[:, col]):
+            mismatches.append(f"{day} scalars")
+        if not np.array_equal(base * legacy[f'{day}_scalars'], base * scalars[:, col]):
+            mismatches.append(f"{day} weights")
+    return mismatches
+
+
+def check_engine(prices, upper, lower, start_index, states, max_cells=REFERENCE_MAX_CELLS):
+    """hysteresis_states 전체 이력 vs 기준 반복문. 큰 입력은 앞/뒤/중간 티커만 표본 검사."""
+    n, w, t = upper.shape
+    rows = np.arange(n)
+    if n * w * t > max_cells:
+        n_rows = max(1, max_cells // (w * t))
+        rows = np.unique(np.linspace(0, n - 1, n_rows).astype(int))
+    expected = reference_states(prices[rows], upper[rows], lower[rows], start_index)
+    diff = np.argwhere(expected[:, :, start_index:] != states[rows][:, :, start_index:])
+    return len(rows), [f"row {rows[r]} window {k} bar {i + start_index}" for r, k, i in diff[:10]]
+
+
+def _timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, timings
+
+
+def run_size(label, n_days, n_tickers, strategy, seed=0, repeat=3, legacy_max_days=3000):
+    raw_df = make_fixture(n_days, n_tickers, seed)
+    ma_windows = strategy['ma_windows']
+    start_index = max(ma_windows) - 1
+    timings = {}
+
+    def prepare():
+        close_df = raw_df.ffill()
+        series = signal_series(close_df, strategy)
+        assets = close_df.drop(columns=[RATE_TICKER]).to_numpy(dtype=np.float64).T
+        return close_df, series, assets
+
+    (close_df, series, assets), timings['prepare'] = _timed(prepare, repeat)
+    # 전략 시리즈(QQQ, GLD, Tactical_Bond 등) + 나머지 합성 티커
+    all_prices = np.concatenate([series['prices'], assets[4:]])
+
+    ma, timings['rolling_ma'] = _timed(lambda: rolling_stats.rolling_means(all_prices, ma_windows), repeat)
+
+    def hysteresis():
+        upper, lower = rolling_stats.band_arrays(ma, strategy['n_band'])
+        return upper, lower, hysteresis_states(all_prices, upper, lower, start_index)
+
+    (upper, lower, states), timings['hysteresis'] = _timed(hysteresis, repeat)
+
+    strategy_df = close_df[['QQQ', 'GLD', strategy['rising_bond'], strategy['falling_bond'], RATE_TICKER]]
+    _, timings['report'] = _timed(
+        lambda: build_report(compute_signal(strategy_df, strategy, use_snapshot=False), strategy), repeat
+    )
+
+    equivalence = {}
+    if n_days <= legacy_max_days:
+        _, timings['legacy_loop'] = _timed(lambda: legacy_signal(strategy_df, strategy), 1)
+        equivalence['legacy'] = check_legacy(strategy_df, strategy)
+    checked_rows, equivalence['engine'] = check_engine(all_prices, upper, lower, start_index, states)
+
+    return {
+        'size': label,
+        'days': n_days,
+        'tickers': n_tickers,
+        'timings': {
+            stage: {'min': min(values), 'median': float(np.median(values)), 'repeat': len(values)}
+            for stage, values in timings.items()
+        },
+        'equivalence': equivalence,
+        'engine_rows_checked': checked_rows,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_benchmark(sizes, strategy, seed=0, repeat=3, legacy_max_days=3000):
+    return {
+        'commit': _git_commit(),
+        'strategy': strategy['name'],
+        'seed': seed,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'results': [
+            run_size(label, *SIZES[label], strategy, seed, repeat, legacy_max_days) for label in sizes
+        ],
+    }
+
+
+def format_results(bench, baseline=None):
+    previous = {}
+    if baseline is not None:
+        for result in baseline['results']:
+            for stage, timing in result['timings'].items():
+                previous[(result['size'], stage)] = timing['min']
+
+    header = f"{bench['strategy']} @ {bench['commit']}"
+    if baseline is not None:
+        header += f" (vs {baseline['commit']})"
+    lines = [header]
+    for result in bench['results']:
+        failed = [m for checks in result['equivalence'].values() for m in checks]
+        lines.append(f"[{result['size']}] {result['days']}일 × {result['tickers']}개 "
+                     f"동등성: {'OK' if not failed else f'FAIL {len(failed)}건'}")
+        for stage, timing in result['timings'].items():
+            line = f"  {stage:<12} {timing['min'] * 1000:10.2f} ms"
+            if (result['size'], stage) in previous:
+                line += f"  (x{previous[(result['size'], stage)] / timing['min']:.2f})"
+            lines.append(line)
+        for message in failed[:10]:
+            lines.append(f"  ! {message}")
+    return "\n".join(lines)
+
+
+# --- [메인 실행] ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adaptive-Hysteresis-TAA 오프라인 벤치마크")
+    parser.add_argument('--sizes', default=','.join(SIZES), help=f"쉼표 구분 ({', '.join(SIZES)})")
+    parser.add_argument('--mode', choices=['synthetic', 'real'], default='synthetic')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--legacy-max-days', type=int, default=3000, help="원래 반복문을 실행할 최대 봉 수")
+    parser.add_argument('--out', default=None, help="결과 JSON 파일 (기본: .benchmarks/<commit>.json)")
+    parser.add_argument('--compare', default=None, help="비교할 이전 결과 JSON 파일")
+    args = parser.parse_args()
+
+    if args.mode == 'synthetic':
+        from daily_signal_generator import STRATEGY
+    else:
+        from daily_signal_generator_채권실물자산 import STRATEGY
+
+    bench = run_benchmark([s for s in args.sizes.split(',') if s], STRATEGY, args.seed, args.repeat,
+                          args.legacy_max_days)
+
+    out_path = args.out or os.path.join('.benchmarks', f"{bench['commit']}_{args.mode}.json")
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(bench, f, ensure_ascii=False, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print(format_results(bench, baseline))
+    print(f"결과: {out_path}")
+
+    if any(m for result in bench['results'] for checks in result['equivalence'].values() for m in checks):
+        sys.exit(1)
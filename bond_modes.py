@@ -0,0 +1,40 @@
+import numpy as np
+
+# --- [Tactical_Bond 선택 방식 (플러그인)] ---
+# 각 모드는 두 함수를 제공합니다.
+#   inputs(closes, is_rising, rising_bond, falling_bond)
+#       -> (MA 를 계산할 시리즈 이름, 캐시 키, 가격 (S, T), active (S, T) 또는 None)
+#   scores(scores (S, T), is_rising (T,))
+#       -> 전략 자산(QQQ, GLD, Tactical_Bond) 점수 (3, T)
+# 새 변형은 BOND_MODES 에 등록하면 signal_core / backtest / 스냅샷에서 그대로 사용됩니다.
+
+
+def synthetic_inputs(closes, is_rising, rising_bond, falling_bond):
+    # IEF/TLT 를 금리 추세에 따라 이어붙인 가상 가격의 MA 를 사용
+    bond = np.where(is_rising, closes[rising_bond], closes[falling_bond])
+    names = ['QQQ', 'GLD', 'Tactical_Bond']
+    cache_keys = ['QQQ', 'GLD', f"Tactical_Bond:{rising_bond}/{falling_bond}"]
+    return names, cache_keys, np.stack([closes['QQQ'], closes['GLD'], bond]), None
+
+
+def synthetic_scores(scores, is_rising):
+    return scores
+
+
+def real_inputs(closes, is_rising, rising_bond, falling_bond):
+    # IEF/TLT 각자의 MA 를 사용하고, 사용되지 않는 채권은 그날 상태를 유지
+    names = ['QQQ', 'GLD', rising_bond, falling_bond]
+    always_on = np.ones_like(is_rising)
+    active = np.stack([always_on, always_on, is_rising, ~is_rising])
+    return names, list(names), np.stack([closes[name] for name in names]), active
+
+
+def real_scores(scores, is_rising):
+    # Tactical_Bond 점수 = 그날의 대표 선수(IEF or TLT) 점수
+    return np.stack([scores[0], scores[1], np.where(is_rising, scores[2], scores[3])])
+
+
+BOND_MODES = {
+    'synthetic': {'inputs': synthetic_inputs, 'scores': synthetic_scores},
+    'real': {'inputs': real_inputs, 'scores': real_scores},
+}
@@ -0,0 +1,121 @@
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+import pandas as pd
+
+# --- [Yahoo chart API 스텁 서버 (오프라인 시험용)] ---
+# market_data.YahooChartProvider 를 네트워크 없이 시험하기 위한 로컬 HTTP 서버입니다.
+# GET /v8/finance/chart/<ticker>?period1=..&period2=.. 에 대해 종가 DataFrame 의 구간을
+# Yahoo 와 같은 JSON 형식으로 응답합니다. 데이터는 TAA_DATA_DIR 형식의 디렉터리(LocalFileProvider)
+# 또는 합성 랜덤워크(benchmark.make_fixture) 입니다.
+#
+# 장애 주입 (동시 다운로드 / 재시도 / 캐시 대체 확인용):
+#   fail  : 항상 HTTP 500 을 내는 티커
+#   delay : 응답 전 대기 (초)
+#   flaky : 요청마다 이 확률로 HTTP 500
+#
+#   TAA_CHART_URL=http://127.0.0.1:8765 python daily_signal_generator.py
+
+GMT_OFFSET = -14400 # 뉴욕 (일광 절약 시간)
+OPEN_SECONDS = 13 * 3600 + 30 * 60 # 09:30 뉴욕 = 13:30 UTC
+
+
+def chart_payload(series, period1, period2):
+    """종가 Series 의 [period1, period2) 구간을 chart API 응답 dict 로 만듭니다."""
+    series = series.dropna()
+    seconds = series.index.values.astype('datetime64[s]').astype(np.int64) + OPEN_SECONDS
+    keep = (seconds + 86400 > period1) & (seconds < period2)
+    close = [round(float(value), 6) for value in series.to_numpy()[keep]]
+    return {'chart': {'result': [{
+        'meta': {'symbol': series.name, 'currency': 'USD', 'gmtoffset': GMT_OFFSET, 'dataGranularity': '1d'},
+        'timestamp': seconds[keep].tolist(),
+        'indicators': {'quote': [{'close': close}], 'adjclose': [{'adjclose': close}]},
+    }], 'error': None}}
+
+
+def make_server(close_df, host='127.0.0.1', port=0, fail=(), delay=0.0, flaky=0.0, seed=0):
+    """스텁 서버를 만듭니다 (port=0: 빈 포트). server.serve_forever() 로 실행, server.requests 에 요청 기록."""
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    class ChartHandler(BaseHTTPRequestHandler):
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass # 클라이언트가 timeout 으로 먼저 끊은 경우
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            prefix = '/v8/finance/chart/'
+            ticker = unquote(url.path[len(prefix):]) if url.path.startswith(prefix) else None
+            with lock:
+                server.requests.append((time.monotonic(), ticker))
+                unlucky = rng.random() < flaky
+            if delay:
+                time.sleep(delay)
+
+            if ticker is None or ticker not in close_df.columns:
+                return self._send(404, {'chart': {'result': None, 'error': {
+                    'code': 'Not Found', 'description': f"No data found, symbol may be delisted: {ticker}"}}})
+            if ticker in fail or unlucky:
+                return self._send(500, {'chart': {'result': None, 'error': {
+                    'code': 'Internal Server Error', 'description': 'stub failure'}}})
+
+            query = parse_qs(url.query)
+            period1 = int(query.get('period1', ['0'])[0])
+            period2 = int(query.get('period2', [str(2 ** 40)])[0])
+            self._send(200, chart_payload(close_df[ticker].rename(ticker), period1, period2))
+
+        def log_message(self, format, *args):
+            pass # 요청 로그는 server.requests 로 대신
+
+    server = ThreadingHTTPServer((host, port), ChartHandler)
+    server.daemon_threads = True
+    server.requests = []
+    return server
+
+
+# --- [메인 실행] ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yahoo chart API 스텁 서버 (오프라인 시험용)")
+    parser.add_argument('--data-dir', help="티커별 종가 파일 디렉터리 (없으면 합성 랜덤워크)")
+    parser.add_argument('--days', type=int, default=600, help="합성 데이터 거래일 수")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fail', default='', help="항상 실패할 티커 (쉼표 구분)")
+    parser.add_argument('--delay', type=float, default=0.0, help="응답 지연 (초)")
+    parser.add_argument('--flaky', type=float, default=0.0, help="요청당 실패 확률")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.data_dir:
+        from market_data import LocalFileProvider
+        from signal_core import RATE_TICKER
+        tickers = ['QQQ', 'GLD', 'IEF', 'TLT', RATE_TICKER]
+        close_df = pd.DataFrame(LocalFileProvider(args.data_dir).fetch(tickers))
+    else:
+        from benchmark import make_fixture
+        close_df = make_fixture(args.days, 5, args.seed)
+        close_df.index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=args.days)
+
+    server = make_server(close_df, args.host, args.port, [t for t in args.fail.split(',') if t],
+                         args.delay, args.flaky, args.seed)
+    print(f"... 스텁 서버: http://{args.host}:{server.server_port} (티커 {len(close_df.columns)}개, "
+          f"{close_df.index[0].date()} ~ {close_df.index[-1].date()}) ...", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
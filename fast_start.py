@@ -0,0 +1,106 @@
+import os
+import time
+
+import numpy as np
+
+from flip_triggers import flip_triggers
+from metrics import stage
+from price_cache import CACHE_DIR, read_cached_arrays
+from report_render import render_telegram
+from signal_core import build_result, strategy_fingerprint, strategy_tickers
+from signal_journal import record_signal
+from state_snapshot import (
+    advance_snapshot_arrays, load_snapshot, resume_position_arrays, save_snapshot, snapshot_path,
+)
+
+# --- [빠른 시작 경로 (NumPy 전용)] ---
+# 가격 캐시(.price_cache)와 상태 스냅샷이 이미 최신이면 pandas / yfinance 를 불러오지 않고
+# 캐시 배열 + 스냅샷만으로 리포트를 만듭니다. 조건이 맞지 않으면 None 을 반환하며,
+# 이때 호출 측은 기존 경로(공급자 다운로드 + 전체/증분 계산)로 진행합니다.
+#
+# "최신" 판단: 모든 티커의 캐시 마지막 날짜 >= 가장 최근 미국 장 마감일
+#   (UTC 21:00 이후면 오늘, 아니면 직전 평일. 휴장일에는 최신이 아닌 것으로 보고 다운로드)
+# TAA_FAST_START=0 으로 끌 수 있습니다.
+
+MARKET_CLOSE_UTC_HOUR = 21
+
+
+def latest_session(now=None):
+    """now(epoch 초) 기준 가장 최근 장 마감 날짜 (datetime64[D])."""
+    now = time.time() if now is None else now
+    day = (np.datetime64(int(now), 's') - np.timedelta64(MARKET_CLOSE_UTC_HOUR, 'h')).astype('datetime64[D]')
+    return np.busday_offset(day, 0, roll='backward')
+
+
+def cached_close_arrays(tickers, cache_dir=CACHE_DIR):
+    """캐시된 종가를 날짜 합집합 기준으로 정렬 + ffill 합니다.
+
+    반환: (dates (T,) datetime64[D], {ticker: (T,)}, 티커별 마지막 캐시 날짜 중 가장 이른 날짜) 또는 None
+    """
+    cached = {}
+    for ticker in tickers:
+        arrays = read_cached_arrays(ticker, cache_dir)
+        if arrays is None:
+            return None
+        cached[ticker] = (arrays[0].astype('datetime64[D]'), arrays[1])
+
+    dates = np.unique(np.concatenate([ticker_dates for ticker_dates, _ in cached.values()]))
+    closes = {}
+    for ticker, (ticker_dates, close) in cached.items():
+        aligned = np.full(len(dates), np.nan)
+        aligned[np.searchsorted(dates, ticker_dates)] = close
+        # ffill: 각 위치까지의 마지막 유효값 인덱스로 채움
+        last_valid = np.where(np.isnan(aligned), 0, np.arange(len(dates)))
+        np.maximum.accumulate(last_valid, out=last_valid)
+        closes[ticker] = aligned[last_valid]
+    oldest_last = min(ticker_dates[-1] for ticker_dates, _ in cached.values())
+    return dates, closes, oldest_last
+
+
+def fast_signal(strategy, cache_dir=CACHE_DIR, now=None):
+    """캐시와 스냅샷만으로 신호를 계산합니다. 빠른 경로를 쓸 수 없으면 None."""
+    if os.environ.get('TAA_FAST_START', '1') == '0':
+        return None
+
+    with stage('fast_load'):
+        cached = cached_close_arrays(strategy_tickers(strategy), cache_dir)
+        if cached is None:
+            return None
+        dates, closes, oldest_last = cached
+        if oldest_last < latest_session(now):
+            return None
+
+        snapshot_file = snapshot_path(strategy['name'], cache_dir)
+        loaded = load_snapshot(snapshot_file, strategy_fingerprint(strategy))
+        k, snapshot = resume_position_arrays(loaded, dates, closes, strategy['ma_windows'], strategy['bond_mode'],
+                                             strategy['rising_bond'], strategy['falling_bond'])
+        if k is None:
+            return None
+
+    with stage('snapshot_advance', rows=len(dates) - k - 1):
+        signal, updated = advance_snapshot_arrays(
+            snapshot, dates[k + 1:], {ticker: close[k + 1:] for ticker, close in closes.items()},
+            strategy['ma_windows'], strategy['rate_ma_window'], strategy['n_band'], strategy['bond_mode'],
+            strategy['rising_bond'], strategy['falling_bond'],
+        )
+    signal['triggers'] = flip_triggers(updated, strategy)
+    if updated is not loaded: # 새 봉이 있거나 가격 기준을 맞춘 경우
+        with stage('snapshot_save'):
+            save_snapshot(snapshot_file, updated)
+    record_signal(signal, strategy, cache_dir)
+    return signal
+
+
+def fast_result(strategy, cache_dir=CACHE_DIR, now=None):
+    """빠른 경로로 SignalResult 를 만듭니다. 쓸 수 없으면 None (호출 측이 기존 경로로 진행)."""
+    signal = fast_signal(strategy, cache_dir, now)
+    if signal is None:
+        return None
+    with stage('report'):
+        return build_result(signal, strategy)
+
+
+def fast_report(strategy, cache_dir=CACHE_DIR, now=None):
+    """빠른 경로로 텔레그램 리포트를 만듭니다. 쓸 수 없으면 None."""
+    result = fast_result(strategy, cache_dir, now)
+    return None if result is None else render_telegram(result)
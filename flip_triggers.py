@@ -0,0 +1,70 @@
+import numpy as np
+
+from state_snapshot import RATE_TICKER
+
+# --- [다음 종가 기준 전환가 (flip trigger)] ---
+# 내일 이동평균에는 내일 종가 p 가 포함되므로, 윈도우 w 의 내일 MA 는
+#   m(p) = (B + p) / w,   B = 오늘 윈도우 합 - 내일 윈도우에서 빠지는 가장 오래된 값
+# 이격도 규칙을 p 에 대해 풀면 (N_BAND = b):
+#   OFF -> ON  :  p > (1 + b) m(p)  <=>  p > (1 + b) B / (w - 1 - b)
+#   ON  -> OFF :  p < (1 - b) m(p)  <=>  p < (1 - b) B / (w - 1 + b)
+# ^TNX 채권 선택도 같은 방식 (윈도우 W, B_r = 금리 합 - 빠지는 값):
+#   금리 상승(IEF)  <=>  r > (B_r + r) / W  <=>  r > B_r / (W - 1)
+# 분모가 0 이하(윈도우 1 등)인 경우는 전환가가 없으므로 NaN 입니다.
+
+
+def window_base(snapshot, ma_windows, rate_ma_window):
+    """스냅샷의 윈도우 합에서 내일 빠지는 값을 뺀 B (S, W) 와 금리 B_r."""
+    windows = np.asarray(ma_windows)
+    tail = np.asarray(snapshot['tail'], dtype=np.float64)
+    rate_tail = np.asarray(snapshot['rate_tail'], dtype=np.float64)
+    base = np.asarray(snapshot['sums'], dtype=np.float64) - tail[:, tail.shape[1] - windows]
+    rate_base = snapshot['rate_sum'] - rate_tail[len(rate_tail) - rate_ma_window]
+    return base, rate_base
+
+
+def _solve(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / np.where(denominator > 0, denominator, 1.0), np.nan)
+
+
+def next_close_triggers(base, ma_windows, n_band):
+    """(S, W) 내일 종가 기준 ON 전환가(초과 시 ON), OFF 전환가(미만 시 OFF)."""
+    windows = np.asarray(ma_windows, dtype=np.float64)
+    on_price = _solve((1.0 + n_band) * base, windows - 1.0 - n_band)
+    off_price = _solve((1.0 - n_band) * base, windows - 1.0 + n_band)
+    return on_price, off_price
+
+
+def rate_switch_level(rate_base, rate_ma_window):
+    """내일 ^TNX 가 이 값을 초과하면 금리 상승(IEF), 이하이면 하락(TLT)."""
+    return float(_solve(np.float64(rate_base), np.float64(rate_ma_window - 1.0)))
+
+
+def flip_triggers(snapshot, strategy):
+    """스냅샷(마지막 종가 기준)으로부터 시리즈 × 윈도우별 다음 종가 전환가를 계산합니다.
+
+    반환 dict:
+      on_price / off_price : (S, W) ON/OFF 전환가 (시리즈 순서는 신호 결과의 names 와 같음)
+      trigger              : (S, W) 현재 상태에서 바뀌는 쪽의 전환가 (OFF 이면 on_price, ON 이면 off_price)
+      rate / rate_switch   : 오늘 ^TNX 종가 / 채권 선택이 바뀌는 내일 ^TNX 값
+    synthetic 모드의 Tactical_Bond 전환가는 내일의 채권(IEF/TLT) 가격 기준이며,
+    real 모드의 비활성 채권은 내일 활성화되는 경우에만 의미가 있습니다.
+    """
+    base, rate_base = window_base(snapshot, strategy['ma_windows'], strategy['rate_ma_window'])
+    return triggers_from_base(base, rate_base, snapshot['states'], snapshot['last_close'][RATE_TICKER],
+                              snapshot['is_rising'], strategy)
+
+
+def triggers_from_base(base, rate_base, states, rate, is_rising, strategy):
+    """윈도우 합 B / 금리 B_r 와 현재 상태로 flip_triggers 결과 dict 를 만듭니다."""
+    on_price, off_price = next_close_triggers(base, strategy['ma_windows'], strategy['n_band'])
+    states = np.asarray(states, dtype=np.float64)
+    return {
+        'on_price': on_price,
+        'off_price': off_price,
+        'trigger': np.where(states == 1.0, off_price, on_price),
+        'rate': float(rate),
+        'rate_switch': rate_switch_level(rate_base, strategy['rate_ma_window']),
+        'is_rising': bool(is_rising),
+    }
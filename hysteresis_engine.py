@@ -0,0 +1,102 @@
+import numpy as np
+
+# --- [이격도(Hysteresis) 상태 엔진] ---
+# (티커 × 윈도우 × 시간) 배열을 한 번에 처리하여
+# 전체 상태 이력, 점수, SCALAR_MAP 스케일러를 반환합니다.
+#
+# 기존 일별 반복문의 규칙:
+#   밴드가 NaN            -> OFF
+#   어제 ON  -> 가격 >= 하단 밴드면 ON 유지, 아니면 OFF
+#   어제 OFF -> 가격 >  상단 밴드면 ON,      아니면 OFF 유지
+#
+# 상단 밴드 >= 하단 밴드인 정상적인 경우, 각 날짜는 "ON 확정 / OFF 확정 / 유지"
+# 중 하나의 이벤트가 되므로 상태 이력은 이벤트의 forward-fill 로 계산됩니다.
+
+EVENT_HOLD = -1
+
+
+def _conditions(prices, upper, lower, active=None):
+    p = prices[:, None, :]
+    with np.errstate(invalid='ignore'):
+        keep_on = p >= lower   # 어제 ON 일 때 오늘도 ON 인 조건
+        turn_on = p > upper    # 어제 OFF 일 때 오늘 ON 이 되는 조건
+    no_band = np.isnan(upper)
+    if active is None:
+        hold = np.zeros(keep_on.shape, dtype=bool)
+    else:
+        hold = np.broadcast_to(~np.asarray(active, dtype=bool)[:, None, :], keep_on.shape)
+    return keep_on, turn_on, no_band, hold
+
+
+def _hysteresis_kernel(keep_on, turn_on, no_band, hold, init_states):
+    # 원래 반복문과 동일한 순차 커널 (상단 < 하단 인 비정상 밴드용)
+    states = np.empty(keep_on.shape, dtype=np.float64)
+    prev = init_states
+    for i in range(keep_on.shape[-1]):
+        cur = np.where(prev == 1.0, keep_on[:, :, i], turn_on[:, :, i]).astype(np.float64)
+        cur[no_band[:, :, i]] = 0.0
+        cur = np.where(hold[:, :, i], prev, cur)
+        states[:, :, i] = cur
+        prev = cur
+    return states
+
+
+def hysteresis_states(prices, upper, lower, start_index=0, init_states=None, active=None):
+    """이격도 밴드 상태(0.0/1.0) 이력을 계산합니다.
+
+    prices: (N, T), upper/lower: (N, W, T), active: (N, T) bool (False 인 날은 상태 유지)
+    반환: (N, W, T) float64. start_index 이전 구간은 init_states(기본 OFF) 로 채워집니다.
+    """
+    prices = np.ascontiguousarray(prices, dtype=np.float64)
+    upper = np.ascontiguousarray(upper, dtype=np.float64)
+    lower = np.ascontiguousarray(lower, dtype=np.float64)
+    n, w, t = upper.shape
+
+    if init_states is None:
+        init_states = np.zeros((n, w), dtype=np.float64)
+    init_states = np.asarray(init_states, dtype=np.float64)
+
+    states = np.empty((n, w, t), dtype=np.float64)
+    states[:, :, :start_index] = init_states[:, :, None]
+    if start_index >= t:
+        return states
+
+    seg_active = None if active is None else np.asarray(active)[:, start_index:]
+    keep_on, turn_on, no_band, hold = _conditions(
+        prices[:, start_index:], upper[:, :, start_index:], lower[:, :, start_index:], seg_active
+    )
+
+    # 어제 상태를 뒤집는 날(상단 < 하단)이 있으면 forward-fill 이 성립하지 않음
+    if (turn_on & ~keep_on & ~no_band & ~hold).any():
+        states[:, :, start_index:] = _hysteresis_kernel(keep_on, turn_on, no_band, hold, init_states)
+        return states
+
+    events = np.full(keep_on.shape, EVENT_HOLD, dtype=np.int8)
+    events[keep_on & turn_on] = 1
+    events[~keep_on & ~turn_on] = 0
+    events[no_band] = 0
+    events[hold] = EVENT_HOLD
+
+    # 마지막 이벤트 위치를 forward-fill
+    idx = np.where(events != EVENT_HOLD, np.arange(events.shape[-1]), -1)
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    filled = np.take_along_axis(events, np.maximum(idx, 0), axis=-1).astype(np.float64)
+    states[:, :, start_index:] = np.where(idx >= 0, filled, init_states[:, :, None])
+    return states
+
+
+def scalar_table(scalar_map, n_windows):
+    # 점수(0..W) -> 스케일러 조회 테이블 (SCALAR_MAP 에 없는 점수는 NaN, pandas map 과 동일)
+    return np.array([scalar_map.get(k, np.nan) for k in range(n_windows + 1)], dtype=np.float64)
+
+
+def scores_to_scalars(scores, scalar_map, n_windows):
+    return scalar_table(scalar_map, n_windows)[scores.astype(np.intp)]
+
+
+def run_hysteresis(prices, upper, lower, scalar_map, start_index=0, init_states=None, active=None):
+    """상태 이력, 티커별 점수(N, T), 스케일러(N, T)를 한 번에 반환합니다."""
+    states = hysteresis_states(prices, upper, lower, start_index, init_states, active)
+    scores = states.sum(axis=1)
+    scalars = scores_to_scalars(scores, scalar_map, states.shape[1])
+    return states, scores, scalars
@@ -0,0 +1,201 @@
+import argparse
+import asyncio
+import csv
+import inspect
+import json
+import sys
+
+import numpy as np
+
+from bond_modes import BOND_MODES
+from flip_triggers import window_base
+from hysteresis_engine import hysteresis_states
+from signal_core import RATE_TICKER, STRATEGY_TICKERS, strategy_fingerprint, strategy_scalars, strategy_tickers
+from state_snapshot import load_snapshot, snapshot_path
+
+# --- [장중 스트리밍 모드 (조기 경보)] ---
+# 전일 종가 기준 스냅샷(이동평균 누적합, 최근 가격 꼬리, MA 상태)에서 시작하여,
+# 장중 틱/호가가 들어올 때마다 "지금 가격이 오늘 종가라면" 의 잠정(provisional) 값을 계산합니다.
+#   * 이동평균: (전일 윈도우 합 - 윈도우에서 빠지는 가장 오래된 값 + 현재가) / 윈도우 -> 틱당 O(시리즈 × 윈도우)
+#   * 이격도 상태: 전일 확정 상태에서 오늘 한 봉만 평가 (이력 재계산 없음)
+#   * ^TNX 틱은 금리 200일 MA 를 같은 방식으로 갱신하여 Tactical_Bond(IEF/TLT) 선택을 바꿈
+# 잠정 상태가 바뀔 때마다(밴드 돌파/복귀) 이벤트를 냅니다. 확정은 기존처럼 장 마감 후 일일 실행입니다.
+#
+# 피드는 (timestamp, ticker, price) 를 내는 임의의 async iterable 입니다.
+# replay_file() 은 CSV(timestamp,ticker,price) 또는 JSON lines 파일을 재생합니다.
+
+
+class IntradayMonitor:
+    """스냅샷(전일 종가) + 장중 현재가로 잠정 MA / 이격도 상태 / 스케일러를 계산합니다."""
+
+    def __init__(self, snapshot, strategy):
+        self.strategy = strategy
+        self.ma_windows = strategy['ma_windows']
+        self.rate_window = strategy['rate_ma_window']
+        # 오늘 봉이 추가되면 윈도우에서 빠지는 값을 미리 빼 둠 -> 틱마다 (base + 현재가) / window
+        self.ma_base, self.rate_base = window_base(snapshot, self.ma_windows, self.rate_window)
+
+        self.confirmed_states = np.asarray(snapshot['states'], dtype=np.float64)
+        self.confirmed_is_rising = bool(snapshot['is_rising'])
+        self.as_of = snapshot['last_date']
+        self.prices = {ticker: float(price) for ticker, price in snapshot['last_close'].items()}
+        self.states = self.confirmed_states.copy()
+        self.is_rising = self.confirmed_is_rising
+        self.evaluate()
+
+    def evaluate(self):
+        """현재가 기준 잠정 값을 계산합니다. 반환: dict (names, ma, upper, lower, states, is_rising, scalars)."""
+        strategy = self.strategy
+        rate = self.prices[RATE_TICKER]
+        is_rising = np.array([rate > (self.rate_base + rate) / self.rate_window])
+
+        closes = {ticker: np.array([price]) for ticker, price in self.prices.items()}
+        names, _, prices, active = BOND_MODES[strategy['bond_mode']]['inputs'](
+            closes, is_rising, strategy['rising_bond'], strategy['falling_bond'],
+        )
+        ma = (self.ma_base + prices) / np.asarray(self.ma_windows, dtype=np.float64)
+        upper = ma * (1.0 + strategy['n_band'])
+        lower = ma * (1.0 - strategy['n_band'])
+        states = hysteresis_states(prices, upper[:, :, None], lower[:, :, None], 0,
+                                   init_states=self.confirmed_states, active=active)[:, :, 0]
+
+        self.current = {
+            'names': names,
+            'prices': prices[:, 0],
+            'ma': ma,
+            'upper': upper,
+            'lower': lower,
+            'states': states,
+            'is_rising': bool(is_rising[0]),
+            'scalars': strategy_scalars(states[:, :, None], is_rising, strategy)[:, 0],
+        }
+        return self.current
+
+    def update(self, ticker, price, timestamp=None):
+        """틱 하나를 반영하고, 잠정 상태가 바뀐 경우 이벤트 리스트를 반환합니다."""
+        if ticker not in self.prices or not np.isfinite(price) or price <= 0:
+            return []
+        self.prices[ticker] = float(price)
+        previous_states, previous_rising = self.states, self.is_rising
+        current = self.evaluate()
+        self.states, self.is_rising = current['states'], current['is_rising']
+
+        events = []
+        if current['is_rising'] != previous_rising:
+            events.append(self._event('bond_switch', timestamp, ticker=RATE_TICKER, price=self.prices[RATE_TICKER]))
+        for s_idx, w_idx in np.argwhere(current['states'] != previous_states):
+            name = current['names'][s_idx]
+            events.append(self._event(
+                'flip', timestamp, ticker=name, window=int(self.ma_windows[w_idx]),
+                state='ON' if current['states'][s_idx, w_idx] == 1.0 else 'OFF',
+                confirmed_state='ON' if self.confirmed_states[s_idx, w_idx] == 1.0 else 'OFF',
+                price=float(current['prices'][s_idx]), ma=float(current['ma'][s_idx, w_idx]),
+                upper=float(current['upper'][s_idx, w_idx]), lower=float(current['lower'][s_idx, w_idx]),
+            ))
+        return events
+
+    def _active_bond(self, is_rising):
+        return self.strategy['rising_bond'] if is_rising else self.strategy['falling_bond']
+
+    def _event(self, kind, timestamp, **fields):
+        base = self.strategy['base_weights']
+        weights = {ticker: float(base[ticker] * scalar) for ticker, scalar in zip(STRATEGY_TICKERS, self.current['scalars'])}
+        return {
+            'type': kind,
+            'time': timestamp,
+            'strategy': self.strategy['name'],
+            'as_of': self.as_of,
+            **fields,
+            'provisional_weights': weights,
+            'provisional_cash': 1.0 - sum(weights.values()),
+            'active_bond': self._active_bond(self.current['is_rising']),
+        }
+
+
+def base_snapshot(strategy, provider=None):
+    """전일 종가 기준 스냅샷을 준비합니다 (캐시/스냅샷이 최신이면 다운로드 없음)."""
+    from fast_start import fast_signal
+
+    if fast_signal(strategy) is None:
+        from signal_core import compute_signal, load_market_data
+        compute_signal(load_market_data(strategy_tickers(strategy), provider=provider), strategy)
+    snapshot = load_snapshot(snapshot_path(strategy['name']), strategy_fingerprint(strategy))
+    if snapshot is None:
+        raise ValueError("스냅샷을 만들 수 없습니다 (데이터 부족).")
+    return snapshot
+
+
+def _parse_tick(record):
+    if isinstance(record, dict):
+        return record.get('timestamp'), record['ticker'], float(record['price'])
+    timestamp, ticker, price = record
+    return timestamp, ticker, float(price)
+
+
+async def replay_file(path, speed=0.0):
+    """CSV(timestamp,ticker,price 헤더) 또는 JSON lines 틱 파일을 재생합니다.
+
+    speed > 0 이면 timestamp(초 단위 숫자) 간격 / speed 만큼 기다립니다 (0: 대기 없음).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl') or path.endswith('.json'):
+            records = (json.loads(line) for line in f if line.strip())
+        else:
+            records = csv.DictReader(f)
+        previous = None
+        for record in records:
+            tick = _parse_tick(record)
+            if speed > 0:
+                try:
+                    now = float(tick[0])
+                except (TypeError, ValueError):
+                    now = None
+                if previous is not None and now is not None:
+                    await asyncio.sleep(max(now - previous, 0.0) / speed)
+                previous = now
+            else:
+                await asyncio.sleep(0) # 다른 작업에 양보
+            yield tick
+
+
+def print_event(event):
+    print(json.dumps(event, ensure_ascii=False), flush=True)
+
+
+async def stream(feed, monitor, on_event=print_event):
+    """피드의 틱을 모니터에 반영하고 이벤트마다 on_event(동기/비동기 함수)를 호출합니다.
+
+    반환: (처리한 틱 수, 이벤트 수)
+    """
+    n_ticks = n_events = 0
+    async for record in feed:
+        timestamp, ticker, price = _parse_tick(record)
+        n_ticks += 1
+        for event in monitor.update(ticker, price, timestamp):
+            n_events += 1
+            result = on_event(event)
+            if inspect.isawaitable(result):
+                await result
+    return n_ticks, n_events
+
+
+# --- [메인 실행] ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adaptive-Hysteresis-TAA 장중 스트리밍 (잠정 신호 이벤트)")
+    parser.add_argument('--replay', required=True, help="틱 파일 (CSV: timestamp,ticker,price 또는 JSON lines)")
+    parser.add_argument('--mode', choices=['synthetic', 'real'], default='synthetic')
+    parser.add_argument('--speed', type=float, default=0.0, help="재생 속도 배수 (0: 대기 없이 재생)")
+    args = parser.parse_args()
+
+    try:
+        if args.mode == 'synthetic':
+            from daily_signal_generator import STRATEGY
+        else:
+            from daily_signal_generator_채권실물자산 import STRATEGY
+
+        monitor = IntradayMonitor(base_snapshot(STRATEGY), STRATEGY)
+        n_ticks, n_events = asyncio.run(stream(replay_file(args.replay, args.speed), monitor))
+        print(f"... 틱 {n_ticks}개 / 이벤트 {n_events}개 ...", file=sys.stderr)
+    except Exception as e:
+        print(f"오류가 발생했습니다: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,294 @@
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from urllib.parse import quote, urlencode
+from urllib.request import Request, urlopen
+
+import numpy as np
+import pandas as pd
+
+from price_cache import CACHE_DIR, load_close_prices
+
+# --- [시장 데이터 공급자 (provider)] ---
+# 신호 엔진은 공급자로부터 정렬된 종가 행렬만 받습니다. 공급자는 모두 같은 인터페이스를 가집니다.
+#   fetch(tickers, period=None, start=None)        -> {ticker: 종가 Series}   (구현체별)
+#   fetch_ticker(ticker, period=None, start=None)  -> 종가 Series 또는 None (기본: fetch 를 티커 하나로)
+#   get_close(tickers, period)                     -> market data dict
+#       {'close': DataFrame(날짜 × 티커), 'as_of': 마지막 날짜, 'source': 공급자 이름,
+#        'stale': {ticker: 마지막 유효 날짜 또는 None}}
+# 'stale' 은 마지막 날짜까지 값이 없는 티커, 또는 다운로드 실패로 캐시 값을 쓴 티커입니다.
+#
+# get_close 는 티커별 요청을 최대 max_workers 개씩 동시에 보내고(fetch_many), 티커마다 timeout /
+# 재시도(지수 백오프)를 따로 적용합니다. 일부 티커가 실패해도 나머지 결과와 캐시로 계속 진행합니다.
+#
+# 구현체:
+#   YFinanceProvider   : yfinance (+ 로컬 가격 캐시)
+#   YahooChartProvider : Yahoo chart API 직접 호출 (+ 로컬 가격 캐시, TAA_CHART_URL 로 주소 변경 가능)
+#   LocalFileProvider  : 티커별 CSV/Parquet 파일 디렉터리 (TAA_DATA_DIR)
+#   InMemoryProvider   : 메모리 상의 DataFrame (테스트/벤치마크용)
+
+DOWNLOAD_TIMEOUT = 30 # 초 (티커별, 시도마다)
+DOWNLOAD_RETRIES = 2
+RETRY_BACKOFF = 1.0 # 초, 재시도마다 2배
+DOWNLOAD_WORKERS = 4 # 동시에 받는 티커 수
+
+
+class MarketDataProvider:
+    name = 'base'
+
+    def __init__(self, timeout=None, retries=0, backoff=RETRY_BACKOFF, max_workers=1):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_workers = max_workers
+
+    def fetch(self, tickers, period=None, start=None):
+        raise NotImplementedError
+
+    def fetch_ticker(self, ticker, period=None, start=None):
+        return self.fetch([ticker], period=period, start=start).get(ticker)
+
+    def _call_with_timeout(self, label, fn, *args):
+        if self.timeout is None:
+            return fn(*args)
+        # 공급자가 응답하지 않아도 timeout 이후에는 반환 (작업 스레드는 기다리지 않음)
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            return executor.submit(fn, *args).result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"{label}: {self.timeout}초 안에 응답이 없습니다.") from None
+        finally:
+            executor.shutdown(wait=False)
+
+    def _with_retries(self, label, fn, *args):
+        """fn 을 timeout / 재시도(지수 백오프)와 함께 호출합니다. 빈 결과도 실패로 간주."""
+        for attempt in range(self.retries + 1):
+            try:
+                fetched = self._call_with_timeout(label, fn, *args)
+                if fetched is not None and len(fetched):
+                    return fetched
+                error = ValueError(f"{label}: 받은 데이터가 없습니다.")
+            except Exception as e:
+                error = e
+            if attempt < self.retries:
+                print(f"{label} 재시도 {attempt + 1}/{self.retries}: {error}", file=sys.stderr)
+                time.sleep(self.backoff * 2 ** attempt)
+        raise error
+
+    def fetch_with_retries(self, tickers, period=None, start=None):
+        """여러 티커를 fetch 한 번으로 받습니다 (timeout / 재시도 포함)."""
+        return self._with_retries(self.name, self.fetch, tickers, period, start)
+
+    def fetch_many(self, requests, period=None):
+        """티커별 요청 {ticker: 시작일 또는 None(period 전체)} 을 최대 max_workers 개씩 동시에 받습니다.
+
+        반환: ({ticker: 종가 Series}, {ticker: 오류}). 실패한 티커는 다른 티커의 결과에 영향을 주지 않습니다.
+        """
+        def fetch_one(ticker):
+            return self._with_retries(f"{self.name}:{ticker}", self.fetch_ticker, ticker, period, requests[ticker])
+
+        fetched, errors = {}, {}
+        if not requests:
+            return fetched, errors
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(requests)))) as executor:
+            futures = {ticker: executor.submit(fetch_one, ticker) for ticker in requests}
+            for ticker, future in futures.items():
+                try:
+                    fetched[ticker] = future.result()
+                except Exception as e:
+                    errors[ticker] = e
+                    print(f"{self.name}: {ticker} 다운로드 실패: {e}", file=sys.stderr)
+        return fetched, errors
+
+    def get_close(self, tickers, period="400d"):
+        fetched, errors = self.fetch_many(dict.fromkeys(tickers), period)
+        if not fetched and errors:
+            raise next(iter(errors.values()))
+        close_df = pd.DataFrame({ticker: fetched[ticker] for ticker in tickers if ticker in fetched}).sort_index()
+        if not close_df.empty:
+            # 로컬 데이터는 오늘이 아닌 데이터의 마지막 날짜 기준으로 period 구간을 자름
+            close_df = close_df[close_df.index >= close_df.index[-1] - pd.Timedelta(period)]
+        return market_data(close_df, tickers, self.name)
+
+
+class CachedProvider(MarketDataProvider):
+    """원격 공급자 공통: 로컬 가격 캐시 + 티커별 증분 다운로드 (cache_dir=None 이면 캐시 없이)."""
+
+    def __init__(self, timeout=DOWNLOAD_TIMEOUT, retries=DOWNLOAD_RETRIES, backoff=RETRY_BACKOFF,
+                 max_workers=DOWNLOAD_WORKERS, cache_dir=CACHE_DIR):
+        super().__init__(timeout, retries, backoff, max_workers)
+        self.cache_dir = cache_dir
+
+    def get_close(self, tickers, period="400d"):
+        if self.cache_dir is None:
+            market = super().get_close(tickers, period)
+            cutoff = pd.Timestamp.today().normalize() - pd.Timedelta(period)
+            market['close'] = market['close'][market['close'].index >= cutoff]
+            return market
+        status = {}
+        close_df = load_close_prices(tickers, self.fetch_many, period, self.cache_dir, status=status)
+        return market_data(close_df, tickers, self.name, status.get('fallback', ()))
+
+
+def market_data(close_df, tickers, source, fallback=()):
+    """정렬된 종가 행렬과 staleness 표시를 묶어 반환합니다."""
+    stale = {}
+    as_of = close_df.index[-1] if not close_df.empty else None
+    for ticker in tickers:
+        last_valid = close_df[ticker].last_valid_index() if ticker in close_df.columns else None
+        if last_valid is None or last_valid < as_of or ticker in fallback:
+            stale[ticker] = last_valid
+    return {'close': close_df, 'as_of': as_of, 'source': source, 'stale': stale}
+
+
+def _close_series(close, tickers):
+    if isinstance(close, pd.Series):
+        close = close.to_frame(tickers[0])
+    if close.index.tz is not None:
+        close = close.tz_localize(None)
+
+    result = {}
+    for ticker in tickers:
+        if ticker in close.columns:
+            series = close[ticker].dropna()
+            if not series.empty:
+                result[ticker] = series.rename(ticker)
+    return result
+
+
+class YFinanceProvider(CachedProvider):
+    name = 'yfinance'
+
+    def fetch(self, tickers, period=None, start=None):
+        import yfinance as yf # 실제로 받을 때만 불러옴 (import 비용이 큼)
+
+        kwargs = {'start': start} if start is not None else {'period': period}
+        data = yf.download(tickers, progress=False, timeout=self.timeout, **kwargs)
+        if data is None or data.empty:
+            return {}
+        return _close_series(data['Close'], tickers)
+
+    def fetch_ticker(self, ticker, period=None, start=None):
+        import yfinance as yf
+
+        # yf.download 는 스레드 간에 전역 상태를 공유하므로, 동시 요청에는 티커별 history 를 사용
+        kwargs = {'start': start} if start is not None else {'period': period}
+        history = yf.Ticker(ticker).history(auto_adjust=True, timeout=self.timeout, **kwargs)
+        if history is None or history.empty:
+            return None
+        return _close_series(history[['Close']].set_axis([ticker], axis=1), [ticker]).get(ticker)
+
+
+def parse_chart(payload, ticker):
+    """Yahoo chart API 응답(JSON) -> 수정 종가 Series (날짜는 거래소 현지 날짜). 데이터가 없으면 None."""
+    chart = payload.get('chart') or {}
+    if chart.get('error'):
+        raise ValueError(f"{ticker}: {chart['error'].get('description', chart['error'])}")
+    results = chart.get('result') or []
+    if not results or not results[0].get('timestamp'):
+        return None
+    result = results[0]
+    indicators = result['indicators']
+    adjclose = (indicators.get('adjclose') or [{}])[0].get('adjclose')
+    close = np.array(adjclose if adjclose is not None else indicators['quote'][0]['close'], dtype=np.float64)
+    offset = result.get('meta', {}).get('gmtoffset', 0)
+    dates = pd.to_datetime(np.asarray(result['timestamp'], dtype=np.int64) + offset, unit='s').normalize()
+    series = pd.Series(close, index=dates, name=ticker).dropna()
+    # 장중 요청 시 마지막 봉이 중복될 수 있음
+    return series[~series.index.duplicated(keep='last')].sort_index()
+
+
+class YahooChartProvider(CachedProvider):
+    """Yahoo chart API(/v8/finance/chart/<ticker>) 를 티커별 HTTP 요청으로 호출합니다 (urllib).
+
+    base_url 을 바꾸면 같은 JSON 형식으로 응답하는 로컬 스텁 서버(chart_stub_server.py)로 시험할 수 있습니다.
+    """
+    name = 'yahoo_chart'
+    BASE_URL = 'https://query1.finance.yahoo.com'
+    USER_AGENT = 'Mozilla/5.0 (Adaptive-Hysteresis-TAA)'
+
+    def __init__(self, base_url=BASE_URL, timeout=DOWNLOAD_TIMEOUT, retries=DOWNLOAD_RETRIES, backoff=RETRY_BACKOFF,
+                 max_workers=DOWNLOAD_WORKERS, cache_dir=CACHE_DIR):
+        super().__init__(timeout, retries, backoff, max_workers, cache_dir)
+        self.base_url = base_url.rstrip('/')
+
+    def fetch(self, tickers, period=None, start=None):
+        fetched = {ticker: self.fetch_ticker(ticker, period, start) for ticker in tickers}
+        return {ticker: series for ticker, series in fetched.items() if series is not None}
+
+    def fetch_ticker(self, ticker, period=None, start=None):
+        if start is not None:
+            period1 = int(pd.Timestamp(start).timestamp())
+        elif period == 'max':
+            period1 = 0
+        else:
+            period1 = int((pd.Timestamp.today().normalize() - pd.Timedelta(period)).timestamp())
+        query = urlencode({'period1': period1, 'period2': int(time.time()) + 86400, 'interval': '1d',
+                           'events': 'div,split'})
+        request = Request(f"{self.base_url}/v8/finance/chart/{quote(ticker)}?{query}",
+                          headers={'User-Agent': self.USER_AGENT})
+        with urlopen(request, timeout=self.timeout) as response:
+            return parse_chart(json.load(response), ticker)
+
+
+class LocalFileProvider(MarketDataProvider):
+    """티커별 종가 파일 디렉터리 (<ticker>.csv 또는 <ticker>.parquet, '^' 는 '_' 로 저장).
+
+    파일은 날짜 인덱스와 'Close' 컬럼(없으면 첫 번째 컬럼)을 가집니다.
+    """
+    name = 'local'
+
+    def __init__(self, directory, timeout=None, retries=0, backoff=RETRY_BACKOFF, max_workers=1):
+        super().__init__(timeout, retries, backoff, max_workers)
+        self.directory = directory
+
+    def _read(self, ticker):
+        stem = os.path.join(self.directory, ticker.replace('^', '_').replace('/', '_'))
+        if os.path.exists(stem + '.parquet'):
+            frame = pd.read_parquet(stem + '.parquet')
+        elif os.path.exists(stem + '.csv'):
+            frame = pd.read_csv(stem + '.csv', index_col=0, parse_dates=True)
+        else:
+            return None
+        frame.index = pd.DatetimeIndex(frame.index)
+        series = frame['Close'] if 'Close' in frame.columns else frame.iloc[:, 0]
+        return series.astype('float64').sort_index().dropna().rename(ticker)
+
+    def fetch(self, tickers, period=None, start=None):
+        result = {}
+        for ticker in tickers:
+            series = self._read(ticker)
+            if series is None or series.empty:
+                continue
+            if start is not None:
+                series = series[series.index >= pd.Timestamp(start)]
+            result[ticker] = series
+        return result
+
+
+class InMemoryProvider(MarketDataProvider):
+    """메모리 상의 종가 DataFrame (날짜 × 티커) 을 그대로 제공합니다."""
+    name = 'memory'
+
+    def __init__(self, close_df, timeout=None, retries=0, backoff=RETRY_BACKOFF, max_workers=1):
+        super().__init__(timeout, retries, backoff, max_workers)
+        self.close_df = close_df.sort_index()
+
+    def fetch(self, tickers, period=None, start=None):
+        close_df = self.close_df
+        if start is not None:
+            close_df = close_df[close_df.index >= pd.Timestamp(start)]
+        return _close_series(close_df, tickers)
+
+
+def default_provider():
+    """TAA_DATA_DIR 이 지정되면 로컬 파일, TAA_CHART_URL 이면 chart API, 아니면 yfinance (+ 가격 캐시)."""
+    data_dir = os.environ.get('TAA_DATA_DIR')
+    if data_dir:
+        return LocalFileProvider(data_dir)
+    chart_url = os.environ.get('TAA_CHART_URL')
+    if chart_url:
+        return YahooChartProvider(chart_url)
+    return YFinanceProvider()
@@ -0,0 +1,129 @@
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource # Unix 전용 (최대 RSS)
+except ImportError:
+    resource = None
+
+# --- [단계별 측정 (metrics) / 프로파일러] ---
+# 실행 단계(download, ffill, rolling_ma, hysteresis, report 등)마다 소요 시간, 처리 행 수,
+# 최대 메모리를 기록하고, 실행이 끝나면 리포트(stdout)와 분리하여 JSON 으로 출력합니다.
+#
+# 환경 변수:
+#   TAA_METRICS     : 'stderr' 또는 JSON 파일 경로 (지정하지 않으면 기록하지 않음)
+#   TAA_PROFILE     : 'cprofile', 'tracemalloc' 또는 'cprofile,tracemalloc'
+#   TAA_PROFILE_OUT : cProfile 결과 파일 (기본: taa_profile.prof, `python -m pstats` 로 확인)
+#
+# 최대 메모리는 tracemalloc 사용 시 단계별 파이썬/NumPy 할당 최대치,
+# 아니면 그 시점까지의 프로세스 최대 RSS 입니다.
+
+PROFILE_OUT = 'taa_profile.prof'
+TRACEMALLOC_TOP = 10
+
+_session = None
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024 # macOS 는 bytes, Linux 는 KB
+
+
+@contextmanager
+def stage(name, rows=None):
+    """측정 구간. 측정 세션이 없으면 아무것도 기록하지 않습니다.
+
+    with stage('ffill') as m:
+        ...
+        m['rows'] = len(close_df)
+    """
+    record = {'name': name, 'rows': rows}
+    if _session is None:
+        yield record
+        return
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['seconds'] = round(time.perf_counter() - start, 6)
+        if tracing:
+            record['peak_mb'] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 3)
+        else:
+            peak = _peak_rss_mb()
+            record['peak_mb'] = None if peak is None else round(peak, 3)
+        _session['stages'].append(record)
+
+
+def _emit(payload, target):
+    text = json.dumps(payload, ensure_ascii=False, default=str)
+    if target == 'stderr':
+        print(text, file=sys.stderr)
+    else:
+        with open(target, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+
+
+@contextmanager
+def session(name, target=None, profile=None):
+    """스크립트 실행 전체를 감싸 단계별 측정을 켜고, 끝나면(오류 포함) 결과를 출력합니다."""
+    global _session
+    target = target if target is not None else os.environ.get('TAA_METRICS')
+    profile = profile if profile is not None else os.environ.get('TAA_PROFILE', '')
+    profilers = {p.strip().lower() for p in profile.split(',') if p.strip()}
+    if not target and not profilers:
+        yield
+        return
+
+    _session = {
+        'script': name,
+        'started': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'stages': [],
+    }
+    profiler = None
+    if 'cprofile' in profilers:
+        import cProfile
+        profiler = cProfile.Profile()
+    own_tracing = 'tracemalloc' in profilers and not tracemalloc.is_tracing()
+    if own_tracing:
+        tracemalloc.start()
+
+    status = 'ok'
+    start = time.perf_counter()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    except BaseException as e:
+        status = f"error: {type(e).__name__}: {e}"
+        raise
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        payload, _session = _session, None
+        payload.update({
+            'status': status,
+            'total_seconds': round(time.perf_counter() - start, 6),
+            'peak_rss_mb': _peak_rss_mb(),
+        })
+        if profiler is not None:
+            payload['cprofile'] = os.environ.get('TAA_PROFILE_OUT', PROFILE_OUT)
+            profiler.dump_stats(payload['cprofile'])
+        if own_tracing:
+            snapshot = tracemalloc.take_snapshot()
+            payload['tracemalloc_top'] = [
+                {'where': str(stat.traceback), 'size_kb': round(stat.size / 1024, 1), 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:TRACEMALLOC_TOP]
+            ]
+            tracemalloc.stop()
+        _emit(payload, target or 'stderr')
@@ -0,0 +1,183 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+from multiprocessing import Pool, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from backtest import _strategy_params, asset_returns, backtest_history, load_price_file, signal_history
+from signal_core import RATE_TICKER, cached_rolling_means, signal_series
+
+# --- [파라미터 스윕 엔진] ---
+# N_BAND × MA_WINDOWS × SCALAR_MAP × BASE_WEIGHTS 조합을 프로세스 풀에서 평가합니다.
+#   * 가격 행렬과 이동평균은 부모 프로세스에서 한 번만 계산하여 공유 메모리에 올림
+#     (워커로 pickle 하지 않음)
+#   * 신호(스케일러)는 BASE_WEIGHTS 와 무관하므로 신호 조합당 한 번만 계산하고
+#     같은 작업 안에서 모든 비중 조합을 평가
+#   * 결과는 완료되는 대로 CSV 로 기록하고, 마지막에 순위 파일을 만듦
+
+PRICE_COLUMNS = ['QQQ', 'GLD', 'IEF', 'TLT', RATE_TICKER]
+METRIC_COLUMNS = ['sharpe', 'cagr', 'mdd', 'volatility', 'annual_turnover']
+PARAM_COLUMNS = ['n_band', 'ma_windows', 'scalar_map', 'w_qqq', 'w_gld', 'w_bond']
+
+_worker = {}
+
+
+def _to_shared(array):
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str)
+
+
+def _attach(spec):
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def precompute_ma(close_df, window_union, rate_ma_window, bond_mode):
+    """모든 (시리즈, 윈도우) 이동평균을 한 번씩만 계산합니다. 반환: (keys, (K, T) 배열)."""
+    cache = {}
+    strategy = {'bond_mode': bond_mode, 'rate_ma_window': rate_ma_window, 'rising_bond': 'IEF', 'falling_bond': 'TLT'}
+    series = signal_series(close_df, strategy, cache)
+    cached_rolling_means(series['prices'], series['cache_keys'], window_union, cache)
+    keys = list(cache.keys())
+    return keys, np.stack([cache[key] for key in keys])
+
+
+def _init_worker(price_spec, ma_spec, ma_keys, dates, options):
+    price_shm, prices = _attach(price_spec)
+    ma_shm, ma = _attach(ma_spec)
+    close_df = pd.DataFrame(prices, index=pd.DatetimeIndex(dates), columns=PRICE_COLUMNS, copy=False)
+    _worker.update({
+        'shm': (price_shm, ma_shm), # 워커가 살아있는 동안 매핑 유지
+        'close_df': close_df,
+        'returns': asset_returns(close_df),
+        'ma_cache': {key: ma[i] for i, key in enumerate(ma_keys)},
+        'options': options,
+    })
+
+
+def _evaluate_group(task):
+    n_band, ma_windows, scalar_map, weight_sets = task
+    opts = _worker['options']
+    # 신호(스케일러 / 채권 선택)는 작업당 한 번만 계산하고 비중 조합마다 재사용
+    history = signal_history(
+        _worker['close_df'], ma_windows, n_band, scalar_map, opts['rate_ma_window'], opts['bond_mode'],
+        ma_cache=_worker['ma_cache'],
+    )
+    rows = []
+    for w_qqq, w_gld, w_bond in weight_sets:
+        result = backtest_history(
+            history, {'QQQ': w_qqq, 'GLD': w_gld, 'Tactical_Bond': w_bond}, _worker['returns'],
+            opts['start'], opts['end'],
+        )
+        metrics = result['metrics']
+        rows.append([
+            n_band, '/'.join(map(str, ma_windows)), json.dumps(scalar_map, sort_keys=True),
+            w_qqq, w_gld, w_bond, *[float(metrics[col]) for col in METRIC_COLUMNS],
+        ])
+    return rows
+
+
+def simplex_weights(step):
+    """합이 1 인 (QQQ, GLD, Tactical_Bond) 비중 격자."""
+    n = int(round(1.0 / step))
+    return [(i / n, j / n, (n - i - j) / n) for i in range(n + 1) for j in range(n + 1 - i)]
+
+
+def build_tasks(n_bands, window_sets, scalar_maps, weight_sets, weights_per_task=200):
+    tasks = []
+    for n_band, ma_windows, scalar_map in itertools.product(n_bands, window_sets, scalar_maps):
+        for k in range(0, len(weight_sets), weights_per_task):
+            tasks.append((n_band, ma_windows, scalar_map, weight_sets[k:k + weights_per_task]))
+    return tasks
+
+
+def run_sweep(close_df, tasks, out_path, rate_ma_window=200, bond_mode='synthetic',
+              start=None, end=None, workers=None, rank_by='sharpe'):
+    close_df = close_df[PRICE_COLUMNS]
+    window_union = sorted({w for _, ma_windows, _, _ in tasks for w in ma_windows})
+    ma_keys, ma = precompute_ma(close_df, window_union, rate_ma_window, bond_mode)
+
+    price_shm, price_spec = _to_shared(np.ascontiguousarray(close_df.to_numpy(dtype=np.float64)))
+    ma_shm, ma_spec = _to_shared(ma)
+    options = {'rate_ma_window': rate_ma_window, 'bond_mode': bond_mode, 'start': start, 'end': end}
+    header = PARAM_COLUMNS + METRIC_COLUMNS
+
+    try:
+        with open(out_path, 'w', newline='', encoding='utf-8') as f, \
+                Pool(workers, _init_worker, (price_spec, ma_spec, ma_keys, close_df.index.values, options)) as pool:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for rows in pool.imap_unordered(_evaluate_group, tasks):
+                writer.writerows(rows)
+                f.flush()
+    finally:
+        for shm in (price_shm, ma_shm):
+            shm.close()
+            shm.unlink()
+
+    results = pd.read_csv(out_path)
+    ascending = rank_by in ('volatility', 'annual_turnover')
+    ranked = results.sort_values(rank_by, ascending=ascending, kind='mergesort').reset_index(drop=True)
+    ranked_path = os.path.splitext(out_path)[0] + '_ranked.csv'
+    ranked.to_csv(ranked_path, index_label='rank')
+    return ranked, ranked_path
+
+
+def _parse_floats(text):
+    return [float(x) for x in text.split(',') if x]
+
+
+def _parse_window_sets(text):
+    # "20,120,200;10,60,200"
+    return [[int(x) for x in group.split(',')] for group in text.split(';') if group]
+
+
+# --- [메인 실행] ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adaptive-Hysteresis-TAA 파라미터 스윕")
+    parser.add_argument('--prices', default=os.environ.get('TAA_PRICE_FILE', 'prices.csv'))
+    parser.add_argument('--mode', choices=['synthetic', 'real'], default='synthetic')
+    parser.add_argument('--start', default='2005-09-06')
+    parser.add_argument('--end', default='2024-12-31')
+    parser.add_argument('--n-bands', default='0.01,0.02,0.03,0.04,0.05')
+    parser.add_argument('--windows', default='20,120,200;20,60,200;10,120,200;50,120,200')
+    parser.add_argument('--scalar-maps', default=None,
+                        help='SCALAR_MAP 목록 JSON 파일 (예: [{"3": 1.0, "2": 0.75, "1": 0.5, "0": 0.0}])')
+    parser.add_argument('--weight-step', type=float, default=0.05, help='BASE_WEIGHTS 격자 간격')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--rank-by', choices=METRIC_COLUMNS, default='sharpe')
+    parser.add_argument('--out', default='sweep_results.csv')
+    args = parser.parse_args()
+
+    try:
+        defaults = _strategy_params(args.mode)
+        if args.scalar_maps:
+            with open(args.scalar_maps, 'r', encoding='utf-8') as f:
+                scalar_maps = [{int(k): float(v) for k, v in m.items()} for m in json.load(f)]
+        else:
+            scalar_maps = [defaults['scalar_map']]
+
+        tasks = build_tasks(
+            _parse_floats(args.n_bands), _parse_window_sets(args.windows),
+            scalar_maps, simplex_weights(args.weight_step),
+        )
+        n_combos = sum(len(task[3]) for task in tasks)
+        print(f"... {n_combos}개 조합 평가 중 ({len(tasks)}개 작업) ...", file=sys.stderr)
+
+        ranked, ranked_path = run_sweep(
+            load_price_file(args.prices), tasks, args.out, defaults['rate_ma_window'], args.mode,
+            args.start, args.end, args.workers, args.rank_by,
+        )
+        print(f"결과: {args.out} / 순위: {ranked_path}")
+        print(ranked.head(10).to_string())
+    except Exception as e:
+        print(f"오류가 발생했습니다: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,167 @@
+import os
+import sys
+
+import numpy as np
+
+# --- [로컬 가격 캐시 (티커별 NPZ)] ---
+# 캐시에 저장된 마지막 날짜 이후의 데이터만 내려받고, 최근 OVERLAP_BARS 개 봉은 다시 받아 캐시 값과 비교합니다.
+# 수정 종가는 배당/분할이 생기면 과거 전체가 다시 조정되므로, 겹치는 봉의 (새 값 / 캐시 값) 비율이
+#   * 일정하면 (조정 이벤트가 새 봉 구간) 캐시 구간 전체에 그 비율을 곱해 같은 조정 기준으로 맞추고
+#   * 일정하지 않으면 (조정 이벤트가 겹치는 구간 안 / 데이터 정정) 해당 티커만 period 전체를 다시 받습니다.
+# 캐시가 없거나 손상된 경우에는 전체 기간을 다시 받습니다.
+# 저장하는 캐시는 최근 period 구간 + 그 앞 OVERLAP_BARS 개 봉으로 잘라 파일이 계속 커지지 않게 합니다.
+# 실제 다운로드는 티커별 요청 fetch(requests, period) 로 위임합니다 (market_data.MarketDataProvider.fetch_many).
+# pandas 는 필요한 함수 안에서만 불러옵니다 (read_cached_arrays 는 NumPy 만 사용).
+
+CACHE_DIR = os.environ.get('TAA_CACHE_DIR', '.price_cache')
+OVERLAP_BARS = 5
+ADJUST_TOLERANCE = 1e-6 # 겹치는 봉 비교 허용 오차 (상대값)
+
+
+def _cache_path(cache_dir, ticker):
+    # '^TNX' 같은 티커도 안전한 파일명으로 변환
+    safe_name = ticker.replace('^', '_').replace('/', '_')
+    return os.path.join(cache_dir, f"{safe_name}.npz")
+
+
+def read_cached_arrays(ticker, cache_dir=CACHE_DIR):
+    """캐시된 (날짜 datetime64[ns], 종가) 배열을 읽습니다. 없거나 손상된 경우 None."""
+    path = _cache_path(cache_dir, ticker)
+    if not os.path.exists(path):
+        return None
+    try:
+        with np.load(path, allow_pickle=False) as npz:
+            dates = npz['dates'].astype('datetime64[ns]')
+            close = npz['close'].astype(np.float64)
+    except Exception:
+        return None
+    if len(dates) == 0 or len(dates) != len(close) or np.any(np.diff(dates.astype(np.int64)) <= 0):
+        return None
+    return dates, close
+
+
+def read_cached_series(ticker, cache_dir=CACHE_DIR):
+    """캐시된 종가 Series 를 읽습니다. 없거나 손상된 경우 None."""
+    import pandas as pd
+
+    cached = read_cached_arrays(ticker, cache_dir)
+    if cached is None:
+        return None
+    dates, close = cached
+    return pd.Series(close, index=pd.DatetimeIndex(dates), name=ticker)
+
+
+def write_cached_series(series, cache_dir=CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _cache_path(cache_dir, series.name)
+    tmp_path = path + '.tmp.npz'
+    np.savez(
+        tmp_path,
+        dates=series.index.values.astype('datetime64[ns]'),
+        close=series.to_numpy(dtype=np.float64),
+    )
+    os.replace(tmp_path, path) # 중간에 실패해도 기존 캐시가 깨지지 않도록 교체
+
+
+def overlap_ratio(old, new, tolerance=ADJUST_TOLERANCE):
+    """겹치는 날짜의 (새 값 / 캐시 값) 비율. 모든 봉에서 일정하면 그 비율, 아니면(또는 겹치는 봉이 없으면) None."""
+    common = old.index.intersection(new.index)
+    if len(common) == 0:
+        return None
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = new[common].to_numpy(dtype=np.float64) / old[common].to_numpy(dtype=np.float64)
+    if not (np.isfinite(ratio).all() and (ratio > 0).all()):
+        return None
+    if np.abs(ratio / ratio[-1] - 1.0).max() > tolerance:
+        return None
+    return float(ratio[-1])
+
+
+def _trim_series(series, cutoff, keep_bars=0):
+    """cutoff 이후 구간 + 그 앞 keep_bars 개 봉만 남깁니다."""
+    start = max(0, int(series.index.searchsorted(cutoff)) - keep_bars)
+    return series.iloc[start:]
+
+
+def load_close_prices(tickers, fetch, period="400d", cache_dir=CACHE_DIR, overlap_bars=OVERLAP_BARS, status=None):
+    """캐시 + 티커별 증분 다운로드로 정렬된 종가 DataFrame(최근 period 구간)을 반환합니다.
+
+    fetch(requests, period) -> ({ticker: Series}, {ticker: 오류}),
+      requests = {ticker: 시작일 'YYYY-MM-DD' 또는 None(캐시가 없어 period 전체)}
+    다운로드에 실패한 티커는 캐시 값을 사용하며 (캐시도 없으면 결과에서 빠짐),
+    status 에 dict 를 넘기면 해당 티커를 status['fallback'], 오류를 status['errors'],
+    조정 기준이 바뀐 티커를 status['adjusted'] ({ticker: 캐시에 곱한 비율 또는 None(전체 재다운로드)}) 에 기록합니다.
+    """
+    import pandas as pd
+
+    cutoff = pd.Timestamp.today().normalize() - pd.Timedelta(period)
+    cached = {ticker: read_cached_series(ticker, cache_dir) for ticker in tickers}
+    requests = {}
+    for ticker, series in cached.items():
+        if series is None or len(series) <= overlap_bars:
+            requests[ticker] = None
+        else:
+            # 티커마다 자신의 마지막 캐시 날짜 기준 overlap 구간부터 받음
+            requests[ticker] = series.index[-overlap_bars].strftime('%Y-%m-%d')
+    fetched, errors = fetch(requests, period)
+
+    # 겹치는 봉으로 조정 기준 확인: 일정한 비율이면 캐시 구간을 맞추고, 아니면 전체를 다시 받음
+    adjusted = {}
+    for ticker, new in fetched.items():
+        if requests[ticker] is None:
+            continue
+        ratio = overlap_ratio(cached[ticker], new)
+        if ratio is None:
+            adjusted[ticker] = None
+        elif abs(ratio - 1.0) > ADJUST_TOLERANCE:
+            adjusted[ticker] = ratio
+    refetch = {ticker: None for ticker, ratio in adjusted.items() if ratio is None}
+    if refetch:
+        refetched, refetch_errors = fetch(refetch, period)
+        for ticker in refetch:
+            if ticker in refetched:
+                fetched[ticker] = refetched[ticker]
+                requests[ticker] = None
+            else:
+                # 전체 재다운로드도 실패하면 섞인 기준으로 잇지 않고 기존 캐시를 사용
+                del fetched[ticker]
+                errors[ticker] = refetch_errors.get(ticker, ValueError("전체 재다운로드 실패"))
+
+    merged = {}
+    fallback = []
+    for ticker in tickers:
+        old = cached[ticker]
+        new = fetched.get(ticker)
+        if new is None:
+            if old is None:
+                continue
+            series = old
+            fallback.append(ticker)
+        elif requests[ticker] is None:
+            series = new
+        else:
+            head = old[old.index < new.index[0]]
+            if adjusted.get(ticker) is not None:
+                head = head * adjusted[ticker]
+            series = pd.concat([head, new])
+        if new is not None:
+            series = _trim_series(series, cutoff, overlap_bars)
+            write_cached_series(series, cache_dir)
+        merged[ticker] = series
+
+    if adjusted:
+        print("가격 조정(배당/분할) 반영: " + ", ".join(
+            f"{ticker}=" + ("전체 재다운로드" if ratio is None else f"x{ratio:.6f}")
+            for ticker, ratio in adjusted.items()), file=sys.stderr)
+    if fallback:
+        print(f"가격 다운로드 실패, 캐시 데이터를 사용합니다: {', '.join(fallback)}", file=sys.stderr)
+    if status is not None:
+        status['fallback'] = fallback
+        status['errors'] = {ticker: str(error) for ticker, error in errors.items()}
+        status['adjusted'] = adjusted
+
+    if not merged:
+        return pd.DataFrame()
+
+    close_df = pd.DataFrame(merged).sort_index()
+    return close_df[close_df.index >= cutoff]
@@ -0,0 +1,248 @@
+import csv
+import html
+import io
+import json
+import os
+
+# --- [리포트 렌더러] ---
+# signal_result.SignalResult 하나를 여러 형식으로 출력합니다 (재계산 / stdout 파싱 없음).
+#   telegram : 기존 텔레그램 마크다운 (GitHub Actions 가 stdout 을 캡처하여 전송)
+#   json     : 대시보드 / API 용 (SignalResult.to_dict)
+#   csv      : 보관용, 전략 자산 × MA 윈도우 한 행씩 (+ 현금 행)
+#   html     : 단독 HTML 페이지
+#
+# 이 모듈은 signal_core 를 import 하지 않습니다 (NumPy / pandas 불필요).
+
+
+# --- [텔레그램] ---
+
+def render_telegram(result):
+    report = []
+    report.append(f"🔔 {result.title}")
+    report.append(f"({result.date.strftime('%Y-%m-%d %A')} 마감 기준)")
+
+    # 다운로드 실패로 캐시 값을 쓰거나 마지막 날짜 값이 없는(ffill 된) 티커
+    if result.stale:
+        report.append("⚠️ 데이터 확인 필요 (다운로드 실패/누락, 마지막 값 사용): " + ", ".join(
+            f"{ticker} {day.strftime('%Y-%m-%d') if day is not None else '없음'}"
+            for ticker, day in result.stale.items()))
+
+    # [1] 리밸런싱 신호
+    if result.rebalance:
+        report.append("\n" + "🔼 ====================== 🔼")
+        report.append("    리밸런싱 신호: \"매매 필요\"")
+        report.append("🔼 ====================== 🔼")
+        report.append("(MA 신호 변경으로 목표 비중이 어제와 다릅니다)")
+    else:
+        report.append("\n" + "🟢 ====================== 🟢")
+        report.append("    리밸런싱 신호: \"매매 불필요\"")
+        report.append("🟢 ====================== 🟢")
+        report.append("(모든 MA 신호가 어제와 동일하게 유지되었습니다)")
+
+    report.append("\n" + "---")
+
+    # [2] 오늘 목표 비중
+    report.append("💰 [1] 오늘 목표 비중 (신규)")
+    qqq, gld, bond, cash = (result.allocation(asset) for asset in ('QQQ', 'GLD', 'Tactical_Bond', 'CASH'))
+
+    def get_emoji(allocation):
+        return "🎯" if allocation.changed else "*"
+
+    report.append(f" {get_emoji(qqq)} QQQ: {qqq.weight:.1%}")
+    report.append(f" {get_emoji(gld)} GLD: {gld.weight:.1%}")
+    for ticker in (result.rising_bond, result.falling_bond):
+        if ticker == result.active_bond:
+            report.append(f" {get_emoji(bond)} {ticker} (채권): {bond.weight:.1%}")
+        else:
+            report.append(f" * {ticker} (채권): 0.0%")
+    report.append(f" {get_emoji(cash)} 현금 (Cash): {cash.weight:.1%}")
+
+    report.append("\n" + "---")
+
+    # [3] 비중 변경 상세 (Monospace)
+    report.append("📊 [2] 비중 변경 상세 (매매 신호)")
+    report.append("```") # Monospace 시작
+    report.append("자산   (어제)   (오늘)  | (변경폭)")
+    report.append("------------------------------------")
+
+    def format_change_row(label, allocation):
+        delta = allocation.delta
+        if abs(delta) < 0.0001:
+            change_str = "(유지)"
+        else:
+            emoji = "🔼" if delta > 0 else "🔽"
+            change_str = f"{emoji} {delta:+.1%}"
+
+        # ljust/rjust로 고정폭 정렬
+        ticker_str = label.ljust(5)
+        yesterday_str = f"{allocation.yesterday_weight:.1%}".rjust(7)
+        today_str = f"{allocation.weight:.1%}".rjust(7)
+        change_str = change_str.rjust(10)
+
+        return f"{ticker_str}: {yesterday_str} -> {today_str} | {change_str}"
+
+    report.append(format_change_row('QQQ', qqq))
+    report.append(format_change_row('GLD', gld))
+    report.append(format_change_row(result.active_bond, bond))
+    report.append(format_change_row('현금', cash))
+    report.append("------------------------------------")
+    report.append("```") # Monospace 끝
+
+    report.append("\n" + "---")
+
+    # [4. 전일 시장 현황]
+    report.append("📈 [3] 전일 시장 현황")
+
+    for line in result.prices:
+        emoji = "🔴" if line.change >= 0 else "🔵"
+        name = line.ticker if line.ticker in ('QQQ', 'GLD') else f"채권({line.ticker})"
+        report.append(f"{emoji} {name}: ${line.price:.1f} ({line.change:+.1%})")
+
+    if result.rate_switch is not None:
+        # 내일 ^TNX 가 전환 금리를 넘으면 IEF, 이하이면 TLT
+        condition = "이하" if result.is_rising else "초과"
+        report.append(f"⚪ ^TNX: {result.rate:.2f} (채권 전환: {result.rate_switch:.2f} {condition} 시 {result.other_bond})")
+
+    report.append("\n" + "---")
+
+    # [5] MA 신호 상세
+    report.append("🔍 [4] MA 신호 상세 (오늘 기준)")
+    report.append(f"(이격도 +/- {result.n_band:.1%} 룰 적용)")
+
+    for asset in result.assets:
+        status_emoji = "🟢ON" if asset.score > 0 else "🔴OFF"
+        # real 모드의 Tactical_Bond 는 실제 어떤 자산의 신호인지 표시
+        name = asset.asset if asset.signal_ticker == asset.asset else f"{asset.asset} (-> {asset.signal_ticker})"
+        report.append(f"\n**{name} (신호: {asset.score}/{len(asset.windows)}개 {status_emoji})**")
+
+        for ma in asset.windows:
+            state_emoji = "🟢ON" if ma.state else "🔴OFF"
+            state_change = {'on': "[신규 ON]", 'off': "[신규 OFF]", 'hold': "[유지]"}[ma.change]
+            line = f"* {ma.window}일: {state_emoji} (이격도: {ma.disparity:+.1%}) {state_change}"
+            # 전환가: 내일 종가가 이 가격을 넘으면(ON 전환) / 밑돌면(OFF 전환) 상태가 바뀜
+            if ma.trigger is not None:
+                direction = "OFF <" if ma.state else "ON >"
+                line += f" (전환가: {direction} ${ma.trigger:.1f})"
+            report.append(line)
+
+    return "\n".join(report)
+
+
+# --- [JSON / CSV] ---
+
+def render_json(result):
+    return json.dumps(result.to_dict(), ensure_ascii=False, indent=2)
+
+
+CSV_COLUMNS = [
+    'date', 'strategy', 'asset', 'signal_ticker', 'window', 'state', 'yesterday_state', 'price', 'ma',
+    'disparity', 'trigger', 'score', 'weight', 'yesterday_weight', 'active_bond', 'rebalance',
+]
+
+
+def csv_rows(result):
+    """전략 자산 × MA 윈도우 한 행씩 + 현금 한 행 (CSV_COLUMNS 순서의 dict)."""
+    common = {'date': result.date.isoformat(), 'strategy': result.strategy,
+              'active_bond': result.active_bond, 'rebalance': int(result.rebalance)}
+    rows = []
+    for asset in result.assets:
+        allocation = result.allocation(asset.asset)
+        for ma in asset.windows:
+            rows.append({
+                **common, 'asset': asset.asset, 'signal_ticker': asset.signal_ticker, 'window': ma.window,
+                'state': int(ma.state), 'yesterday_state': int(ma.yesterday_state),
+                'price': asset.price, 'ma': ma.ma, 'disparity': ma.disparity,
+                'trigger': '' if ma.trigger is None else ma.trigger, 'score': asset.score,
+                'weight': allocation.weight, 'yesterday_weight': allocation.yesterday_weight,
+            })
+    cash = result.allocation('CASH')
+    rows.append({**common, 'asset': 'CASH', 'weight': cash.weight, 'yesterday_weight': cash.yesterday_weight})
+    return [{column: row.get(column, '') for column in CSV_COLUMNS} for row in rows]
+
+
+def render_csv(result, header=True):
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=CSV_COLUMNS, lineterminator='\n')
+    if header:
+        writer.writeheader()
+    writer.writerows(csv_rows(result))
+    return out.getvalue()
+
+
+# --- [HTML] ---
+
+HTML_STYLE = (
+    "body{font-family:sans-serif;max-width:760px;margin:2em auto;color:#222}"
+    "table{border-collapse:collapse;margin:.5em 0 1.5em}"
+    "th,td{border:1px solid #ccc;padding:.3em .7em;text-align:right}"
+    "th:first-child,td:first-child{text-align:left}"
+    ".on{color:#1a7f37}.off{color:#cf222e}.changed{font-weight:bold}"
+    ".badge{display:inline-block;padding:.3em .8em;border-radius:4px;color:#fff}"
+    ".trade{background:#cf222e}.hold{background:#1a7f37}.warn{color:#9a6700}"
+)
+
+
+def _table(headers, rows):
+    head = "".join(f"<th>{html.escape(str(h))}</th>" for h in headers)
+    body = "".join(f"<tr{attrs}>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>" for attrs, cells in rows)
+    return f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>"
+
+
+def render_html(result):
+    esc = html.escape
+    parts = [f"<h1>{esc(result.title)}</h1>", f"<p>{result.date.strftime('%Y-%m-%d %A')} 마감 기준</p>"]
+    if result.stale:
+        parts.append("<p class=\"warn\">데이터 확인 필요 (다운로드 실패/누락, 마지막 값 사용): " + esc(", ".join(
+            f"{ticker} {day.isoformat() if day is not None else '없음'}" for ticker, day in result.stale.items()))
+            + "</p>")
+    if result.rebalance:
+        parts.append("<p><span class=\"badge trade\">리밸런싱: 매매 필요</span></p>")
+    else:
+        parts.append("<p><span class=\"badge hold\">리밸런싱: 매매 불필요</span></p>")
+
+    parts.append("<h2>목표 비중</h2>")
+    labels = {'Tactical_Bond': f"{result.active_bond} (채권)", 'CASH': "현금"}
+    parts.append(_table(['자산', '어제', '오늘', '변경폭'], [
+        (' class="changed"' if a.changed else '',
+         [esc(labels.get(a.asset, a.asset)), f"{a.yesterday_weight:.1%}", f"{a.weight:.1%}", f"{a.delta:+.1%}"])
+        for a in result.allocations
+    ]))
+
+    parts.append("<h2>전일 시장 현황</h2>")
+    price_rows = [('', [esc(line.ticker), f"${line.price:.2f}", f"{line.change:+.2%}"]) for line in result.prices]
+    if result.rate_switch is not None:
+        price_rows.append(('', ["^TNX", f"{result.rate:.2f}",
+                                f"전환 {result.rate_switch:.2f} → {esc(result.other_bond)}"]))
+    parts.append(_table(['티커', '종가', '증감'], price_rows))
+
+    parts.append(f"<h2>MA 신호 (이격도 ±{result.n_band:.1%})</h2>")
+    for asset in result.assets:
+        name = asset.asset if asset.signal_ticker == asset.asset else f"{asset.asset} → {asset.signal_ticker}"
+        parts.append(f"<h3>{esc(name)}: {asset.score}/{len(asset.windows)}</h3>")
+        parts.append(_table(['MA', '상태', '어제', 'MA 값', '이격도', '전환가'], [
+            ('', [f"{ma.window}일",
+                  f"<span class=\"{'on' if ma.state else 'off'}\">{'ON' if ma.state else 'OFF'}</span>",
+                  'ON' if ma.yesterday_state else 'OFF', f"{ma.ma:.2f}", f"{ma.disparity:+.1%}",
+                  '' if ma.trigger is None else f"{'OFF <' if ma.state else 'ON >'} ${ma.trigger:.2f}"])
+            for ma in asset.windows
+        ]))
+
+    return ("<!DOCTYPE html>\n<html lang=\"ko\"><head><meta charset=\"utf-8\">"
+            f"<title>{esc(result.title)} {result.date.isoformat()}</title><style>{HTML_STYLE}</style></head>\n"
+            "<body>\n" + "\n".join(parts) + "\n</body></html>\n")
+
+
+RENDERERS = {'telegram': render_telegram, 'json': render_json, 'csv': render_csv, 'html': render_html}
+EXTENSIONS = {'telegram': 'md', 'json': 'json', 'csv': 'csv', 'html': 'html'}
+
+
+def write_outputs(result, out_dir, formats=('telegram', 'json', 'csv', 'html')):
+    """out_dir/<전략>_<날짜>.<확장자> 로 저장합니다. 반환: {형식: 경로}."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {}
+    for fmt in formats:
+        path = os.path.join(out_dir, f"{result.strategy}_{result.date.isoformat()}.{EXTENSIONS[fmt]}")
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            f.write(RENDERERS[fmt](result))
+        paths[fmt] = path
+    return paths
@@ -0,0 +1,95 @@
+import numpy as np
+
+# --- [이동평균 / 이격도 밴드 일괄 계산] ---
+# (티커, 시간) 2차원 배열에 대해 모든 윈도우의 이동평균을 누적합(cumsum) 한 번으로 계산합니다.
+# 결과는 (티커, 윈도우, 시간) 배열이며, 밴드는 하나의 버퍼 안에서 곱셈 한 번으로 만듭니다.
+#
+# method:
+#   'cumsum' : 전체 구간 누적합 1회 (가장 빠름). 행마다 첫 유효값을 빼고 누적하여 오차를 줄임
+#   'stable' : 블록 단위로 누적합을 다시 시작(re-anchor)하여, 오차가 이력 길이와 무관하게
+#              (블록 + 윈도우) 길이로 제한됨. 수십 년 × 수천 티커 같은 긴 이력용
+#
+# pandas rolling(window).mean() 과 같이 윈도우 안에 NaN 이 있거나 값이 부족하면 NaN 입니다.
+
+STABLE_BLOCK = 4096
+
+
+def _prepare(values):
+    values = np.asarray(values, dtype=np.float64)
+    squeeze = values.ndim == 1
+    if squeeze:
+        values = values[None, :]
+    nan_mask = np.isnan(values)
+    # 행별 기준값(첫 유효값)을 빼서 누적합의 크기를 줄임
+    first_valid = np.where(nan_mask.all(axis=1), 0, np.argmax(~nan_mask, axis=1))
+    offset = values[np.arange(values.shape[0]), first_valid]
+    offset = np.where(np.isnan(offset), 0.0, offset)[:, None]
+    centered = np.where(nan_mask, 0.0, values - offset)
+    return centered, nan_mask, offset, squeeze
+
+
+def _window_sums(centered, nan_mask, windows, out):
+    n, t = centered.shape
+    csum = np.zeros((n, t + 1))
+    np.cumsum(centered, axis=1, out=csum[:, 1:])
+    ccount = np.zeros((n, t + 1), dtype=np.int64)
+    np.cumsum(nan_mask, axis=1, out=ccount[:, 1:])
+
+    for w_idx, window in enumerate(windows):
+        dest = out[:, w_idx, :]
+        dest[:, :window - 1] = np.nan
+        if window > t:
+            dest[:] = np.nan
+            continue
+        np.subtract(csum[:, window:], csum[:, :-window], out=dest[:, window - 1:])
+        has_nan = (ccount[:, window:] - ccount[:, :-window]) > 0
+        dest[:, window - 1:][has_nan] = np.nan
+
+
+def _window_sums_stable(centered, nan_mask, windows, out, block):
+    n, t = centered.shape
+    for w_idx, window in enumerate(windows):
+        dest = out[:, w_idx, :]
+        dest[:] = np.nan
+        if window > t:
+            continue
+        for start in range(window - 1, t, block):
+            stop = min(start + block, t)
+            lo = start - window + 1
+            # [lo, stop) 구간만 누적 -> 오차가 (block + window) 길이로 제한
+            seg = centered[:, lo:stop]
+            csum = np.zeros((n, seg.shape[1] + 1))
+            np.cumsum(seg, axis=1, out=csum[:, 1:])
+            count = np.zeros((n, seg.shape[1] + 1), dtype=np.int64)
+            np.cumsum(nan_mask[:, lo:stop], axis=1, out=count[:, 1:])
+            np.subtract(csum[:, window:], csum[:, :-window], out=dest[:, start:stop])
+            has_nan = (count[:, window:] - count[:, :-window]) > 0
+            dest[:, start:stop][has_nan] = np.nan
+
+
+def rolling_means(values, windows, method='cumsum', block=STABLE_BLOCK, out=None):
+    """(N, T) 또는 (T,) 값의 이동평균을 (N, W, T) 또는 (W, T) 로 반환합니다."""
+    centered, nan_mask, offset, squeeze = _prepare(values)
+    n, t = centered.shape
+    if out is None:
+        out = np.empty((n, len(windows), t), dtype=np.float64)
+
+    if method == 'stable':
+        _window_sums_stable(centered, nan_mask, windows, out, block)
+    elif method == 'cumsum':
+        _window_sums(centered, nan_mask, windows, out)
+    else:
+        raise ValueError(f"지원하지 않는 method 입니다: {method}")
+
+    out /= np.asarray(windows, dtype=np.float64)[None, :, None]
+    out += offset[:, :, None]
+    return out[0] if squeeze else out
+
+
+def band_arrays(ma, n_band, out=None):
+    """이격도 밴드 (upper, lower). 하나의 (2, ...) 버퍼 안의 뷰로 반환합니다."""
+    if out is None:
+        out = np.empty((2,) + ma.shape, dtype=np.float64)
+    np.multiply(ma, 1.0 + n_band, out=out[0])
+    np.multiply(ma, 1.0 - n_band, out=out[1])
+    return out[0], out[1]
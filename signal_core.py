@@ -0,0 +1,349 @@
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+
+import rolling_stats
+from bond_modes import BOND_MODES
+from flip_triggers import flip_triggers
+from hysteresis_engine import hysteresis_states, scores_to_scalars
+from metrics import session, stage
+from report_render import render_telegram
+from signal_result import Allocation, AssetSignal, MAState, PriceLine, SignalResult
+from state_snapshot import (
+    advance_snapshot, build_snapshot, load_snapshot, params_fingerprint,
+    resume_position, save_snapshot, snapshot_path,
+)
+
+# --- [공통 신호 엔진] ---
+# 두 전략 변형(daily_signal_generator.py / daily_signal_generator_채권실물자산.py)이
+# 다운로드, ffill, MA/밴드, 이격도 상태, 리포트 생성을 공유합니다.
+# 변형별 차이는 strategy 설정 dict 와 bond_mode(bond_modes.BOND_MODES) 로만 표현됩니다.
+#
+# strategy 설정 키:
+#   name, title, bond_mode, base_weights, n_band, ma_windows, scalar_map,
+#   rate_ma_window, rising_bond, falling_bond
+#
+# 이 모듈은 pandas / yfinance 를 직접 import 하지 않습니다 (DataFrame 은 인자로만 받음).
+# 스냅샷 재개와 리포트 생성은 NumPy 만으로 동작하므로 fast_start 경로에서 그대로 사용됩니다.
+
+RATE_TICKER = '^TNX'
+ROLLING_METHOD = os.environ.get('TAA_ROLLING_METHOD', 'cumsum') # 'stable': 긴 이력용 (rolling_stats 참고)
+STRATEGY_TICKERS = ['QQQ', 'GLD', 'Tactical_Bond']
+
+
+def strategy_tickers(strategy):
+    return ['QQQ', 'GLD', strategy['rising_bond'], strategy['falling_bond'], RATE_TICKER]
+
+
+def load_market_data(tickers, period="400d", provider=None, status=None):
+    """공급자(기본: yfinance + 로컬 캐시)에서 종가를 받아 ffill 합니다.
+
+    status 에 dict 를 넘기면 공급자 이름, 기준일, 오래된(stale) 티커를 기록합니다.
+    """
+    if provider is None:
+        from market_data import default_provider
+        provider = default_provider()
+    with stage('download') as m:
+        market = provider.get_close(tickers, period)
+        close_df = market['close']
+        m['rows'] = len(close_df)
+
+    if close_df.empty:
+        raise ValueError("데이터 다운로드에 실패했습니다.")
+    missing = [ticker for ticker in tickers if ticker not in close_df.columns]
+    if missing:
+        # 다운로드도 캐시도 없는 티커는 신호를 계산할 수 없음
+        raise ValueError(f"데이터 다운로드에 실패했습니다 (캐시 없음): {', '.join(missing)}")
+
+    if market['stale']:
+        print(f"오래된 데이터 ({market['source']}): "
+              + ", ".join(f"{ticker}={date.date() if date is not None else '없음'}"
+                          for ticker, date in market['stale'].items()), file=sys.stderr)
+    if status is not None:
+        status.update({key: market[key] for key in ('source', 'as_of', 'stale')})
+
+    with stage('ffill', rows=len(close_df)):
+        return close_df.ffill() # 중간에 빈 데이터(휴일 등)를 채움
+
+
+def rolling_means(values, windows, cache=None, key=None):
+    """(T,) 배열의 이동평균을 (W, T) 로 반환합니다. cache 가 있으면 (key, window) 별로 재사용."""
+    return cached_rolling_means(np.asarray(values)[None, :], [key], windows, cache)[0]
+
+
+def cached_rolling_means(values, keys, windows, cache=None):
+    """(S, T) 배열의 이동평균 (S, W, T). 캐시에 없는 (key, window) 만 누적합 한 번으로 일괄 계산."""
+    means = np.empty((values.shape[0], len(windows), values.shape[1]), dtype=np.float64)
+    missing_rows = []
+    for s_idx, key in enumerate(keys):
+        if cache is not None and all((key, window) in cache for window in windows):
+            for w_idx, window in enumerate(windows):
+                means[s_idx, w_idx] = cache[(key, window)]
+        else:
+            missing_rows.append(s_idx)
+
+    if missing_rows:
+        means[missing_rows] = rolling_stats.rolling_means(values[missing_rows], windows, method=ROLLING_METHOD)
+        if cache is not None:
+            for s_idx in missing_rows:
+                for w_idx, window in enumerate(windows):
+                    cache.setdefault((keys[s_idx], window), means[s_idx, w_idx])
+    return means
+
+
+def signal_series(all_prices_df, strategy, ma_cache=None):
+    """금리 추세(is_rising)와 bond_mode 에 따른 MA 대상 시리즈 (S, T) 를 구성합니다."""
+    rate_ma_window = strategy['rate_ma_window']
+
+    # --- Tactical_Bond (IEF/TLT) 선택: ^TNX 200일 MA ---
+    rate_prices = all_prices_df[RATE_TICKER].to_numpy(dtype=np.float64)
+    rate_ma = rolling_means(rate_prices, [rate_ma_window], ma_cache, RATE_TICKER)[0]
+    with np.errstate(invalid='ignore'):
+        is_rising = rate_prices > rate_ma
+
+    closes = {
+        ticker: all_prices_df[ticker].to_numpy(dtype=np.float64)
+        for ticker in ['QQQ', 'GLD', strategy['rising_bond'], strategy['falling_bond']]
+    }
+    names, cache_keys, prices, active = BOND_MODES[strategy['bond_mode']]['inputs'](
+        closes, is_rising, strategy['rising_bond'], strategy['falling_bond']
+    )
+    # 금리 추세에 따라 만들어진 파생 시리즈는 금리 MA 윈도우별로 캐시
+    cache_keys = [key if key in closes else f"{key}@{rate_ma_window}" for key in cache_keys]
+    return {
+        'names': names,
+        'cache_keys': cache_keys,
+        'prices': prices,
+        'active': active,
+        'is_rising': is_rising,
+        'rate_prices': rate_prices,
+        'rate_ma': rate_ma,
+    }
+
+
+def state_history(all_prices_df, strategy, ma_cache=None):
+    """전체 구간을 처음부터 다시 계산합니다 (시간축 배열).
+
+    ma_cache 를 여러 전략이 공유하면 같은 (시리즈, 윈도우) 이동평균은 한 번만 계산됩니다.
+    """
+    ma_windows = strategy['ma_windows']
+    with stage('prepare', rows=len(all_prices_df)):
+        series = signal_series(all_prices_df, strategy, ma_cache)
+        prices = series['prices']
+
+    # --- [3. 이격도(Hysteresis) 상태 계산] ---
+    with stage('rolling_ma', rows=prices.shape[1]):
+        ma = cached_rolling_means(prices, series['cache_keys'], ma_windows, ma_cache)
+    with stage('hysteresis', rows=prices.shape[1]):
+        upper, lower = rolling_stats.band_arrays(ma, strategy['n_band'])
+        states = hysteresis_states(prices, upper, lower, max(ma_windows) - 1, active=series['active'])
+
+    return {
+        'names': series['names'],
+        'dates': list(all_prices_df.index),
+        'prices': prices,
+        'rate_prices': series['rate_prices'],
+        'rate_ma': series['rate_ma'],
+        'ma': ma,
+        'ma_last': ma[:, :, -1],
+        'states': states,
+        'is_rising': series['is_rising'],
+    }
+
+
+def strategy_scalars(states, is_rising, strategy):
+    """(3, T) 전략 자산 스케일러 (SCALAR_MAP 적용)."""
+    scores = BOND_MODES[strategy['bond_mode']]['scores'](states.sum(axis=1), is_rising)
+    return scores_to_scalars(scores, strategy['scalar_map'], len(strategy['ma_windows']))
+
+
+def needs_rebalance(scalars):
+    """(3, T) 스케일러의 마지막 두 봉이 다르면 True (NaN 끼리는 같은 값으로 봄)."""
+    return not np.array_equal(scalars[:, -1], scalars[:, -2], equal_nan=True)
+
+
+def strategy_fingerprint(strategy):
+    # 스냅샷 상태에 영향을 주는 파라미터만 포함 (BASE_WEIGHTS / SCALAR_MAP 은 제외)
+    return params_fingerprint({
+        'bond_mode': strategy['bond_mode'], 'tickers': strategy_tickers(strategy), 'n_band': strategy['n_band'],
+        'ma_windows': strategy['ma_windows'], 'rate_ma_window': strategy['rate_ma_window'],
+    })
+
+
+def advance_signal(all_prices_df, strategy, snapshot=None, ma_cache=None):
+    """스냅샷(dict 또는 None)이 유효하면 새 봉만, 아니면 전체 구간을 계산합니다.
+
+    반환: (signal, 갱신된 스냅샷 또는 None). 마지막 두 봉이 오늘/어제.
+    """
+    resume_k, snapshot = resume_position(snapshot, all_prices_df, strategy['ma_windows'], strategy['bond_mode'],
+                                         strategy['rising_bond'], strategy['falling_bond'])
+    if resume_k is not None:
+        with stage('snapshot_advance', rows=len(all_prices_df) - resume_k - 1):
+            signal, snapshot = advance_snapshot(
+                snapshot, all_prices_df.iloc[resume_k + 1:], strategy['ma_windows'], strategy['rate_ma_window'],
+                strategy['n_band'], strategy['bond_mode'], strategy['rising_bond'], strategy['falling_bond'],
+            )
+    else:
+        signal = state_history(all_prices_df, strategy, ma_cache)
+        snapshot = build_snapshot(
+            strategy_fingerprint(strategy), signal['dates'], signal['prices'], signal['rate_prices'],
+            signal['states'], signal['is_rising'], strategy['ma_windows'], strategy['rate_ma_window'],
+            {ticker: all_prices_df[ticker].to_numpy(dtype=np.float64) for ticker in strategy_tickers(strategy)},
+        )
+
+    if snapshot is not None:
+        signal['triggers'] = flip_triggers(snapshot, strategy)
+    return signal, snapshot
+
+
+def compute_signal(all_prices_df, strategy, ma_cache=None, use_snapshot=True):
+    """디스크 스냅샷에서 이어서 계산하고 스냅샷 / 신호 저널을 갱신합니다 (advance_signal 참고)."""
+    snapshot_file = snapshot_path(strategy['name'])
+    with stage('snapshot_load'):
+        snapshot = load_snapshot(snapshot_file, strategy_fingerprint(strategy)) if use_snapshot else None
+
+    signal, snapshot = advance_signal(all_prices_df, strategy, snapshot, ma_cache)
+    if use_snapshot and snapshot is not None:
+        with stage('snapshot_save'):
+            save_snapshot(snapshot_file, snapshot)
+    if use_snapshot:
+        from signal_journal import record_signal
+        record_signal(signal, strategy)
+    return signal
+
+
+# --- [4. 최종 비중 계산 / 5. 알림 메시지 생성] ---
+
+def build_result(signal, strategy, stale=None):
+    """신호 dict -> SignalResult (비중, 변경폭, 윈도우별 상태/이격도, 가격, 채권 종류).
+
+    stale: load_market_data 가 기록한 {ticker: 마지막 유효 날짜} (다운로드 실패/누락 티커 표시용).
+    """
+    base_weights = strategy['base_weights']
+    ma_windows = strategy['ma_windows']
+    is_synthetic = strategy['bond_mode'] == 'synthetic'
+    names = signal['names']
+
+    ma_states = signal['states'][:, :, -2:]
+    scalars = strategy_scalars(ma_states, signal['is_rising'][-2:], strategy)
+    changed = scalars[:, -1] != scalars[:, -2]
+
+    # 오늘 / 어제 비중 (현금 = 나머지)
+    invested = np.array([base_weights[ticker] for ticker in STRATEGY_TICKERS])[:, None] * scalars
+    cash = 1.0 - invested.sum(axis=0)
+    allocations = tuple(
+        Allocation(ticker, float(invested[i, -1]), float(invested[i, -2]), bool(changed[i]))
+        for i, ticker in enumerate(STRATEGY_TICKERS)
+    ) + (Allocation('CASH', float(cash[-1]), float(cash[-2]), bool(cash[-1] != cash[-2])),)
+
+    # 채권 종류 확인
+    is_rising = bool(signal['is_rising'][-1])
+    current_bond_ticker = strategy['rising_bond'] if is_rising else strategy['falling_bond']
+
+    # 전일 종가 및 증감율 (채권: 가상 가격(synthetic) 또는 실제 자산(real) 기준)
+    price_last = signal['prices'][:, -1]
+    price_change = price_last / signal['prices'][:, -2] - 1.0
+    bond_key = 'Tactical_Bond' if is_synthetic else current_bond_ticker
+    prices = tuple(
+        PriceLine(ticker, key, float(price_last[names.index(key)]), float(price_change[names.index(key)]))
+        for ticker, key in (('QQQ', 'QQQ'), ('GLD', 'GLD'), (current_bond_ticker, bond_key))
+    )
+
+    # MA 신호 상세 (real 모드의 Tactical_Bond 는 실제 보유 채권의 신호)
+    triggers = signal.get('triggers')
+    assets = []
+    for i, ticker in enumerate(STRATEGY_TICKERS):
+        signal_ticker = current_bond_ticker if ticker == 'Tactical_Bond' and not is_synthetic else ticker
+        t_idx = names.index(signal_ticker)
+        windows = []
+        for w_idx, window in enumerate(ma_windows):
+            ma_val = float(signal['ma_last'][t_idx, w_idx])
+            trigger = None if triggers is None else float(triggers['trigger'][t_idx, w_idx])
+            windows.append(MAState(
+                window=int(window),
+                state=bool(ma_states[t_idx, w_idx, -1] == 1.0),
+                yesterday_state=bool(ma_states[t_idx, w_idx, -2] == 1.0),
+                ma=ma_val,
+                disparity=float(price_last[t_idx] / ma_val - 1.0),
+                trigger=trigger if trigger is not None and np.isfinite(trigger) else None,
+            ))
+        assets.append(AssetSignal(
+            asset=ticker, signal_ticker=signal_ticker, price=float(price_last[t_idx]),
+            score=sum(ma.state for ma in windows), scalar=float(scalars[i, -1]),
+            yesterday_scalar=float(scalars[i, -2]), windows=tuple(windows),
+        ))
+
+    rate_switch = None
+    if triggers is not None and np.isfinite(triggers['rate_switch']):
+        rate_switch = float(triggers['rate_switch'])
+
+    day = signal['dates'][-1]
+    tickers = strategy_tickers(strategy)
+    return SignalResult(
+        strategy=strategy['name'],
+        title=strategy['title'],
+        date=day.date() if isinstance(day, datetime) else day,
+        bond_mode=strategy['bond_mode'],
+        n_band=float(strategy['n_band']),
+        ma_windows=tuple(int(window) for window in ma_windows),
+        rising_bond=strategy['rising_bond'],
+        falling_bond=strategy['falling_bond'],
+        is_rising=is_rising,
+        # 비중 변경 여부 (NaN 스케일러끼리는 같은 값으로 봄)
+        rebalance=needs_rebalance(scalars),
+        allocations=allocations,
+        prices=prices,
+        assets=tuple(assets),
+        rate=None if rate_switch is None else float(triggers['rate']),
+        rate_switch=rate_switch,
+        stale={
+            ticker: day.date() if isinstance(day, datetime) else day
+            for ticker, day in (stale or {}).items() if ticker in tickers
+        },
+    )
+
+
+def build_report(signal, strategy, stale=None):
+    """텔레그램 리포트 문자열 (build_result + report_render.render_telegram)."""
+    return render_telegram(build_result(signal, strategy, stale))
+
+
+def run_strategies(strategies, period="400d", provider=None):
+    """여러 전략 변형을 한 번의 다운로드와 공유 이동평균으로 계산합니다. 반환: [리포트, ...]"""
+    if provider is None:
+        # 모든 변형의 캐시/스냅샷이 최신이면 다운로드 없이 NumPy 경로로 처리
+        from fast_start import fast_report
+        reports = [fast_report(strategy) for strategy in strategies]
+        if all(report is not None for report in reports):
+            return reports
+
+    tickers = []
+    for strategy in strategies:
+        tickers += [ticker for ticker in strategy_tickers(strategy) if ticker not in tickers]
+    status = {}
+    all_prices_df = load_market_data(tickers, period, provider, status)
+
+    ma_cache = {}
+    reports = []
+    for strategy in strategies:
+        signal = compute_signal(all_prices_df, strategy, ma_cache)
+        with stage('report'):
+            reports.append(build_report(signal, strategy, status['stale']))
+    return reports
+
+
+# --- [6. 메인 실행: 등록된 모든 변형을 한 번에] ---
+if __name__ == "__main__":
+    try:
+        import daily_signal_generator
+        import daily_signal_generator_채권실물자산
+
+        with session('signal_core'):
+            reports = run_strategies([daily_signal_generator.STRATEGY, daily_signal_generator_채권실물자산.STRATEGY])
+        print("\n\n".join(reports))
+
+    except Exception as e:
+        print(f"오류가 발생했습니다: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,287 @@
+import argparse
+import json
+import os
+import signal
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from fast_start import latest_session
+from report_render import RENDERERS
+from signal_core import advance_signal, build_result, load_market_data, strategy_fingerprint, strategy_tickers
+from signal_journal import record_signal
+from state_snapshot import load_snapshot, save_snapshot, snapshot_path
+
+# --- [상주 데몬 모드 (로컬 HTTP / Unix 소켓 API)] ---
+# 실행할 때마다 import + 400일 다운로드 + 계산을 반복하는 대신, 프로세스를 띄워 둔 채
+# 전략별 스냅샷(이동평균 누적합, 가격 꼬리, MA 상태)과 최신 SignalResult 를 메모리에 유지합니다.
+#   * 갱신: interval 초마다 데이터의 마지막 날짜가 최근 장 마감(fast_start.latest_session)보다 이른지 확인하고,
+#     이르면 모든 전략의 티커를 한 번에 받아(가격 캐시 증분) 새 봉만큼 스냅샷을 진행
+#     (공급자가 아직 종가를 내지 않았으면 다음 주기에 다시 확인)
+#   * 동시에 여러 소비자가 POST /refresh 를 보내도 다운로드는 한 번 (진행 중인 갱신을 기다림)
+#   * 조회는 메모리의 결과만 읽으므로 ms 단위 (렌더링 결과도 형식별로 캐시)
+#   * 갱신마다 디스크 스냅샷 / 신호 저널도 기록하므로 일일 스크립트와 같은 상태를 공유
+#
+# API (strategy 생략 시 첫 전략):
+#   GET  /health                                  상태, 기준일, 마지막 갱신 / 오류
+#   GET  /report?strategy=..&format=telegram      telegram | json | csv | html
+#   GET  /weights?strategy=..                     목표 비중 (어제 -> 오늘), 실제 보유 티커 비중
+#   GET  /states?strategy=..                      윈도우별 ON/OFF, 이격도, 전환가, ^TNX
+#   POST /refresh                                 즉시 갱신
+#
+#   python signal_daemon.py --port 8766
+#   python signal_daemon.py --unix /tmp/taa.sock   (curl --unix-socket /tmp/taa.sock http://localhost/weights)
+
+CONTENT_TYPES = {
+    'telegram': 'text/markdown; charset=utf-8',
+    'json': 'application/json; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+    'html': 'text/html; charset=utf-8',
+}
+
+
+class SignalService:
+    """전략별 스냅샷과 최신 결과를 메모리에 유지하고 증분 갱신합니다."""
+
+    def __init__(self, strategies, provider=None, period="400d", interval=300.0):
+        self.strategies = {strategy['name']: strategy for strategy in strategies}
+        self.default = strategies[0]['name']
+        self.provider = provider
+        self.period = period
+        self.interval = interval
+        # 디스크 스냅샷으로 시작 (재시작 직후에도 새 봉만 계산)
+        self.snapshots = {
+            name: load_snapshot(snapshot_path(name), strategy_fingerprint(strategy))
+            for name, strategy in self.strategies.items()
+        }
+        self.current = {} # name -> {'result': SignalResult, 'dict': to_dict(), 'rendered': {형식: 문자열}}
+        self.close_df = None
+        self.generation = 0
+        self.checked_session = None # 마지막으로 받은 데이터의 마지막 날짜 (datetime64[D])
+        self.last_refresh = None
+        self.refresh_ms = None
+        self.last_error = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def tickers(self):
+        tickers = []
+        for strategy in self.strategies.values():
+            tickers += [ticker for ticker in strategy_tickers(strategy) if ticker not in tickers]
+        return tickers
+
+    def needs_refresh(self, now=None):
+        """받은 데이터가 최근 장 마감일보다 이르면 True (공급자 미반영 / 휴장일에는 매 주기 다시 확인)."""
+        return self.checked_session is None or latest_session(now) > self.checked_session
+
+    def refresh(self, force=False, after=None):
+        """모든 전략을 한 번의 다운로드로 갱신합니다. 반환: 실제로 갱신했는지 여부.
+
+        after: 호출 시점의 generation. 잠금을 기다리는 동안 다른 갱신이 끝났으면 다시 받지 않음.
+        force 가 아니면 받은 데이터에 새 봉이 없을 때 다시 계산하지 않고 False 를 반환합니다.
+        실패하면 이전 결과를 그대로 유지하고 예외를 다시 냅니다.
+        """
+        with self._refresh_lock:
+            if after is not None and self.generation > after:
+                return False
+            if not force and not self.needs_refresh():
+                return False
+
+            started = time.perf_counter()
+            try:
+                status = {}
+                close_df = load_market_data(self.tickers(), self.period, self.provider, status)
+                data_day = np.datetime64(close_df.index[-1], 'D')
+                if not force and self.current and data_day == self.checked_session:
+                    return False # 공급자가 아직 새 종가를 내지 않음
+                ma_cache = {}
+                snapshots, current = {}, {}
+                for name, strategy in self.strategies.items():
+                    signal, snapshot = advance_signal(close_df, strategy, self.snapshots[name], ma_cache)
+                    if snapshot is not None:
+                        save_snapshot(snapshot_path(name), snapshot)
+                    record_signal(signal, strategy)
+                    result = build_result(signal, strategy, status['stale'])
+                    snapshots[name] = snapshot
+                    current[name] = {'result': result, 'dict': result.to_dict(), 'rendered': {}}
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+                raise
+
+            # 참조만 교체 (조회 측은 잠금 없이 이전 또는 새 상태 중 하나를 읽음)
+            self.close_df, self.snapshots, self.current = close_df, snapshots, current
+            self.checked_session = data_day
+            self.generation += 1
+            self.last_refresh = time.time()
+            self.refresh_ms = (time.perf_counter() - started) * 1000.0
+            self.last_error = None
+            return True
+
+    def render(self, name, fmt):
+        entry = self.current[name]
+        text = entry['rendered'].get(fmt)
+        if text is None:
+            text = entry['rendered'][fmt] = RENDERERS[fmt](entry['result'])
+        return text
+
+    def weights(self, name):
+        data = self.current[name]['dict']
+        return {key: data[key] for key in ('strategy', 'date', 'rebalance', 'active_bond', 'holdings', 'allocations')}
+
+    def states(self, name):
+        data = self.current[name]['dict']
+        return {key: data[key] for key in ('strategy', 'date', 'n_band', 'ma_windows', 'is_rising', 'active_bond',
+                                           'rate', 'rate_switch', 'assets')}
+
+    def health(self):
+        return {
+            'status': 'ok' if self.current and self.last_error is None else ('degraded' if self.current else 'starting'),
+            'generation': self.generation,
+            'strategies': {name: entry['result'].date.isoformat() for name, entry in self.current.items()},
+            'stale': sorted({ticker for entry in self.current.values() for ticker in entry['result'].stale}),
+            'rows': 0 if self.close_df is None else len(self.close_df),
+            'last_refresh': None if self.last_refresh is None else time.strftime(
+                '%Y-%m-%dT%H:%M:%SZ', time.gmtime(self.last_refresh)),
+            'refresh_ms': None if self.refresh_ms is None else round(self.refresh_ms, 1),
+            'last_error': self.last_error,
+        }
+
+    def run_scheduler(self):
+        """interval 초마다 새 장 마감 여부를 확인하고 필요하면 갱신합니다 (stop() 까지)."""
+        while not self._stop.wait(self.interval):
+            try:
+                if self.refresh():
+                    print(f"... 갱신 완료: {self.health()['strategies']} ...", file=sys.stderr)
+            except Exception as e:
+                print(f"갱신 실패 (이전 결과 유지): {e}", file=sys.stderr)
+
+    def stop(self):
+        self._stop.set()
+
+
+def make_handler(service):
+    class SignalHandler(BaseHTTPRequestHandler):
+        def _send(self, status, body, content_type=CONTENT_TYPES['json']):
+            body = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def _json(self, status, payload):
+            self._send(status, json.dumps(payload, ensure_ascii=False))
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == '/health':
+                return self._json(200, service.health())
+            if url.path not in ('/report', '/weights', '/states'):
+                return self._json(404, {'error': f"알 수 없는 경로: {url.path}"})
+
+            current = service.current
+            name = query.get('strategy', [service.default])[0]
+            if not current:
+                return self._json(503, {'error': "아직 계산된 신호가 없습니다.", 'last_error': service.last_error})
+            if name not in current:
+                return self._json(404, {'error': f"알 수 없는 전략: {name}", 'strategies': list(current)})
+
+            if url.path == '/report':
+                fmt = query.get('format', ['telegram'])[0]
+                if fmt not in RENDERERS:
+                    return self._json(400, {'error': f"지원하지 않는 형식: {fmt}", 'formats': list(RENDERERS)})
+                return self._send(200, service.render(name, fmt), CONTENT_TYPES[fmt])
+            if url.path == '/weights':
+                return self._json(200, service.weights(name))
+            return self._json(200, service.states(name))
+
+        def do_POST(self):
+            if urlparse(self.path).path != '/refresh':
+                return self._json(404, {'error': f"알 수 없는 경로: {self.path}"})
+            generation = service.generation
+            try:
+                refreshed = service.refresh(force=True, after=generation)
+            except Exception as e:
+                return self._json(502, {'error': f"갱신 실패 (이전 결과 유지): {e}"})
+            return self._json(200, {'refreshed': refreshed, **service.health()})
+
+        def log_message(self, format, *args):
+            pass # 요청마다 로그를 남기지 않음
+
+    return SignalHandler
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(service, host='127.0.0.1', port=8766, unix_path=None):
+    """HTTP(host:port) 또는 Unix 소켓 서버를 만듭니다. server.serve_forever() 로 실행."""
+    handler = make_handler(service)
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.remove(unix_path) # 이전 실행이 남긴 소켓 파일
+        return UnixHTTPServer(unix_path, handler)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def _terminate(signum, frame):
+    raise KeyboardInterrupt
+
+
+# --- [메인 실행] ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adaptive-Hysteresis-TAA 신호 데몬 (로컬 API)")
+    parser.add_argument('--mode', choices=['synthetic', 'real', 'both'], default='both')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--unix', help="TCP 대신 Unix 소켓 경로")
+    parser.add_argument('--interval', type=float, default=300.0, help="새 장 마감 확인 주기 (초)")
+    parser.add_argument('--period', default='400d')
+    args = parser.parse_args()
+
+    try:
+        strategies = []
+        if args.mode in ('synthetic', 'both'):
+            import daily_signal_generator
+            strategies.append(daily_signal_generator.STRATEGY)
+        if args.mode in ('real', 'both'):
+            import daily_signal_generator_채권실물자산
+            strategies.append(daily_signal_generator_채권실물자산.STRATEGY)
+
+        from market_data import default_provider
+        service = SignalService(strategies, default_provider(), args.period, args.interval)
+        try:
+            service.refresh(force=True)
+        except Exception as e:
+            print(f"초기 계산 실패 ({args.interval:.0f}초 후 재시도): {e}", file=sys.stderr)
+        threading.Thread(target=service.run_scheduler, daemon=True).start()
+
+        server = make_server(service, args.host, args.port, args.unix)
+        where = args.unix or f"http://{args.host}:{server.server_address[1]}"
+        signal.signal(signal.SIGTERM, _terminate) # 서비스 관리자의 종료도 Ctrl+C 와 같이 정리
+        print(f"... 신호 데몬: {where} (전략 {len(strategies)}개, 확인 주기 {args.interval:.0f}초) ...", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            service.stop()
+            server.server_close()
+            if args.unix and os.path.exists(args.unix):
+                os.remove(args.unix)
+
+    except Exception as e:
+        print(f"오류가 발생했습니다: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,304 @@
+import argparse
+import csv
+import json
+import os
+import sys
+
+import numpy as np
+
+from bond_modes import BOND_MODES
+from flip_triggers import triggers_from_base
+from hysteresis_engine import scores_to_scalars
+from metrics import stage
+from price_cache import CACHE_DIR
+from report_render import RENDERERS
+from signal_core import STRATEGY_TICKERS, build_report, build_result, strategy_fingerprint
+from state_snapshot import params_fingerprint
+
+# --- [신호 저널 (추가 전용, 메모리 매핑)] ---
+# 매 실행에서 계산한 거래일별 결과(MA 대상 가격, MA, MA 상태, ^TNX/200MA, 채권 선택, 점수,
+# 목표 비중, 리밸런싱 여부)를 고정 폭 바이너리 레코드로 .price_cache/journal_*.bin 에 덧붙입니다.
+# 레코드 형식(시리즈 이름, 윈도우)은 같은 이름의 .json 파일에 기록됩니다.
+#
+# * 추가 전용: 저널의 마지막 날짜 이후 봉만 기록합니다. 이후 가격이 수정되어 과거 상태가
+#   달라지더라도 기존 레코드는 바꾸지 않습니다 (당시 보낸 신호의 감사 기록).
+# * 조회: 파일을 np.memmap 으로 열고 날짜 열에서 이진 탐색하므로, 특정 날짜 / 기간 조회는
+#   재계산 없이 O(log n + k) 입니다.
+# * 파라미터(신호 정의, BASE_WEIGHTS, SCALAR_MAP)가 바뀌면 다른 파일(지문 접미사)에 새로 기록합니다.
+# TAA_JOURNAL=0 으로 기록을 끌 수 있습니다.
+
+ACTIVE_BOND_WIDTH = 8
+
+
+def journal_fingerprint(strategy):
+    return params_fingerprint({
+        'signal': strategy_fingerprint(strategy),
+        'base_weights': strategy['base_weights'],
+        'scalar_map': {str(k): v for k, v in strategy['scalar_map'].items()},
+    })
+
+
+def journal_path(name, fingerprint, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"journal_{name}_{fingerprint[:12]}.bin")
+
+
+def journal_dtype(n_series, n_windows):
+    """거래일 1개 = 레코드 1개 (고정 폭)."""
+    return np.dtype([
+        ('date', 'M8[D]'),
+        ('prices', '<f8', (n_series,)),              # MA 대상 시리즈 종가 (names 순서)
+        ('ma', '<f8', (n_series, n_windows)),
+        ('states', 'u1', (n_series, n_windows)),     # 0: OFF, 1: ON
+        ('rate', '<f8'),                             # ^TNX 종가
+        ('rate_ma', '<f8'),
+        ('is_rising', '?'),
+        ('active_bond', f'S{ACTIVE_BOND_WIDTH}'),
+        ('scores', 'u1', (len(STRATEGY_TICKERS),)),  # QQQ, GLD, Tactical_Bond 의 ON 개수
+        ('weights', '<f8', (len(STRATEGY_TICKERS) + 1,)), # 목표 비중 + 현금
+        ('rebalance', '?'),
+        ('contiguous', '?'),                         # 직전 레코드가 바로 앞 거래일인지 (기록 공백 여부)
+    ])
+
+
+def journal_rows(signal, strategy, after=None):
+    """신호 결과(시간축 배열)를 저널 레코드로 변환합니다. after 이후 날짜만, MA 가 모두 있는 봉만."""
+    names = signal['names']
+    dates = np.array([np.datetime64(d, 'D') for d in signal['dates']])
+    ma = np.asarray(signal['ma'], dtype=np.float64)
+    rate_ma = np.asarray(signal['rate_ma'], dtype=np.float64)
+    states = signal['states']
+    is_rising = np.asarray(signal['is_rising'], dtype=bool)
+
+    scores = BOND_MODES[strategy['bond_mode']]['scores'](states.sum(axis=1), is_rising)
+    scalars = scores_to_scalars(scores, strategy['scalar_map'], len(strategy['ma_windows']))
+    base = np.array([strategy['base_weights'][ticker] for ticker in STRATEGY_TICKERS])
+    invested = base[:, None] * scalars
+
+    # 리밸런싱: 스케일러가 전날과 다른 봉 (build_report 와 같은 NaN 비교)
+    same = (scalars[:, 1:] == scalars[:, :-1]) | (np.isnan(scalars[:, 1:]) & np.isnan(scalars[:, :-1]))
+    rebalance = np.concatenate([[False], ~same.all(axis=0)])
+
+    selected = np.isfinite(ma).all(axis=(0, 1)) & np.isfinite(rate_ma)
+    selected[0] = False # 첫 봉은 전날 비중을 알 수 없음
+    if after is not None:
+        selected &= dates > after
+    idx = np.flatnonzero(selected)
+
+    rows = np.zeros(len(idx), dtype=journal_dtype(len(names), len(strategy['ma_windows'])))
+    rows['date'] = dates[idx]
+    rows['prices'] = signal['prices'][:, idx].T
+    rows['ma'] = np.moveaxis(ma[:, :, idx], 2, 0)
+    rows['states'] = np.moveaxis(states[:, :, idx], 2, 0)
+    rows['rate'] = signal['rate_prices'][idx]
+    rows['rate_ma'] = rate_ma[idx]
+    rows['is_rising'] = is_rising[idx]
+    rows['active_bond'] = np.where(is_rising[idx], strategy['rising_bond'], strategy['falling_bond'])
+    rows['scores'] = scores[:, idx].T
+    rows['weights'][:, :-1] = invested[:, idx].T
+    rows['weights'][:, -1] = 1.0 - invested[:, idx].sum(axis=0)
+    rows['rebalance'] = rebalance[idx]
+    rows['contiguous'] = selected[idx - 1]
+    if after is not None:
+        rows['contiguous'] |= dates[idx - 1] == after
+    return rows
+
+
+class SignalJournal:
+    """전략 하나의 신호 저널. 레코드는 날짜 오름차순이며, records() 는 읽기 전용 memmap 입니다."""
+
+    def __init__(self, strategy, cache_dir=CACHE_DIR):
+        self.strategy = strategy
+        self.path = journal_path(strategy['name'], journal_fingerprint(strategy), cache_dir)
+        self.meta_path = self.path[:-len('.bin')] + '.json'
+        self.names = None
+        self._load_meta()
+
+    def _load_meta(self):
+        # 시리즈 이름은 첫 기록 시 정해짐 (다른 인스턴스/프로세스가 기록했을 수 있으므로 필요할 때 다시 읽음)
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                self.names = json.load(f)['names']
+        except (OSError, ValueError, KeyError):
+            self.names = None
+        return self.names
+
+    @property
+    def dtype(self):
+        return journal_dtype(len(self.names), len(self.strategy['ma_windows']))
+
+    def __len__(self):
+        if (self.names is None and self._load_meta() is None) or not os.path.exists(self.path):
+            return 0
+        return os.path.getsize(self.path) // self.dtype.itemsize
+
+    def records(self):
+        n = len(self)
+        if n == 0:
+            return np.zeros(0, dtype=journal_dtype(len(self.names or []), len(self.strategy['ma_windows'])))
+        return np.memmap(self.path, dtype=self.dtype, mode='r', shape=(n,))
+
+    def last_date(self):
+        n = len(self)
+        return self.records()['date'][n - 1] if n else None
+
+    def append(self, signal):
+        """신호 결과 중 저널 마지막 날짜 이후의 봉을 덧붙입니다. 반환: 추가한 레코드 수."""
+        if self.names is None and self._load_meta() is None:
+            self.names = list(signal['names'])
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = self.meta_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'name': self.strategy['name'], 'names': self.names,
+                           'ma_windows': list(self.strategy['ma_windows']),
+                           'dtype': str(self.dtype.descr)}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.meta_path)
+
+        rows = journal_rows(signal, self.strategy, self.last_date())
+        if len(rows) == 0:
+            return 0
+        with open(self.path, 'ab') as f:
+            # 중단된 이전 기록의 잘린 레코드는 버림
+            complete = len(self) * self.dtype.itemsize
+            if f.tell() != complete:
+                f.truncate(complete)
+            f.write(rows.tobytes())
+        return len(rows)
+
+    def index_of(self, day):
+        """날짜의 레코드 위치 (없으면 None)."""
+        dates = self.records()['date']
+        day = np.datetime64(day, 'D')
+        k = int(np.searchsorted(dates, day))
+        return k if k < len(dates) and dates[k] == day else None
+
+    def between(self, start=None, end=None):
+        """[start, end] 구간의 레코드 (memmap 슬라이스, 복사 없음)."""
+        records = self.records()
+        dates = records['date']
+        lo = 0 if start is None else int(np.searchsorted(dates, np.datetime64(start, 'D'), side='left'))
+        hi = len(dates) if end is None else int(np.searchsorted(dates, np.datetime64(end, 'D'), side='right'))
+        return records[lo:hi]
+
+    def rebalances(self, start=None, end=None):
+        records = self.between(start, end)
+        return records[records['rebalance']]
+
+    def signal_at(self, day):
+        """day 마감 기준 신호 결과 dict (build_report 입력 형식). 레코드가 없으면 None.
+
+        이전 윈도우 기간의 레코드가 끊김 없이 있으면 다음 종가 전환가(triggers)도 복원합니다.
+        """
+        k = self.index_of(day)
+        if k is None or k == 0 or not self.records()['contiguous'][k]:
+            return None
+        records = self.records()
+        rows = records[k - 1:k + 1]
+        signal = {
+            'names': self.names,
+            'dates': rows['date'].astype(object).tolist(),
+            'prices': rows['prices'].T.copy(),
+            'states': np.moveaxis(rows['states'], 0, 2).astype(np.float64),
+            'is_rising': rows['is_rising'].copy(),
+            'ma_last': rows['ma'][-1].copy(),
+        }
+
+        # 전환가: B = w * MA - (내일 윈도우에서 빠지는 값), 빠지는 값은 w-1 개 이전 레코드의 가격
+        windows = np.asarray(self.strategy['ma_windows'])
+        rate_window = self.strategy['rate_ma_window']
+        span = max(windows.max(), rate_window)
+        if k - span + 1 >= 0 and records['contiguous'][k - span + 2:k + 1].all():
+            row = records[k]
+            base = windows * row['ma'] - records['prices'][k - windows + 1].T
+            rate_base = rate_window * row['rate_ma'] - records['rate'][k - rate_window + 1]
+            signal['triggers'] = triggers_from_base(base, rate_base, row['states'], row['rate'],
+                                                    row['is_rising'], self.strategy)
+        return signal
+
+    def result_at(self, day):
+        """저장된 레코드로 day 의 SignalResult 를 다시 만듭니다 (재계산 없음)."""
+        signal = self.signal_at(day)
+        return None if signal is None else build_result(signal, self.strategy)
+
+    def report_at(self, day):
+        """저장된 레코드로 day 의 텔레그램 리포트를 다시 만듭니다."""
+        signal = self.signal_at(day)
+        return None if signal is None else build_report(signal, self.strategy)
+
+
+def record_signal(signal, strategy, cache_dir=CACHE_DIR):
+    """일일 실행 결과를 저널에 기록합니다. 실패해도 신호 생성은 계속됩니다."""
+    if os.environ.get('TAA_JOURNAL', '1') == '0' or 'ma' not in signal:
+        return 0
+    with stage('journal') as m:
+        try:
+            m['rows'] = SignalJournal(strategy, cache_dir).append(signal)
+        except (OSError, ValueError) as e:
+            print(f"신호 저널 기록 실패: {e}", file=sys.stderr)
+            m['rows'] = 0
+        return m['rows']
+
+
+def _period(text):
+    """'2022', '2022-03', '2022-03-15' 또는 '시작:끝' -> (시작일, 종료일)."""
+    if ':' in text:
+        start, end = text.split(':', 1)
+        return _period(start)[0] if start else None, _period(end)[1] if end else None
+    value = np.datetime64(text)
+    return value.astype('M8[D]'), (value + 1).astype('M8[D]') - 1
+
+
+def write_csv(records, names, ma_windows, out=sys.stdout):
+    writer = csv.writer(out)
+    writer.writerow(['date', 'rebalance', 'active_bond']
+                    + [f"score_{ticker}" for ticker in STRATEGY_TICKERS]
+                    + [f"weight_{ticker}" for ticker in STRATEGY_TICKERS] + ['weight_Cash']
+                    + [f"{name}_{window}" for name in names for window in ma_windows])
+    for row in records:
+        writer.writerow([str(row['date']), int(row['rebalance']), row['active_bond'].decode()]
+                        + row['scores'].tolist() + [f"{w:.4f}" for w in row['weights']]
+                        + row['states'].ravel().tolist())
+
+
+def backfill(journal, period, provider=None):
+    """빈 저널을 전체 구간 재계산 결과로 채웁니다 (추가 전용이므로 빈 저널에만)."""
+    from signal_core import load_market_data, state_history, strategy_tickers
+
+    if len(journal):
+        raise ValueError(f"저널이 비어 있지 않습니다 ({len(journal)}개 레코드): {journal.path}")
+    all_prices_df = load_market_data(strategy_tickers(journal.strategy), period, provider)
+    return journal.append(state_history(all_prices_df, journal.strategy))
+
+
+# --- [메인 실행: 저널 조회] ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adaptive-Hysteresis-TAA 신호 저널 조회")
+    parser.add_argument('--mode', choices=['synthetic', 'real'], default='synthetic')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--rebalances', metavar='PERIOD', help="리밸런싱 날짜 (예: 2022, 2022-03, 2022-01-01:2022-06-30)")
+    group.add_argument('--range', metavar='PERIOD', help="기간의 전체 레코드 (CSV)")
+    group.add_argument('--report', metavar='DATE', help="해당 날짜 마감 기준 리포트 재구성")
+    group.add_argument('--backfill', metavar='PERIOD', help="빈 저널을 다운로드 구간(예: 400d, max)으로 채움")
+    parser.add_argument('--format', choices=list(RENDERERS), default='telegram', help="--report 출력 형식")
+    args = parser.parse_args()
+
+    try:
+        if args.mode == 'synthetic':
+            from daily_signal_generator import STRATEGY
+        else:
+            from daily_signal_generator_채권실물자산 import STRATEGY
+        journal = SignalJournal(STRATEGY)
+
+        if args.backfill:
+            print(f"... {backfill(journal, args.backfill)}개 레코드 기록: {journal.path} ...", file=sys.stderr)
+        elif args.report:
+            result = journal.result_at(args.report)
+            if result is None:
+                raise ValueError(f"{args.report} 레코드가 저널에 없습니다.")
+            print(RENDERERS[args.format](result).rstrip("\n"))
+        else:
+            records = journal.rebalances(*_period(args.rebalances)) if args.rebalances else journal.between(*_period(args.range))
+            write_csv(records, journal.names or [], STRATEGY['ma_windows'])
+
+    except Exception as e:
+        print(f"오류가 발생했습니다: {e}", file=sys.stderr)
+        sys.exit(1)
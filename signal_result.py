@@ -0,0 +1,123 @@
+import math
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+# --- [신호 결과 객체] ---
+# signal_core.build_result 가 계산 결과를 이 객체로 한 번만 만들고,
+# report_render 의 렌더러(텔레그램 / JSON / CSV / HTML)는 이 객체만 읽어 출력합니다.
+# 계산 모듈(NumPy)과 표시 형식이 분리되므로 한 번의 실행으로 여러 형식을 만들 수 있습니다.
+#
+# 비중은 전략 단위(QQQ / GLD / Tactical_Bond / CASH)로 보관하며,
+# Tactical_Bond 의 실제 보유 티커는 active_bond (IEF 또는 TLT) 입니다.
+
+
+@dataclass(frozen=True)
+class MAState:
+    """이동평균 1개의 이격도 상태."""
+    window: int
+    state: bool # 오늘 ON
+    yesterday_state: bool
+    ma: float
+    disparity: float # 종가 / MA - 1
+    trigger: Optional[float] = None # 내일 종가 전환가 (ON: 이 가격 미만이면 OFF, OFF: 초과면 ON)
+
+    @property
+    def change(self):
+        if self.state == self.yesterday_state:
+            return 'hold'
+        return 'on' if self.state else 'off'
+
+
+@dataclass(frozen=True)
+class AssetSignal:
+    """전략 자산 1개의 MA 신호. real 모드 Tactical_Bond 는 signal_ticker 가 IEF / TLT."""
+    asset: str
+    signal_ticker: str
+    price: float
+    score: int # ON 개수
+    scalar: float
+    yesterday_scalar: float
+    windows: Tuple[MAState, ...]
+
+
+@dataclass(frozen=True)
+class Allocation:
+    """목표 비중 (어제 -> 오늘). changed: 스케일러(현금은 비중)가 어제와 다름."""
+    asset: str
+    weight: float
+    yesterday_weight: float
+    changed: bool
+
+    @property
+    def delta(self):
+        return self.weight - self.yesterday_weight
+
+
+@dataclass(frozen=True)
+class PriceLine:
+    """전일 종가와 증감율. series 는 값을 읽은 시리즈 (synthetic 채권은 Tactical_Bond)."""
+    ticker: str
+    series: str
+    price: float
+    change: float
+
+
+@dataclass(frozen=True)
+class SignalResult:
+    strategy: str
+    title: str
+    date: date
+    bond_mode: str
+    n_band: float
+    ma_windows: Tuple[int, ...]
+    rising_bond: str
+    falling_bond: str
+    is_rising: bool
+    rebalance: bool
+    allocations: Tuple[Allocation, ...] # QQQ, GLD, Tactical_Bond, CASH
+    prices: Tuple[PriceLine, ...]
+    assets: Tuple[AssetSignal, ...]
+    rate: Optional[float] = None # ^TNX 종가 (전환가 계산 시)
+    rate_switch: Optional[float] = None # 내일 채권 전환 금리
+    stale: Dict[str, Optional[date]] = field(default_factory=dict) # 다운로드 실패/누락 티커
+
+    @property
+    def active_bond(self):
+        return self.rising_bond if self.is_rising else self.falling_bond
+
+    @property
+    def other_bond(self):
+        return self.falling_bond if self.is_rising else self.rising_bond
+
+    def allocation(self, asset):
+        return next(a for a in self.allocations if a.asset == asset)
+
+    def holdings(self):
+        """오늘 실제 보유 비중 {QQQ, GLD, IEF, TLT, CASH}."""
+        weights = {a.asset: a.weight for a in self.allocations}
+        bond = weights.pop('Tactical_Bond')
+        cash = weights.pop('CASH')
+        weights[self.rising_bond] = bond if self.is_rising else 0.0
+        weights[self.falling_bond] = 0.0 if self.is_rising else bond
+        weights['CASH'] = cash
+        return weights
+
+    def to_dict(self):
+        """JSON 으로 바로 쓸 수 있는 dict (날짜는 ISO 문자열, NaN / inf 는 None)."""
+        data = _clean(asdict(self))
+        data['date'] = self.date.isoformat()
+        data['stale'] = {ticker: None if day is None else day.isoformat() for ticker, day in self.stale.items()}
+        data['active_bond'] = self.active_bond
+        data['holdings'] = _clean(self.holdings())
+        return data
+
+
+def _clean(value):
+    if isinstance(value, dict):
+        return {key: _clean(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_clean(item) for item in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
@@ -0,0 +1,276 @@
+import hashlib
+import json
+import os
+import sys
+from datetime import date
+
+import numpy as np
+
+from bond_modes import BOND_MODES
+from hysteresis_engine import hysteresis_states
+from price_cache import ADJUST_TOLERANCE, CACHE_DIR
+
+# --- [이격도 상태 스냅샷 (체크포인트/재개)] ---
+# 매 실행 후 마지막 날짜의 MA 상태, 이동평균 누적합(rolling sum), 최근 가격 꼬리(tail)를 저장합니다.
+# 다음 실행은 스냅샷 이후의 새 봉만 처리하므로 실행 비용이 일정하고,
+# 신호가 다운로드 구간(400일)의 시작 위치에 의존하지 않습니다.
+#
+# 수정 종가는 배당/분할 때마다 과거 전체가 다시 조정되므로, 티커별 종가 꼬리(close_tail)와 꼬리 구간의
+# 채권 선택(tail_is_rising)도 저장합니다. 종가가 티커별로 일정한 비율로만 바뀌었으면 상태는 유지하고
+# 꼬리 / 누적합만 새 기준으로 맞추며(rebase_snapshot), 그 밖의 수정이면 스냅샷을 버리고 전체 재계산합니다.
+#
+# bond_mode 별 신호 시리즈 구성은 bond_modes.BOND_MODES 를 따릅니다.
+# *_arrays 함수들은 pandas 없이 NumPy 배열만 사용합니다 (fast_start 경로).
+
+SNAPSHOT_VERSION = 2
+RATE_TICKER = '^TNX'
+
+
+def snapshot_path(name, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f"snapshot_{name}.json")
+
+
+def params_fingerprint(params):
+    payload = json.dumps({'version': SNAPSHOT_VERSION, **params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def load_snapshot(path, fingerprint):
+    """스냅샷을 읽습니다. 없거나 손상되었거나 파라미터가 바뀐 경우 None."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('fingerprint') != fingerprint:
+        return None
+    return snapshot
+
+
+def save_snapshot(path, snapshot):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+
+
+def _date_str(value):
+    return str(np.datetime64(value, 'D'))
+
+
+def adjustment_ratios(snapshot, closes, k, tolerance=ADJUST_TOLERANCE):
+    """저장된 종가 꼬리 대비 현재 종가(k 봉까지)의 티커별 비율.
+
+    모든 티커가 꼬리 전체에서 일정한 비율이면 {ticker: 비율}, 아니면(데이터 정정 / 봉 누락) None.
+    """
+    ratios = {}
+    for ticker, stored in snapshot['close_tail'].items():
+        stored = np.asarray(stored, dtype=np.float64)
+        if ticker not in closes or k + 1 < len(stored):
+            return None
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = closes[ticker][k + 1 - len(stored):k + 1] / stored
+        if not (np.isfinite(ratio).all() and (ratio > 0).all()):
+            return None
+        if np.abs(ratio / ratio[-1] - 1.0).max() > tolerance:
+            return None
+        ratios[ticker] = float(ratio[-1])
+    return ratios
+
+
+def rebase_snapshot(snapshot, closes, k, ratios, ma_windows, bond_mode, rising_bond='IEF', falling_bond='TLT'):
+    """이격도 상태는 그대로 두고 종가 꼬리 / 신호 꼬리 / 누적합을 현재 가격 기준(k 봉까지)으로 맞춥니다."""
+    tail_len = len(snapshot['tail'][0])
+    close_tail = {ticker: np.asarray(closes[ticker][k + 1 - tail_len:k + 1], dtype=np.float64) for ticker in ratios}
+    tail_is_rising = np.asarray(snapshot['tail_is_rising'], dtype=bool)
+    _, _, tail, _ = BOND_MODES[bond_mode]['inputs'](close_tail, tail_is_rising, rising_bond, falling_bond)
+    rate_ratio = ratios.get(RATE_TICKER, 1.0)
+
+    rebased = dict(snapshot)
+    rebased.update({
+        'last_close': {ticker: float(values[-1]) for ticker, values in close_tail.items()},
+        'close_tail': {ticker: values.tolist() for ticker, values in close_tail.items()},
+        'tail': tail.tolist(),
+        'sums': np.stack([tail[:, -window:].sum(axis=1) for window in ma_windows], axis=1).tolist(),
+        'rate_tail': (np.asarray(snapshot['rate_tail'], dtype=np.float64) * rate_ratio).tolist(),
+        'rate_sum': snapshot['rate_sum'] * rate_ratio,
+    })
+    return rebased
+
+
+def resume_position_arrays(snapshot, dates, closes, ma_windows, bond_mode, rising_bond='IEF', falling_bond='TLT'):
+    """dates: (T,) datetime64, closes: {ticker: (T,)}.
+
+    반환: (스냅샷 마지막 날짜의 위치, 재개에 쓸 스냅샷) 또는 (None, None).
+    종가가 배당/분할 재조정(티커별 일정 비율)으로만 바뀌었으면 새 기준으로 맞춘 스냅샷을 반환합니다.
+    """
+    if snapshot is None:
+        return None, None
+    dates = np.asarray(dates).astype('datetime64[D]')
+    matches = np.flatnonzero(dates == np.datetime64(snapshot['last_date'], 'D'))
+    if len(matches) == 0:
+        print(f"스냅샷({snapshot['last_date']})이 데이터 구간에 없어 전체 재계산합니다.", file=sys.stderr)
+        return None, None
+    k = int(matches[0])
+    ratios = adjustment_ratios(snapshot, closes, k)
+    if ratios is None:
+        print(f"스냅샷({snapshot['last_date']}) 의 종가 꼬리가 수정되어 전체 재계산합니다.", file=sys.stderr)
+        return None, None
+    if all(abs(ratio - 1.0) <= 1e-9 for ratio in ratios.values()):
+        return k, snapshot
+    print("스냅샷 가격 기준 조정(배당/분할): " + ", ".join(
+        f"{ticker} x{ratio:.6f}" for ticker, ratio in ratios.items() if abs(ratio - 1.0) > ADJUST_TOLERANCE),
+        file=sys.stderr)
+    return k, rebase_snapshot(snapshot, closes, k, ratios, ma_windows, bond_mode, rising_bond, falling_bond)
+
+
+def resume_position(snapshot, all_prices_df, ma_windows, bond_mode, rising_bond='IEF', falling_bond='TLT'):
+    """스냅샷의 마지막 날짜 위치와 재개에 쓸 스냅샷. 재개할 수 없으면(오래됨/가격 수정) (None, None)."""
+    if snapshot is None:
+        return None, None
+    closes = {ticker: all_prices_df[ticker].to_numpy(dtype=np.float64) for ticker in all_prices_df.columns}
+    return resume_position_arrays(snapshot, all_prices_df.index.values, closes, ma_windows, bond_mode,
+                                  rising_bond, falling_bond)
+
+
+def extend_rolling_means(tail, sums, new_values, windows):
+    """누적합을 새 봉만큼 전진시켜 이동평균 (S, W, n) 과 갱신된 tail/sums 를 반환합니다.
+
+    tail: (S, L) 최근 L(>= max(windows)) 개 값, sums: (S, W) 마지막 봉 기준 윈도우 합
+    """
+    tail_len = tail.shape[1]
+    n = new_values.shape[1]
+    combined = np.concatenate([tail, new_values], axis=1)
+
+    means = np.empty((tail.shape[0], len(windows), n), dtype=np.float64)
+    new_sums = sums.copy()
+    for w_idx, window in enumerate(windows):
+        dropped = combined[:, tail_len - window:tail_len - window + n]
+        running = sums[:, w_idx][:, None] + np.cumsum(new_values - dropped, axis=1)
+        means[:, w_idx, :] = running / window
+        if n > 0:
+            new_sums[:, w_idx] = running[:, -1]
+    return means, combined[:, -tail_len:], new_sums
+
+
+def build_snapshot(fingerprint, dates, signal_prices, rate_prices, states, is_rising,
+                   ma_windows, rate_ma_window, closes):
+    """전체 재계산 결과(시간축 배열)로부터 스냅샷을 만듭니다. 데이터가 부족하면 None.
+
+    closes: {ticker: (T,) 종가} (전략 티커 전체, 마지막 종가 / 종가 꼬리 저장용)
+    """
+    tail_len = max(max(ma_windows), 2)
+    if signal_prices.shape[1] < max(tail_len, rate_ma_window) or states.shape[2] < 2:
+        return None
+    tail = signal_prices[:, -tail_len:]
+    rate_tail = rate_prices[-rate_ma_window:]
+    if not (np.isfinite(tail).all() and np.isfinite(rate_tail).all()):
+        return None
+
+    sums = np.stack([signal_prices[:, -window:].sum(axis=1) for window in ma_windows], axis=1)
+    return {
+        'fingerprint': fingerprint,
+        'last_date': _date_str(dates[-1]),
+        'prev_date': _date_str(dates[-2]),
+        'last_close': {ticker: float(values[-1]) for ticker, values in closes.items()},
+        'close_tail': {ticker: np.asarray(values[-tail_len:], dtype=np.float64).tolist()
+                       for ticker, values in closes.items()},
+        'tail': tail.tolist(),
+        'tail_is_rising': np.asarray(is_rising[-tail_len:], dtype=bool).tolist(),
+        'sums': sums.tolist(),
+        'rate_tail': rate_tail.tolist(),
+        'rate_sum': float(rate_tail.sum()),
+        'states': states[:, :, -1].tolist(),
+        'prev_states': states[:, :, -2].tolist(),
+        'is_rising': bool(is_rising[-1]),
+        'prev_is_rising': bool(is_rising[-2]),
+    }
+
+
+def advance_snapshot(snapshot, new_close_df, ma_windows, rate_ma_window, n_band, bond_mode,
+                     rising_bond='IEF', falling_bond='TLT'):
+    """스냅샷 이후의 새 봉(new_close_df)만 처리합니다.
+
+    반환: (결과 dict, 갱신된 스냅샷). 결과의 시간축은 [어제 이전 봉, 스냅샷 봉, 새 봉...] 이며
+    마지막 두 개를 오늘/어제 값으로 사용합니다.
+    """
+    import pandas as pd
+
+    closes = {ticker: new_close_df[ticker].to_numpy(dtype=np.float64) for ticker in new_close_df.columns}
+    result, updated = advance_snapshot_arrays(
+        snapshot, new_close_df.index.values, closes, ma_windows, rate_ma_window, n_band, bond_mode,
+        rising_bond, falling_bond,
+    )
+    result['dates'] = [pd.Timestamp(d) for d in result['dates']]
+    return result, updated
+
+
+def advance_snapshot_arrays(snapshot, new_dates, close_arrays, ma_windows, rate_ma_window, n_band, bond_mode,
+                            rising_bond='IEF', falling_bond='TLT'):
+    """advance_snapshot 의 NumPy 버전. new_dates: (n,) datetime64, close_arrays: {ticker: (n,)}.
+
+    결과의 dates 는 datetime.date 리스트입니다.
+    """
+    new_dates = np.asarray(new_dates).astype('datetime64[D]')
+    close_arrays = {ticker: np.asarray(values, dtype=np.float64) for ticker, values in close_arrays.items()}
+    n = len(new_dates)
+    tail = np.asarray(snapshot['tail'], dtype=np.float64)
+    sums = np.asarray(snapshot['sums'], dtype=np.float64)
+    rate_tail = np.asarray(snapshot['rate_tail'], dtype=np.float64)[None, :]
+    rate_sum = np.array([[snapshot['rate_sum']]], dtype=np.float64)
+    last_states = np.asarray(snapshot['states'], dtype=np.float64)
+    prev_states = np.asarray(snapshot['prev_states'], dtype=np.float64)
+    windows = np.asarray(ma_windows, dtype=np.float64)
+
+    # 1. 금리 200일 MA -> 채권 선택
+    rate_new = np.asarray(close_arrays[RATE_TICKER], dtype=np.float64)[None, :]
+    rate_ma, rate_tail, rate_sum = extend_rolling_means(rate_tail, rate_sum, rate_new, [rate_ma_window])
+    with np.errstate(invalid='ignore'):
+        is_rising_new = rate_new[0] > rate_ma[0, 0]
+
+    # 2. 신호 가격 / MA / 밴드
+    names, _, signal_new, active = BOND_MODES[bond_mode]['inputs'](close_arrays, is_rising_new, rising_bond, falling_bond)
+    ma_new, new_tail, new_sums = extend_rolling_means(tail, sums, signal_new, ma_windows)
+    upper = ma_new * (1.0 + n_band)
+    lower = ma_new * (1.0 - n_band)
+
+    # 3. 스냅샷 상태에서 이어서 이격도 상태 계산
+    states_new = hysteresis_states(signal_new, upper, lower, 0, init_states=last_states, active=active)
+
+    dates = [date.fromisoformat(snapshot['prev_date']), date.fromisoformat(snapshot['last_date'])] + new_dates.tolist()
+    result = {
+        'names': names,
+        'dates': dates,
+        'prices': np.concatenate([tail[:, -2:], signal_new], axis=1),
+        'states': np.concatenate([prev_states[:, :, None], last_states[:, :, None], states_new], axis=2),
+        'is_rising': np.concatenate([[snapshot['prev_is_rising'], snapshot['is_rising']], is_rising_new]).astype(bool),
+        'rate_prices': np.concatenate([snapshot['rate_tail'][-2:], rate_new[0]]),
+        'ma_last': new_sums / windows,
+        # 봉별 MA (신호 저널용). 스냅샷 이전 봉은 알 수 없으므로 NaN
+        'ma': np.concatenate([np.full(sums.shape + (1,), np.nan), (sums / windows)[:, :, None], ma_new], axis=2),
+        'rate_ma': np.concatenate([[np.nan, snapshot['rate_sum'] / rate_ma_window], rate_ma[0, 0]]),
+    }
+
+    if n == 0:
+        return result, snapshot
+
+    tail_len = tail.shape[1]
+    updated = dict(snapshot)
+    updated.update({
+        'last_date': dates[-1].strftime('%Y-%m-%d'),
+        'prev_date': dates[-2].strftime('%Y-%m-%d'),
+        'last_close': {ticker: float(close_arrays[ticker][-1]) for ticker in snapshot['last_close']},
+        'close_tail': {ticker: np.concatenate([values, close_arrays[ticker]])[-tail_len:].tolist()
+                       for ticker, values in snapshot['close_tail'].items()},
+        'tail': new_tail.tolist(),
+        'tail_is_rising': np.concatenate([snapshot['tail_is_rising'], is_rising_new])[-tail_len:].astype(bool).tolist(),
+        'sums': new_sums.tolist(),
+        'rate_tail': rate_tail[0].tolist(),
+        'rate_sum': float(rate_sum[0, 0]),
+        'states': result['states'][:, :, -1].tolist(),
+        'prev_states': result['states'][:, :, -2].tolist(),
+        'is_rising': bool(result['is_rising'][-1]),
+        'prev_is_rising': bool(result['is_rising'][-2]),
+    })
+    return result, updated
@@ -0,0 +1,294 @@
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+import rolling_stats
+from backtest import TRADING_DAYS, _strategy_params, load_price_file, portfolio_returns, target_weights
+from bond_modes import BOND_MODES
+from hysteresis_engine import hysteresis_states, scores_to_scalars
+from metrics import session, stage
+from signal_core import RATE_TICKER, ROLLING_METHOD
+
+# --- [몬테카를로 스트레스 테스트] ---
+# 2005-2024 에 없던 국면에서 이격도 밴드와 MA 점수가 어떻게 동작하는지 보기 위해,
+# QQQ / GLD / IEF / TLT / ^TNX 의 합성 결합 경로를 수천 개 만들고 전략을 모든 경로에 한 번에 적용합니다.
+#
+# 경로 생성 (일별 증분: 자산은 로그 수익률, ^TNX 는 수준 차이):
+#   bootstrap : 과거 증분을 block 일 단위로 복원 추출 (자산 간 상관 / 단기 자기상관 유지)
+#   regime    : 국면 전환(마르코프) GBM. 국면별 연 수익률, 변동성 배수, ^TNX 연간 변화, 평균 지속 기간,
+#               채권-주식 상관 부호를 REGIMES 로 지정 (공분산은 과거 추정치 기준)
+# 모든 경로는 실제 이력의 마지막 warmup 일(MA 준비 구간)에서 출발하며, 성과는 합성 구간만 평가합니다.
+#
+# 계산: (경로 × 시리즈) 를 한 축으로 펼쳐 rolling_stats / hysteresis_engine 에 그대로 넣습니다
+# (signal_core 와 같은 엔진, (시리즈, 경로, 시간) 3차원 배열). 경로는 chunk 개씩 처리하므로
+# 메모리는 경로 수와 무관합니다. 난수는 경로마다 따로 두므로 (seed, 생성 방식, 경로 번호) 로만 정해지고
+# --chunk 값과 무관하게 같은 경로가 만들어집니다.
+
+SERIES = ['QQQ', 'GLD', 'IEF', 'TLT', RATE_TICKER]
+PATH_CHUNK = 128
+RATE_FLOOR = 0.05 # ^TNX 하한 (%)
+
+# drift: 연 수익률 (QQQ, GLD, IEF, TLT), None 이면 과거 평균
+# vol: 변동성 배수, rate_drift: ^TNX 연간 변화 (%p), duration: 평균 지속 거래일, weight: 국면 전환 시 선택 비율
+# bond_sign: -1 이면 채권 / ^TNX 와 주식 / 금의 상관 부호를 뒤집음 (2022년형 주식·채권 동반 하락)
+REGIMES = {
+    'normal': {'drift': None, 'vol': 1.0, 'rate_drift': 0.0, 'duration': 500, 'weight': 0.6, 'bond_sign': 1},
+    'crash': {'drift': [-0.40, 0.05, 0.06, 0.10], 'vol': 2.5, 'rate_drift': -1.5, 'duration': 90,
+              'weight': 0.15, 'bond_sign': 1},
+    'inflation': {'drift': [-0.15, 0.08, -0.08, -0.20], 'vol': 1.3, 'rate_drift': 2.0, 'duration': 250,
+                  'weight': 0.25, 'bond_sign': -1},
+}
+
+
+# --- [1. 과거 증분 / 경로 생성] ---
+
+def historical_increments(close_df, start=None, end=None):
+    """(N, 5) 일별 증분: QQQ, GLD, IEF, TLT 로그 수익률 + ^TNX 차이."""
+    levels = close_df.loc[start:end, SERIES].to_numpy(dtype=np.float64)
+    increments = np.concatenate([np.diff(np.log(levels[:, :4]), axis=0), np.diff(levels[:, 4:], axis=0)], axis=1)
+    return increments[np.isfinite(increments).all(axis=1)]
+
+
+def path_rngs(seed, g_idx, lo, hi):
+    """경로 lo ~ hi-1 의 난수 생성기. 경로 i 는 SeedSequence([seed, g_idx]).spawn() 의 i 번째 자식과 같습니다."""
+    return [np.random.default_rng(np.random.SeedSequence([seed, g_idx], spawn_key=(i,))) for i in range(lo, hi)]
+
+
+def block_bootstrap(increments, horizon, block, rngs):
+    """과거 증분을 block 일 단위로 이어붙인 (P, H, 5) 증분 (P = len(rngs), 경로별 난수)."""
+    n_blocks = -(-horizon // block)
+    starts = np.stack([rng.integers(0, len(increments) - block + 1, size=n_blocks) for rng in rngs])
+    idx = (starts[:, :, None] + np.arange(block)).reshape(len(rngs), -1)[:, :horizon]
+    return increments[idx]
+
+
+def regime_sequence(regimes, horizon, rngs):
+    """(P, H) 국면 번호. 매일 1/duration 확률로 다른 국면(weight 비율)으로 전환."""
+    weight = np.array([r['weight'] for r in regimes.values()], dtype=np.float64)
+    stay = 1.0 - 1.0 / np.array([r['duration'] for r in regimes.values()], dtype=np.float64)
+    transition = np.empty((len(weight), len(weight)))
+    for i in range(len(weight)):
+        others = weight.copy()
+        others[i] = 0.0
+        transition[i] = (1.0 - stay[i]) * others / others.sum() if others.sum() > 0 else 0.0
+        transition[i, i] = stay[i] if others.sum() > 0 else 1.0
+    cumulative = np.cumsum(transition, axis=1)
+
+    state = np.array([rng.choice(len(weight), p=weight / weight.sum()) for rng in rngs])
+    draws = np.stack([rng.random(horizon) for rng in rngs])
+    sequence = np.empty((len(rngs), horizon), dtype=np.int8)
+    for t in range(horizon):
+        sequence[:, t] = state
+        state = np.minimum((draws[:, t, None] > cumulative[state]).sum(axis=1), len(weight) - 1)
+    return sequence
+
+
+def regime_increments(increments, regimes, horizon, rngs):
+    """국면 전환 GBM (P, H, 5) 증분과 (P, H) 국면 번호 (P = len(rngs), 경로별 난수)."""
+    mean = increments.mean(axis=0)
+    cov = np.cov(increments, rowvar=False)
+    sequence = regime_sequence(regimes, horizon, rngs)
+    shocks = np.stack([rng.standard_normal((horizon, len(SERIES))) for rng in rngs])
+
+    out = np.empty_like(shocks)
+    for i, regime in enumerate(regimes.values()):
+        sign = np.array([1.0, 1.0, regime['bond_sign'], regime['bond_sign'], regime['bond_sign']])
+        regime_cov = cov * regime['vol'] ** 2 * np.outer(sign, sign)
+        chol = np.linalg.cholesky(regime_cov + np.eye(len(SERIES)) * 1e-14)
+        mu = mean.copy()
+        if regime['drift'] is not None:
+            mu[:4] = np.log1p(np.asarray(regime['drift'], dtype=np.float64)) / TRADING_DAYS
+        mu[4] = mean[4] + regime['rate_drift'] / TRADING_DAYS
+        mask = sequence == i
+        out[mask] = mu + shocks[mask] @ chol.T
+    return out, sequence
+
+
+def path_levels(prefix, increments):
+    """과거 prefix (Tw, 5) 뒤에 증분 (P, H, 5) 을 이어붙인 (5, P, Tw + H) 가격 / 금리 수준."""
+    n_paths, horizon, _ = increments.shape
+    warmup = len(prefix)
+    levels = np.empty((len(SERIES), n_paths, warmup + horizon))
+    levels[:, :, :warmup] = prefix.T[:, None, :]
+    growth = np.exp(np.cumsum(increments[:, :, :4], axis=1))
+    levels[:4, :, warmup:] = prefix[-1, :4, None, None] * np.moveaxis(growth, 2, 0)
+    levels[4, :, warmup:] = np.maximum(prefix[-1, 4] + np.cumsum(increments[:, :, 4], axis=1), RATE_FLOOR)
+    return levels
+
+
+# --- [2. 경로 묶음에 전략 적용 (3차원 벡터 연산)] ---
+
+def batch_signals(levels, params, n_bands, bond_mode):
+    """(5, P, T) 수준 -> n_band 별 스케일러 (3, P, T) 와 금리 상승 여부 (P, T).
+
+    signal_core.state_history + strategy_scalars 와 같은 로직을 모든 경로에 한 번에 적용합니다.
+    """
+    closes = dict(zip(SERIES, levels))
+    rate_ma = rolling_stats.rolling_means(closes[RATE_TICKER], [params['rate_ma_window']], method=ROLLING_METHOD)
+    with np.errstate(invalid='ignore'):
+        is_rising = closes[RATE_TICKER] > rate_ma[:, 0]
+
+    mode = BOND_MODES[bond_mode]
+    _, _, prices, active = mode['inputs'](closes, is_rising, 'IEF', 'TLT') # (S, P, T)
+    n_series, n_paths, t = prices.shape
+    flat = prices.reshape(n_series * n_paths, t)
+    flat_active = None if active is None else active.reshape(n_series * n_paths, t)
+
+    ma_windows = params['ma_windows']
+    ma = rolling_stats.rolling_means(flat, ma_windows, method=ROLLING_METHOD)
+    band = np.empty((2,) + ma.shape)
+    scalars = {}
+    for n_band in n_bands:
+        upper, lower = rolling_stats.band_arrays(ma, n_band, out=band)
+        states = hysteresis_states(flat, upper, lower, max(ma_windows) - 1, active=flat_active)
+        scores = mode['scores'](states.sum(axis=1).reshape(n_series, n_paths, t), is_rising)
+        scalars[n_band] = scores_to_scalars(scores, params['scalar_map'], len(ma_windows))
+    return scalars, is_rising
+
+
+def path_metrics(daily, weights):
+    """경로별 (P,) 성과: daily (P, H), weights (4, P, H)."""
+    years = daily.shape[-1] / TRADING_DAYS
+    equity = np.cumprod(1.0 + daily, axis=-1)
+    std = daily.std(axis=-1, ddof=1)
+    drawdown = equity / np.maximum.accumulate(equity, axis=-1) - 1.0
+    turnover = np.abs(np.diff(weights, axis=-1)).sum(axis=0) / 2.0 # 편도(one-way) 기준
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = daily.mean(axis=-1) / std * np.sqrt(TRADING_DAYS)
+    return {
+        'sharpe': sharpe,
+        'cagr': equity[:, -1] ** (1.0 / years) - 1.0,
+        'mdd': drawdown.min(axis=-1),
+        'volatility': std * np.sqrt(TRADING_DAYS),
+        'annual_turnover': turnover.sum(axis=-1) / years,
+    }
+
+
+def evaluate_chunk(levels, params, n_bands, bond_mode, warmup):
+    """경로 묶음의 n_band 별 전략 성과와 정적 비중(스케일러 1) 기준 성과 DataFrame."""
+    scalars, is_rising = batch_signals(levels, params, n_bands, bond_mode)
+    prices = levels[:4]
+    returns = np.full(prices.shape, np.nan)
+    returns[..., 1:] = prices[..., 1:] / prices[..., :-1] - 1.0
+
+    # 같은 채권 스위칭, MA 점수 없이 항상 기본 비중 100% 투자
+    static_weights = target_weights(np.ones((3,) + is_rising.shape), is_rising, params['base_weights'])
+    static = path_metrics(portfolio_returns(static_weights, returns)[:, warmup:], static_weights[..., warmup - 1:])
+
+    frames = []
+    for n_band, band_scalars in scalars.items():
+        weights = target_weights(band_scalars, is_rising, params['base_weights'])
+        # 합성 구간 첫날 수익률은 실제 이력 마지막 날 비중 기준
+        daily = portfolio_returns(weights, returns)[:, warmup:]
+        metrics = path_metrics(daily, weights[..., warmup - 1:])
+        frames.append(pd.DataFrame({
+            'n_band': n_band, **metrics,
+            'static_sharpe': static['sharpe'], 'static_cagr': static['cagr'], 'static_mdd': static['mdd'],
+            'bond_switches': (np.diff(is_rising[:, warmup - 1:].astype(np.int8), axis=-1) != 0).sum(axis=-1),
+        }))
+    return frames
+
+
+# --- [3. 실행] ---
+
+def run_stress_test(close_df, params, bond_mode='synthetic', generators=('bootstrap', 'regime'), n_paths=1000,
+                    horizon=TRADING_DAYS * 10, n_bands=None, block=20, warmup=TRADING_DAYS, regimes=None,
+                    start=None, end=None, chunk=PATH_CHUNK, seed=0):
+    """생성 방식 × n_band 별 경로 성과 DataFrame (경로 한 행씩)."""
+    n_bands = [params['n_band']] if n_bands is None else list(n_bands)
+    regimes = REGIMES if regimes is None else regimes
+    required = max(max(params['ma_windows']), params['rate_ma_window']) + 1
+    if warmup < required:
+        raise ValueError(f"warmup({warmup})은 MA 준비 기간({required}일) 이상이어야 합니다.")
+
+    increments = historical_increments(close_df, start, end)
+    prefix = close_df.loc[:end, SERIES].to_numpy(dtype=np.float64)[-warmup:]
+    if len(prefix) < warmup or not np.isfinite(prefix).all():
+        raise ValueError(f"시작 구간(마지막 {warmup}일)에 빈 값이 있거나 이력이 부족합니다.")
+
+    frames = []
+    for g_idx, generator in enumerate(generators):
+        for lo in range(0, n_paths, chunk):
+            size = min(chunk, n_paths - lo)
+            rngs = path_rngs(seed, g_idx, lo, lo + size)
+            with stage(f"generate_{generator}", rows=size * horizon):
+                if generator == 'bootstrap':
+                    chunk_increments, sequence = block_bootstrap(increments, horizon, block, rngs), None
+                elif generator == 'regime':
+                    chunk_increments, sequence = regime_increments(increments, regimes, horizon, rngs)
+                else:
+                    raise ValueError(f"지원하지 않는 생성 방식입니다: {generator}")
+                levels = path_levels(prefix, chunk_increments)
+            with stage('evaluate', rows=size * levels.shape[-1]):
+                for frame in evaluate_chunk(levels, params, n_bands, bond_mode, warmup):
+                    frame.insert(0, 'generator', generator)
+                    frame.insert(1, 'path', np.arange(lo, lo + size))
+                    if sequence is not None:
+                        for r_idx, name in enumerate(regimes):
+                            frame[f"share_{name}"] = (sequence == r_idx).mean(axis=1)
+                    frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+SUMMARY_COLUMNS = ['sharpe', 'cagr', 'mdd', 'annual_turnover', 'static_sharpe', 'static_mdd']
+
+
+def summarize(results, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95)):
+    """(생성 방식, n_band, 지표) 별 분위수 / 평균 표."""
+    rows = []
+    for (generator, n_band), group in results.groupby(['generator', 'n_band'], sort=False):
+        for metric in SUMMARY_COLUMNS:
+            values = group[metric].to_numpy(dtype=np.float64)
+            row = {'generator': generator, 'n_band': n_band, 'metric': metric}
+            row.update({f"p{q * 100:.0f}": np.nanquantile(values, q) for q in quantiles})
+            row['mean'] = np.nanmean(values)
+            rows.append(row)
+    return pd.DataFrame(rows).set_index(['generator', 'n_band', 'metric'])
+
+
+# --- [메인 실행] ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adaptive-Hysteresis-TAA 몬테카를로 스트레스 테스트")
+    parser.add_argument('--prices', default=os.environ.get('TAA_PRICE_FILE', 'prices.csv'),
+                        help="과거 종가 파일 (증분 추정 / 부트스트랩 원본, 컬럼: QQQ, GLD, IEF, TLT, ^TNX)")
+    parser.add_argument('--mode', choices=['synthetic', 'real'], default='synthetic')
+    parser.add_argument('--start', default=None, help="추정 구간 시작 (기본: 전체)")
+    parser.add_argument('--end', default=None, help="추정 구간 끝 = 합성 경로 출발일")
+    parser.add_argument('--generators', default='bootstrap,regime')
+    parser.add_argument('--paths', type=int, default=1000)
+    parser.add_argument('--years', type=float, default=10.0, help="합성 구간 길이 (년)")
+    parser.add_argument('--block', type=int, default=20, help="부트스트랩 블록 길이 (거래일)")
+    parser.add_argument('--n-bands', default=None, help="비교할 N_BAND 목록 (기본: 전략 값)")
+    parser.add_argument('--regimes', default=None, help="국면 정의 JSON 파일 (REGIMES 형식)")
+    parser.add_argument('--chunk', type=int, default=PATH_CHUNK, help="한 번에 계산할 경로 수 (메모리 상한)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='stress_results.csv', help="경로별 결과 CSV")
+    args = parser.parse_args()
+
+    try:
+        params = _strategy_params(args.mode)
+        regimes = None
+        if args.regimes:
+            with open(args.regimes, 'r', encoding='utf-8') as f:
+                regimes = json.load(f)
+        n_bands = None if args.n_bands is None else [float(x) for x in args.n_bands.split(',') if x]
+
+        close_df = load_price_file(args.prices)
+        with session('stress_test'):
+            results = run_stress_test(
+                close_df, params, args.mode, [g for g in args.generators.split(',') if g], args.paths,
+                int(round(args.years * TRADING_DAYS)), n_bands, args.block, regimes=regimes,
+                start=args.start, end=args.end, chunk=args.chunk, seed=args.seed,
+            )
+        results.to_csv(args.out, index=False)
+
+        with pd.option_context('display.width', 160, 'display.float_format', '{:.4f}'.format):
+            print(summarize(results).to_string())
+        print(f"\n경로별 결과: {args.out} ({len(results)}행)")
+    except Exception as e:
+        print(f"오류가 발생했습니다: {e}", file=sys.stderr)
+        sys.exit(1)
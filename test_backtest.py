@@ -0,0 +1,26 @@
+import pytest
+
+from backtest import _strategy_params, run_backtest
+from benchmark import make_fixture
+from weight_optimizer import scaled_returns
+
+# --- [백테스트 구간 테스트] ---
+# 데이터가 없는 구간을 요청하면 요청 구간과 데이터 구간을 담은 ValueError 가 나는지 확인합니다.
+
+PARAMS = _strategy_params('synthetic')
+
+
+@pytest.fixture(scope='module')
+def close_df():
+    return make_fixture(300, 5, seed=0).ffill()
+
+
+@pytest.mark.parametrize('start, end', [('2030-01-01', None), (None, '2000-01-01'), ('2024-06-02', '2024-06-02')])
+def test_empty_range_raises_value_error(close_df, start, end):
+    data_range = f"{close_df.index[0]:%Y-%m-%d} ~ {close_df.index[-1]:%Y-%m-%d}"
+    with pytest.raises(ValueError, match=data_range):
+        run_backtest(close_df, PARAMS['base_weights'], PARAMS['ma_windows'], PARAMS['n_band'], PARAMS['scalar_map'],
+                     PARAMS['rate_ma_window'], start=start, end=end)
+    with pytest.raises(ValueError, match="요청 구간"):
+        scaled_returns(close_df, PARAMS, start=start, end=end)
+
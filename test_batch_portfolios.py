@@ -0,0 +1,29 @@
+import daily_signal_generator
+from batch_portfolios import portfolio_strategy, portfolio_summary, run_batch
+from benchmark import make_fixture
+from market_data import InMemoryProvider
+from signal_core import build_report, compute_signal, strategy_tickers
+
+# --- [다중 포트폴리오 배치 테스트] ---
+# 이름 없는 설정의 기본 이름과, 공유 상태로 계산한 결과가 포트폴리오별 단독 계산과 같은지 확인합니다.
+
+DEFAULTS = daily_signal_generator.STRATEGY
+
+
+def test_missing_name_defaults_to_position():
+    strategies = [portfolio_strategy(config, DEFAULTS, i)
+                  for i, config in enumerate([{'n_band': 0.02}, {'name': 'account_b'}, {}])]
+    assert [s['name'] for s in strategies] == ['portfolio_0', 'account_b', 'portfolio_2']
+    assert strategies[0]['title'] == "Adaptive-Hysteresis-TAA (portfolio_0)"
+    assert DEFAULTS['name'] not in {s['name'] for s in strategies}
+
+
+def test_batch_matches_single_portfolio():
+    close_df = make_fixture(400, 5, seed=7).ffill()
+    configs = [{'n_band': 0.02}, {'name': 'account_b', 'bond_mode': 'real'}]
+    strategies, signals, _ = run_batch(configs, '5000d', DEFAULTS, InMemoryProvider(close_df))
+
+    for strategy, signal in zip(strategies, signals):
+        single = compute_signal(close_df[strategy_tickers(strategy)], strategy, use_snapshot=False)
+        assert build_report(signal, strategy) == build_report(single, strategy)
+        assert portfolio_summary(signal, strategy)['name'] == strategy['name']
@@ -0,0 +1,113 @@
+import importlib.util
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import daily_signal_generator
+import daily_signal_generator_채권실물자산
+import rolling_stats
+from benchmark import SIZES, check_engine, check_legacy, make_fixture
+from chart_stub_server import make_server
+from hysteresis_engine import hysteresis_states
+from market_data import YahooChartProvider
+from signal_core import RATE_TICKER, build_report, compute_signal, load_market_data, signal_series, strategy_tickers
+
+# --- [벤치마크 / 동등성 테스트 (pytest)] ---
+# benchmark.py 의 400d_x5 합성 데이터로
+#   * 동등성: 원래 일별 반복문 vs signal_core (check_legacy), 이격도 엔진 vs 기준 반복문 (check_engine)
+#   * 단계별 측정 (pytest-benchmark): download / rolling_stats / hysteresis / report
+# pytest-benchmark 가 없으면 측정 테스트만 건너뜁니다.
+#
+#   pytest test_benchmark.py
+#   pytest test_benchmark.py --benchmark-autosave --benchmark-compare   (.benchmarks/ 에 저장 / 이전 결과와 비교)
+
+FIXTURE_SIZE = '400d_x5'
+needs_benchmark = pytest.mark.skipif(
+    importlib.util.find_spec('pytest_benchmark') is None, reason="pytest-benchmark 가 설치되어 있지 않습니다.")
+
+
+@pytest.fixture(scope='module', params=['synthetic', 'real'])
+def strategy(request):
+    module = daily_signal_generator if request.param == 'synthetic' else daily_signal_generator_채권실물자산
+    return module.STRATEGY
+
+
+@pytest.fixture(scope='module')
+def raw_df():
+    return make_fixture(*SIZES[FIXTURE_SIZE], seed=0)
+
+
+@pytest.fixture(scope='module')
+def strategy_df(raw_df, strategy):
+    return raw_df.ffill()[strategy_tickers(strategy)]
+
+
+@pytest.fixture(scope='module')
+def engine_inputs(raw_df, strategy):
+    """(가격 (S, T), upper, lower (S, W, T), start_index): 전략 시리즈 + 나머지 합성 티커."""
+    close_df = raw_df.ffill()
+    series = signal_series(close_df, strategy)
+    assets = close_df.drop(columns=[RATE_TICKER]).to_numpy(dtype=np.float64).T
+    prices = np.concatenate([series['prices'], assets[4:]])
+    upper, lower = rolling_stats.band_arrays(rolling_stats.rolling_means(prices, strategy['ma_windows']),
+                                             strategy['n_band'])
+    return prices, upper, lower, max(strategy['ma_windows']) - 1
+
+
+@pytest.fixture(scope='module')
+def chart_url(raw_df):
+    # 최근 period 구간만 내려받으므로 오늘 기준 날짜로 옮긴 데이터를 제공
+    close_df = raw_df.copy()
+    close_df.index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=len(close_df))
+    server = make_server(close_df)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+# --- [1. 동등성] ---
+
+def test_legacy_loop_matches_signal_core(strategy_df, strategy):
+    assert check_legacy(strategy_df, strategy) == []
+
+
+def test_engine_matches_reference_loop(engine_inputs):
+    prices, upper, lower, start_index = engine_inputs
+    states = hysteresis_states(prices, upper, lower, start_index)
+    checked_rows, mismatches = check_engine(prices, upper, lower, start_index, states)
+    assert checked_rows == len(prices)
+    assert mismatches == []
+
+
+# --- [2. 단계별 측정] ---
+
+@needs_benchmark
+def test_bench_download(benchmark, chart_url, strategy):
+    provider = YahooChartProvider(chart_url, retries=0, cache_dir=None)
+    close_df = benchmark(load_market_data, strategy_tickers(strategy), '400d', provider)
+    assert list(close_df.columns) == strategy_tickers(strategy)
+    assert len(close_df) > max(strategy['ma_windows'])
+
+
+@needs_benchmark
+def test_bench_rolling_stats(benchmark, engine_inputs, strategy):
+    prices = engine_inputs[0]
+    ma = benchmark(rolling_stats.rolling_means, prices, strategy['ma_windows'])
+    expected = pd.DataFrame(prices.T).rolling(max(strategy['ma_windows'])).mean().to_numpy().T
+    np.testing.assert_allclose(ma[:, -1], expected, rtol=1e-9)
+
+
+@needs_benchmark
+def test_bench_hysteresis(benchmark, engine_inputs):
+    prices, upper, lower, start_index = engine_inputs
+    states = benchmark(hysteresis_states, prices, upper, lower, start_index)
+    assert check_engine(prices, upper, lower, start_index, states)[1] == []
+
+
+@needs_benchmark
+def test_bench_report(benchmark, strategy_df, strategy):
+    report = benchmark(lambda: build_report(compute_signal(strategy_df, strategy, use_snapshot=False), strategy))
+    assert strategy['title'] in report
@@ -0,0 +1,85 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import daily_signal_generator
+from benchmark import make_fixture
+from chart_stub_server import make_server
+from market_data import YahooChartProvider
+from report_render import render_telegram
+from signal_core import build_result, compute_signal, load_market_data, strategy_tickers
+
+# --- [다운로드 경로 테스트 (chart_stub_server)] ---
+# 티커별 재시도, 일부 실패 시 캐시 대체 + 오래된 데이터 표시, 캐시도 없을 때의 오류를
+# 로컬 스텁 서버의 장애 주입(fail / flaky)으로 확인합니다.
+
+STRATEGY = daily_signal_generator.STRATEGY
+TICKERS = strategy_tickers(STRATEGY)
+
+
+@pytest.fixture(scope='module')
+def close_df():
+    # 최근 period 구간만 내려받으므로 오늘 기준 날짜로 옮긴 데이터를 제공
+    close_df = make_fixture(400, 5, seed=1).ffill()
+    close_df.index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=len(close_df))
+    return close_df
+
+
+@pytest.fixture
+def stub(close_df):
+    servers = []
+
+    def start(**options):
+        server = make_server(close_df, **options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, f"http://127.0.0.1:{server.server_port}"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _provider(url, cache_dir, retries=0):
+    return YahooChartProvider(url, timeout=10, retries=retries, backoff=0.0, max_workers=1, cache_dir=cache_dir)
+
+
+def test_failed_ticker_falls_back_to_cache_and_is_marked_stale(stub, close_df, tmp_path):
+    _, url = stub()
+    warm = load_market_data(TICKERS, '400d', _provider(url, str(tmp_path)))
+    assert list(warm.columns) == TICKERS
+
+    _, url = stub(fail=('GLD',))
+    status = {}
+    result = load_market_data(TICKERS, '400d', _provider(url, str(tmp_path)), status)
+
+    assert list(result.columns) == TICKERS
+    assert result.index.equals(warm.index)
+    np.testing.assert_array_equal(result['GLD'], warm['GLD'])
+    assert list(status['stale']) == ['GLD']
+    report = render_telegram(build_result(compute_signal(result, STRATEGY, use_snapshot=False), STRATEGY,
+                                          status['stale']))
+    assert "⚠️ 데이터 확인 필요" in report
+    assert "GLD" in report.split("⚠️ 데이터 확인 필요")[1].splitlines()[0]
+
+
+def test_failed_ticker_without_cache_raises(stub, tmp_path):
+    _, url = stub(fail=('GLD',))
+    with pytest.raises(ValueError, match="GLD"):
+        load_market_data(TICKERS, '400d', _provider(url, str(tmp_path)))
+
+
+def test_flaky_ticker_succeeds_after_retries(stub, close_df):
+    # seed=1: 첫 요청(QQQ)이 실패하고 재시도에서 성공 (max_workers=1 이라 요청 순서가 고정)
+    server, url = stub(flaky=0.3, seed=1)
+    status = {}
+    result = load_market_data(TICKERS, '400d', _provider(url, None, retries=3), status)
+
+    assert len(server.requests) > len(TICKERS)
+    assert status['stale'] == {}
+    expected = close_df[TICKERS].loc[result.index[0]:]
+    assert result.index.equals(expected.index)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-6)
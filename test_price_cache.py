@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark import make_fixture
+from market_data import InMemoryProvider
+from price_cache import OVERLAP_BARS, load_close_prices, read_cached_arrays
+
+# --- [가격 캐시 증분 다운로드 테스트] ---
+# 캐시를 앞부분(prefix)으로 채운 뒤 새 봉이 붙은 (필요하면 다시 조정된) 수정 종가를 제공해
+#   * 겹치는 봉 재요청, 일정한 비율이면 캐시 구간 rescale, 아니면 해당 티커만 전체 재다운로드
+#   * 저장되는 NPZ 길이가 period + OVERLAP_BARS 로 제한되는지
+# 를 InMemoryProvider 로 확인합니다.
+
+PERIOD = '300d'
+NEW_BARS = 10
+TICKERS = ['QQQ', 'GLD', 'IEF']
+
+
+@pytest.fixture(scope='module')
+def close_df():
+    # 결과를 오늘 기준 period 구간으로 자르므로 오늘 기준 날짜로 옮긴 데이터를 사용
+    close_df = make_fixture(400, 5, seed=3).ffill()[TICKERS]
+    close_df.index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=len(close_df))
+    return close_df
+
+
+def _recording_fetch(close_df, log):
+    provider = InMemoryProvider(close_df)
+
+    def fetch(requests, period):
+        log.append(dict(requests))
+        return provider.fetch_many(requests, period)
+    return fetch
+
+
+def _seed_cache(close_df, cache_dir):
+    load_close_prices(TICKERS, _recording_fetch(close_df.iloc[:-NEW_BARS], []), PERIOD, str(cache_dir))
+
+
+def _adjusted(close_df, ticker, position, ratio):
+    """position 번째 봉이 ex_date 인 배당/분할로 그 이전 봉 전체를 ratio 배 다시 조정한 수정 종가."""
+    adjusted = close_df.copy()
+    adjusted.loc[adjusted.index < close_df.index[position], ticker] *= ratio
+    return adjusted
+
+
+def _assert_matches(result, expected):
+    cutoff = pd.Timestamp.today().normalize() - pd.Timedelta(PERIOD)
+    expected = expected[expected.index >= cutoff]
+    assert result.index.equals(expected.index)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=1e-12)
+
+
+def test_incremental_fetch_requests_overlap_only(close_df, tmp_path):
+    _seed_cache(close_df, tmp_path)
+    log, status = [], {}
+    result = load_close_prices(TICKERS, _recording_fetch(close_df, log), PERIOD, str(tmp_path), status=status)
+
+    overlap_start = close_df.index[-NEW_BARS - OVERLAP_BARS].strftime('%Y-%m-%d')
+    assert log == [dict.fromkeys(TICKERS, overlap_start)]
+    assert status['adjusted'] == {}
+    assert status['fallback'] == []
+    _assert_matches(result, close_df)
+
+
+def test_constant_ratio_rescales_cached_history(close_df, tmp_path):
+    _seed_cache(close_df, tmp_path)
+    # ex_date 가 새 봉 구간 -> 겹치는 봉 전체가 같은 비율로 바뀜
+    new = _adjusted(close_df, 'IEF', -3, 0.99)
+    log, status = [], {}
+    result = load_close_prices(TICKERS, _recording_fetch(new, log), PERIOD, str(tmp_path), status=status)
+
+    assert len(log) == 1
+    assert status['adjusted'] == {'IEF': pytest.approx(0.99, rel=1e-12)}
+    _assert_matches(result, new)
+
+
+def test_adjustment_inside_overlap_refetches_ticker(close_df, tmp_path):
+    _seed_cache(close_df, tmp_path)
+    # ex_date 가 겹치는 봉 구간 안 -> 비율이 일정하지 않아 IEF 만 period 전체를 다시 받음
+    new = _adjusted(close_df, 'IEF', -NEW_BARS - 2, 0.99)
+    log, status = [], {}
+    result = load_close_prices(TICKERS, _recording_fetch(new, log), PERIOD, str(tmp_path), status=status)
+
+    assert log[1:] == [{'IEF': None}]
+    assert status['adjusted'] == {'IEF': None}
+    _assert_matches(result, new)
+
+
+def test_saved_cache_is_trimmed_to_period(close_df, tmp_path):
+    _seed_cache(close_df, tmp_path)
+    load_close_prices(TICKERS, _recording_fetch(close_df, []), PERIOD, str(tmp_path))
+
+    cutoff = pd.Timestamp.today().normalize() - pd.Timedelta(PERIOD)
+    in_period = int((close_df.index >= cutoff).sum())
+    assert in_period + OVERLAP_BARS < len(close_df)
+    for ticker in TICKERS:
+        dates, _ = read_cached_arrays(ticker, str(tmp_path))
+        assert len(dates) == in_period + OVERLAP_BARS
+        assert dates[-1] == close_df.index[-1]
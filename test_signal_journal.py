@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+import daily_signal_generator
+import daily_signal_generator_채권실물자산
+from benchmark import make_fixture
+from market_data import InMemoryProvider
+from signal_core import build_report, compute_signal, state_history, strategy_tickers
+from signal_journal import SignalJournal, backfill
+
+# --- [신호 저널 왕복 테스트] ---
+# 앞부분(prefix) 기록 -> 새 봉 추가 -> 다시 열기 후 레코드가 전체 백필과 같은지,
+# between / rebalances 조회와 report_at 재구성이 전체 재계산(compute_signal)과 같은지 확인합니다.
+
+NEW_BARS = 15
+
+
+@pytest.fixture(scope='module', params=['synthetic', 'real'])
+def strategy(request):
+    module = daily_signal_generator if request.param == 'synthetic' else daily_signal_generator_채권실물자산
+    return module.STRATEGY
+
+
+@pytest.fixture(scope='module')
+def close_df(strategy):
+    return make_fixture(700, 5, seed=4).ffill()[strategy_tickers(strategy)]
+
+
+@pytest.fixture
+def journal_dir(close_df, strategy, tmp_path):
+    journal = SignalJournal(strategy, str(tmp_path))
+    assert journal.append(state_history(close_df.iloc[:-NEW_BARS], strategy)) > 0
+    assert journal.append(state_history(close_df, strategy)) == NEW_BARS
+    assert journal.append(state_history(close_df, strategy)) == 0
+    return str(tmp_path)
+
+
+def test_append_and_reopen_matches_backfill(close_df, strategy, journal_dir, tmp_path_factory):
+    journal = SignalJournal(strategy, journal_dir)
+    assert journal.last_date() == np.datetime64(close_df.index[-1], 'D')
+
+    full = SignalJournal(strategy, str(tmp_path_factory.mktemp('backfill')))
+    assert backfill(full, '5000d', InMemoryProvider(close_df)) == len(journal)
+    with pytest.raises(ValueError, match="비어 있지 않습니다"):
+        backfill(full, '5000d', InMemoryProvider(close_df))
+    assert full.names == journal.names
+    assert full.records().tobytes() == journal.records().tobytes()
+    assert journal.records()['contiguous'][1:].all()
+
+
+def test_between_and_rebalances(close_df, strategy, journal_dir):
+    journal = SignalJournal(strategy, journal_dir)
+    records = journal.records()
+    start, end = close_df.index[-120], close_df.index[-30]
+
+    selected = journal.between(start.strftime('%Y-%m-%d'), end.strftime('%Y-%m-%d'))
+    in_range = (records['date'] >= np.datetime64(start, 'D')) & (records['date'] <= np.datetime64(end, 'D'))
+    assert selected.tobytes() == records[in_range].tobytes()
+    assert len(journal.between()) == len(journal)
+
+    rebalances = journal.rebalances(start, end)
+    assert len(rebalances) > 0
+    np.testing.assert_array_equal(rebalances['date'], selected['date'][selected['rebalance']])
+    # 리밸런싱 레코드는 전날과 목표 비중이 다름
+    for day in rebalances['date']:
+        k = journal.index_of(day)
+        assert not np.array_equal(records['weights'][k], records['weights'][k - 1])
+
+
+def test_report_at_matches_full_replay(close_df, strategy, journal_dir):
+    journal = SignalJournal(strategy, journal_dir)
+    rebalance_day = journal.rebalances()['date'][-1]
+    for day in (close_df.index[-1], close_df.index[-NEW_BARS - 1], rebalance_day):
+        day = np.datetime64(day, 'D')
+        replay = compute_signal(close_df[close_df.index <= day], strategy, use_snapshot=False)
+        assert journal.report_at(day) == build_report(replay, strategy)
+
+    assert journal.report_at(close_df.index[0]) is None
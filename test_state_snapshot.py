@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+import daily_signal_generator
+import daily_signal_generator_채권실물자산
+from benchmark import make_fixture
+from signal_core import advance_signal, build_report, compute_signal, strategy_tickers
+from state_snapshot import resume_position
+
+# --- [스냅샷 증분 재개 테스트] ---
+# 앞부분(prefix)으로 만든 스냅샷에서 새 봉만 진행한 결과가 전체 재계산(compute_signal)과 같은지,
+# 배당/분할 재조정(티커별 일정 비율)은 상태를 유지한 채 새 기준으로 맞추고,
+# 그 밖의 가격 수정은 스냅샷을 버리고 전체 재계산하는지 확인합니다.
+
+NEW_BARS = 10
+
+
+@pytest.fixture(scope='module', params=['synthetic', 'real'])
+def strategy(request):
+    module = daily_signal_generator if request.param == 'synthetic' else daily_signal_generator_채권실물자산
+    return module.STRATEGY
+
+
+@pytest.fixture(scope='module')
+def close_df(strategy):
+    return make_fixture(600, 5, seed=2).ffill()[strategy_tickers(strategy)]
+
+
+def _assert_same_signal(signal, expected, strategy):
+    np.testing.assert_array_equal(signal['states'][:, :, -2:], expected['states'][:, :, -2:])
+    np.testing.assert_array_equal(signal['is_rising'][-2:], expected['is_rising'][-2:])
+    np.testing.assert_allclose(signal['ma_last'], expected['ma_last'], rtol=1e-12)
+    assert build_report(signal, strategy) == build_report(expected, strategy)
+
+
+def _pre_adjustment(close_df, adjustments):
+    """조정 이벤트 이전 공급자 기준의 가격: {ticker: (ex_date 위치, 비율)} -> ex_date 이전 봉 / 비율."""
+    old = close_df.copy()
+    for ticker, (position, ratio) in adjustments.items():
+        old.loc[old.index < close_df.index[position], ticker] /= ratio
+    return old
+
+
+def test_incremental_resume_matches_full_replay(close_df, strategy):
+    _, snapshot = advance_signal(close_df.iloc[:-NEW_BARS], strategy)
+    assert snapshot is not None
+
+    signal, updated = advance_signal(close_df, strategy, snapshot)
+    assert updated['last_date'] == close_df.index[-1].strftime('%Y-%m-%d')
+    _assert_same_signal(signal, compute_signal(close_df, strategy, use_snapshot=False), strategy)
+
+
+def test_constant_adjustment_rebases_snapshot(close_df, strategy):
+    # IEF 배당(ex: 새 봉 구간), QQQ 2:1 분할 -> 스냅샷은 조정 전 기준으로 만들어짐
+    old = _pre_adjustment(close_df, {'IEF': (-5, 0.997), 'QQQ': (-3, 0.5)})
+    _, snapshot = advance_signal(old.iloc[:-NEW_BARS], strategy)
+
+    k, rebased = resume_position(snapshot, close_df, strategy['ma_windows'], strategy['bond_mode'],
+                                 strategy['rising_bond'], strategy['falling_bond'])
+    assert k == len(close_df) - NEW_BARS - 1
+    assert rebased is not snapshot
+    assert rebased['states'] == snapshot['states']
+
+    signal, _ = advance_signal(close_df, strategy, snapshot)
+    _assert_same_signal(signal, compute_signal(close_df, strategy, use_snapshot=False), strategy)
+
+
+def test_non_constant_change_falls_back_to_full_replay(close_df, strategy, capsys):
+    _, snapshot = advance_signal(close_df.iloc[:-NEW_BARS], strategy)
+    corrected = close_df.copy()
+    corrected.iloc[-NEW_BARS - 3, corrected.columns.get_loc('GLD')] *= 1.02  # 스냅샷 꼬리 안의 한 봉만 수정
+
+    k, resumed = resume_position(snapshot, corrected, strategy['ma_windows'], strategy['bond_mode'],
+                                 strategy['rising_bond'], strategy['falling_bond'])
+    assert (k, resumed) == (None, None)
+    assert "전체 재계산" in capsys.readouterr().err
+
+    signal, _ = advance_signal(corrected, strategy, snapshot)
+    _assert_same_signal(signal, compute_signal(corrected, strategy, use_snapshot=False), strategy)
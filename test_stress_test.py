@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest import _strategy_params, signal_history
+from benchmark import make_fixture
+from stress_test import (SERIES, batch_signals, historical_increments, path_levels, path_rngs, regime_increments,
+                         run_stress_test)
+
+# --- [스트레스 테스트 경로 / 신호 테스트] ---
+# 경로별 난수이므로 결과가 --chunk 와 무관한지, 경로 묶음 신호(batch_signals)가
+# 한 경로씩 계산한 backtest.signal_history 와 같은지 확인합니다.
+
+N_PATHS = 7
+HORIZON = 120
+
+
+@pytest.fixture(scope='module')
+def close_df():
+    return make_fixture(700, 5, seed=6).ffill().dropna()
+
+
+@pytest.mark.parametrize('bond_mode', ['synthetic', 'real'])
+def test_paths_do_not_depend_on_chunk(close_df, bond_mode):
+    params = _strategy_params(bond_mode)
+    results = [run_stress_test(close_df, params, bond_mode, n_paths=N_PATHS, horizon=HORIZON, chunk=chunk, seed=3)
+               for chunk in (N_PATHS, 3, 1)]
+    for result in results[1:]:
+        pd.testing.assert_frame_equal(result, results[0])
+
+    # 경로 앞부분은 전체 경로 수와도 무관
+    fewer = run_stress_test(close_df, params, bond_mode, n_paths=3, horizon=HORIZON, chunk=2, seed=3)
+    expected = results[0][results[0]['path'] < 3].reset_index(drop=True)
+    pd.testing.assert_frame_equal(fewer, expected)
+
+
+@pytest.mark.parametrize('bond_mode', ['synthetic', 'real'])
+def test_batch_signals_match_signal_history(close_df, bond_mode):
+    params = _strategy_params(bond_mode)
+    warmup = 252
+    prefix = close_df[SERIES].to_numpy(dtype=np.float64)[-warmup:]
+    increments, _ = regime_increments(historical_increments(close_df), _one_regime(), HORIZON, path_rngs(0, 1, 0, 2))
+    levels = path_levels(prefix, increments)
+
+    scalars, is_rising = batch_signals(levels, params, [params['n_band']], bond_mode)
+    assert (np.diff(scalars[params['n_band']][..., warmup:], axis=-1) != 0).any()
+    for path in range(levels.shape[1]):
+        path_df = pd.DataFrame(levels[:, path].T, columns=SERIES,
+                               index=pd.bdate_range('2020-01-01', periods=levels.shape[-1]))
+        history = signal_history(path_df, params['ma_windows'], params['n_band'], params['scalar_map'],
+                                 params['rate_ma_window'], bond_mode)
+        np.testing.assert_array_equal(scalars[params['n_band']][:, path], history['scalars'])
+        np.testing.assert_array_equal(is_rising[path], history['is_rising'])
+
+
+def _one_regime():
+    # 시험용: 과거 평균 / 공분산 그대로, 변동성 2배 (상태 전환이 자주 일어나도록)
+    return {'normal': {'drift': None, 'vol': 2.0, 'rate_drift': 0.0, 'duration': 500, 'weight': 1.0, 'bond_sign': 1}}
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import rolling_stats
+from benchmark import make_fixture
+from hysteresis_engine import hysteresis_states
+from universe import price_matrix, universe_states
+
+# --- [유니버스 모드 동등성 테스트] ---
+# 청크 단위 float32 / uint8 경로(universe_states)가 float64 전체 배열 경로(hysteresis_states)와
+# 같은 상태 이력을 내는지 여러 청크 크기로 확인합니다.
+# 상장 전 구간이 NaN 인 티커를 청크 경계(chunk=5 의 두 번째 청크 시작)에, 데이터가 없는 티커를 마지막에 둡니다.
+
+MA_WINDOWS = [20, 120, 200]
+N_BAND = 0.03
+LATE_LISTING = 5
+
+
+@pytest.fixture(scope='module')
+def prices():
+    close_df = make_fixture(500, 12, seed=5).drop(columns=['^TNX'])
+    close_df.iloc[:150, LATE_LISTING] = np.nan
+    return price_matrix(close_df, list(close_df.columns) + ['MISSING'])
+
+
+@pytest.fixture(scope='module')
+def reference(prices):
+    prices = prices.astype(np.float64)
+    ma = rolling_stats.rolling_means(prices, MA_WINDOWS)
+    upper, lower = rolling_stats.band_arrays(ma, N_BAND)
+    return hysteresis_states(prices, upper, lower, max(MA_WINDOWS) - 1), ma[:, :, -1]
+
+
+@pytest.mark.parametrize('chunk', [1, 4, 5, 64])
+def test_chunked_states_match_float64_engine(prices, reference, chunk):
+    expected_states, expected_ma = reference
+    states, ma_last = universe_states(prices, MA_WINDOWS, N_BAND, chunk)
+
+    assert states.dtype == np.uint8 and ma_last.dtype == np.float32
+    np.testing.assert_array_equal(states, expected_states)
+    np.testing.assert_allclose(ma_last, expected_ma, rtol=1e-6)
+
+
+def test_nan_padded_tickers(prices):
+    states, ma_last = universe_states(prices, MA_WINDOWS, N_BAND, chunk=5)
+
+    assert prices.shape[0] % 5 != 0  # 마지막 청크는 chunk 보다 작음
+    assert np.isfinite(ma_last[LATE_LISTING]).all()
+    # 상장 전 + MA 가 채워지기 전 구간은 OFF
+    for j, window in enumerate(MA_WINDOWS):
+        assert not states[LATE_LISTING, j, :150 + window - 1].any()
+    assert states[LATE_LISTING].any()
+    assert np.isnan(ma_last[-1]).all()
+    assert not states[-1].any()
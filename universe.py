@@ -0,0 +1,233 @@
+import argparse
+import csv
+import json
+import os
+import sys
+
+import numpy as np
+
+import rolling_stats
+from hysteresis_engine import hysteresis_states, scalar_table
+from metrics import session, stage
+from signal_core import ROLLING_METHOD
+
+# --- [유니버스 모드 (수백 ~ 수천 티커)] ---
+# QQQ / GLD / Tactical_Bond 대신 임의의 티커 목록(섹터 / 국가 ETF 등)에 같은 N_BAND 이격도 밴드와
+# SCALAR_MAP 점수를 적용하여 자산별 목표 비중을 계산합니다. (^TNX 채권 스위칭은 없음)
+#   목표 비중 = 기본 비중 × SCALAR_MAP[ON 개수],  남은 비중은 현금
+#
+# 상태는 문자열 키 dict 대신 배열로 보관합니다.
+#   가격 / MA        : float32 (N, T) / (N, W)
+#   ON/OFF 상태 이력 : uint8   (N, W, T)
+#   점수             : uint8   (N, T)
+# 이동평균 누적합은 float64 로 계산한 뒤 float32 로 저장하며, 이격도 비교도 float32 값으로 합니다.
+# 티커를 UNIVERSE_CHUNK 개씩 나누어 처리하므로 중간 버퍼 메모리는 유니버스 크기와 무관합니다.
+#
+# 유니버스 정의 (JSON, 생략한 키는 daily_signal_generator.py 의 값 사용):
+#   {"name": "sector_etfs",
+#    "tickers": ["XLB", "XLE", "XLF", ...],          # 동일 비중 (1/N)
+#    "weights": {"XLE": 0.2, ...},                   # 또는 티커별 기본 비중 (tickers 대신)
+#    "tickers_file": "universe.txt",                 # 또는 한 줄에 티커 하나인 파일
+#    "n_band": 0.03, "ma_windows": [20, 120, 200], "scalar_map": {"3": 1.0, "2": 0.75, "1": 0.5, "0": 0.0}}
+
+UNIVERSE_CHUNK = 64
+
+
+def load_universe(config, defaults=None):
+    """유니버스 정의 dict -> 설정 dict (tickers, base_weights (N,) float32, n_band, ma_windows, scalar_map)."""
+    if defaults is None:
+        import daily_signal_generator
+        defaults = daily_signal_generator.STRATEGY
+
+    if 'weights' in config:
+        tickers = list(config['weights'])
+        base_weights = np.array([config['weights'][ticker] for ticker in tickers], dtype=np.float32)
+    else:
+        tickers = config.get('tickers')
+        if tickers is None:
+            with open(config['tickers_file'], 'r', encoding='utf-8') as f:
+                tickers = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+        tickers = list(dict.fromkeys(tickers)) # 중복 제거 (순서 유지)
+        base_weights = np.full(len(tickers), 1.0 / max(len(tickers), 1), dtype=np.float32)
+
+    if len(tickers) == 0:
+        raise ValueError("유니버스에 티커가 없습니다.")
+    if base_weights.sum() > 1.0 + 1e-6:
+        raise ValueError(f"기본 비중의 합이 1 을 넘습니다: {base_weights.sum():.4f}")
+
+    return {
+        'name': config.get('name', 'universe'),
+        'tickers': tickers,
+        'base_weights': base_weights,
+        'n_band': float(config.get('n_band', defaults['n_band'])),
+        'ma_windows': list(config.get('ma_windows', defaults['ma_windows'])),
+        'scalar_map': {int(k): float(v) for k, v in config.get('scalar_map', defaults['scalar_map']).items()},
+    }
+
+
+def price_matrix(close_df, tickers):
+    """종가 DataFrame -> (N, T) float32 (ffill, 없는 티커는 NaN 행)."""
+    close_df = close_df.reindex(columns=tickers).ffill()
+    return np.ascontiguousarray(close_df.to_numpy(dtype=np.float32).T)
+
+
+def universe_states(prices, ma_windows, n_band, chunk=UNIVERSE_CHUNK):
+    """(N, T) 가격의 이격도 상태 이력 (N, W, T) uint8 과 마지막 MA (N, W) float32.
+
+    티커를 chunk 개씩 처리합니다 (MA / 밴드 버퍼는 chunk 크기만큼만 할당).
+    """
+    n, t = prices.shape
+    n_windows = len(ma_windows)
+    states = np.empty((n, n_windows, t), dtype=np.uint8)
+    ma_last = np.empty((n, n_windows), dtype=np.float32)
+    ma_buf = np.empty((min(chunk, n), n_windows, t), dtype=np.float32)
+    band_buf = np.empty((2,) + ma_buf.shape, dtype=np.float32)
+
+    for lo in range(0, n, chunk):
+        hi = min(lo + chunk, n)
+        block = prices[lo:hi]
+        ma = rolling_stats.rolling_means(block, ma_windows, method=ROLLING_METHOD, out=ma_buf[:hi - lo])
+        upper, lower = rolling_stats.band_arrays(ma, n_band, out=band_buf[:, :hi - lo])
+        states[lo:hi] = hysteresis_states(block, upper, lower, max(ma_windows) - 1)
+        ma_last[lo:hi] = ma[:, :, -1]
+    return states, ma_last
+
+
+def universe_signal(close_df, universe, chunk=UNIVERSE_CHUNK):
+    """유니버스 전체의 상태 / 점수 / 오늘·어제 목표 비중을 계산합니다."""
+    tickers = universe['tickers']
+    with stage('prepare', rows=len(close_df)):
+        prices = price_matrix(close_df, tickers)
+    with stage('universe_states', rows=prices.shape[0] * prices.shape[1]):
+        states, ma_last = universe_states(prices, universe['ma_windows'], universe['n_band'], chunk)
+        scores = states.sum(axis=1, dtype=np.uint8)
+
+    # 오늘 / 어제 목표 비중 (SCALAR_MAP 에 없는 점수는 NaN, signal_core 와 동일)
+    table = scalar_table(universe['scalar_map'], len(universe['ma_windows'])).astype(np.float32)
+    scalars = table[scores[:, -2:]]
+    weights = universe['base_weights'][:, None] * scalars
+    return {
+        'tickers': tickers,
+        'dates': list(close_df.index),
+        'prices_last': prices[:, -1],
+        'ma_last': ma_last,
+        'states': states,
+        'scores': scores,
+        'weights': weights[:, -1],
+        'yesterday_weights': weights[:, -2],
+        'cash': float(1.0 - np.nansum(weights[:, -1], dtype=np.float64)),
+        'yesterday_cash': float(1.0 - np.nansum(weights[:, -2], dtype=np.float64)),
+        'no_data': [tickers[i] for i in np.flatnonzero(np.isnan(prices[:, -1]))],
+    }
+
+
+def changed_assets(signal):
+    today, yesterday = signal['weights'], signal['yesterday_weights']
+    same = (today == yesterday) | (np.isnan(today) & np.isnan(yesterday))
+    return np.flatnonzero(~same)
+
+
+def universe_summary(signal, universe):
+    changed = changed_assets(signal)
+    return {
+        'name': universe['name'],
+        'date': signal['dates'][-1].strftime('%Y-%m-%d'),
+        'n_assets': len(signal['tickers']),
+        'n_on': int((signal['scores'][:, -1] > 0).sum()),
+        'cash': round(signal['cash'], 6), # float32 비중의 표시 오차 제거
+        'yesterday_cash': round(signal['yesterday_cash'], 6),
+        'rebalance': bool(len(changed)),
+        'changed': [signal['tickers'][i] for i in changed],
+        'no_data': signal['no_data'],
+        'weights': {ticker: round(float(w), 6) for ticker, w in zip(signal['tickers'], signal['weights'])},
+    }
+
+
+def write_weights_csv(signal, universe, out=sys.stdout):
+    writer = csv.writer(out)
+    writer.writerow(['ticker', 'base_weight', 'score', 'weight', 'yesterday_weight', 'price', 'changed']
+                    + [f"ma_{window}" for window in universe['ma_windows']])
+    changed = np.zeros(len(signal['tickers']), dtype=bool)
+    changed[changed_assets(signal)] = True
+    for i, ticker in enumerate(signal['tickers']):
+        writer.writerow([ticker, f"{universe['base_weights'][i]:.6f}", int(signal['scores'][i, -1]),
+                         f"{signal['weights'][i]:.6f}", f"{signal['yesterday_weights'][i]:.6f}",
+                         f"{signal['prices_last'][i]:.4f}", int(changed[i])]
+                        + [f"{value:.4f}" for value in signal['ma_last'][i]])
+
+
+def build_universe_report(signal, universe, top=20):
+    """텔레그램용 요약 (리밸런싱 여부, 변경 자산 상위 top 개, 현금)."""
+    changed = changed_assets(signal)
+    n_windows = len(universe['ma_windows'])
+    report = [f"🔔 Adaptive-Hysteresis-TAA 유니버스 ({universe['name']}, {len(signal['tickers'])}개)"]
+    report.append(f"({signal['dates'][-1].strftime('%Y-%m-%d %A')} 마감 기준)")
+    action = "매매 필요" if len(changed) else "매매 불필요"
+    report.append(f"\n리밸런싱 신호: \"{action}\" (변경 {len(changed)}개)")
+    report.append(f"ON 자산: {int((signal['scores'][:, -1] > 0).sum())}개 / 현금: "
+                  f"{signal['yesterday_cash']:.1%} -> {signal['cash']:.1%}")
+    if signal['no_data']:
+        report.append(f"⚠️ 데이터 없음 (OFF 처리): {', '.join(signal['no_data'][:top])}")
+
+    if len(changed):
+        delta = np.nan_to_num(signal['weights'][changed] - signal['yesterday_weights'][changed])
+        report.append("\n```")
+        for i in changed[np.argsort(-np.abs(delta))][:top]:
+            emoji = "🔼" if signal['weights'][i] > signal['yesterday_weights'][i] else "🔽"
+            report.append(f"{signal['tickers'][i].ljust(8)}: {signal['yesterday_weights'][i]:6.2%} -> "
+                          f"{signal['weights'][i]:6.2%} {emoji} ({int(signal['scores'][i, -1])}/{n_windows})")
+        if len(changed) > top:
+            report.append(f"... 외 {len(changed) - top}개")
+        report.append("```")
+    return "\n".join(report)
+
+
+def load_universe_prices(tickers, period="400d", prices_path=None, provider=None):
+    """가격 파일 또는 공급자에서 유니버스 종가를 받습니다 (일부 티커 실패는 경고 후 NaN)."""
+    if prices_path is not None:
+        from backtest import load_price_file
+        return load_price_file(prices_path)
+    if provider is None:
+        from market_data import default_provider
+        provider = default_provider()
+    with stage('download') as m:
+        market = provider.get_close(tickers, period)
+        m['rows'] = len(market['close'])
+    if market['close'].empty:
+        raise ValueError("데이터 다운로드에 실패했습니다.")
+    if market['stale']:
+        print(f"오래된 데이터 ({market['source']}): {len(market['stale'])}개 티커", file=sys.stderr)
+    return market['close']
+
+
+# --- [메인 실행] ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adaptive-Hysteresis-TAA 유니버스 모드")
+    parser.add_argument('config', help="유니버스 정의 JSON 파일")
+    parser.add_argument('--prices', help="종가 파일 (CSV/Parquet, 날짜 × 티커). 없으면 공급자에서 다운로드")
+    parser.add_argument('--period', default='400d')
+    parser.add_argument('--chunk', type=int, default=UNIVERSE_CHUNK)
+    parser.add_argument('--format', choices=['report', 'csv', 'json'], default='report')
+    args = parser.parse_args()
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        if 'tickers_file' in config:
+            config['tickers_file'] = os.path.join(os.path.dirname(args.config), config['tickers_file'])
+        universe = load_universe(config)
+
+        with session(universe['name']):
+            close_df = load_universe_prices(universe['tickers'], args.period, args.prices)
+            signal = universe_signal(close_df, universe, args.chunk)
+
+        if args.format == 'csv':
+            write_weights_csv(signal, universe)
+        elif args.format == 'json':
+            print(json.dumps(universe_summary(signal, universe), ensure_ascii=False, indent=2))
+        else:
+            print(build_universe_report(signal, universe))
+
+    except Exception as e:
+        print(f"오류가 발생했습니다: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,224 @@
+import argparse
+import json
+import os
+import sys
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from backtest import (
+    _strategy_params, asset_returns, format_metrics, load_price_file, performance_metrics, portfolio_returns,
+    run_backtest, signal_history, target_weights,
+)
+from param_sweep import (
+    METRIC_COLUMNS, PRICE_COLUMNS, _attach, _parse_floats, _parse_window_sets, _to_shared, precompute_ma,
+    simplex_weights,
+)
+
+# --- [워크포워드 최적화] ---
+# 학습 구간(train_years)에서 파라미터(N_BAND × MA_WINDOWS × SCALAR_MAP × BASE_WEIGHTS)를 고르고,
+# 바로 다음 검증 구간(test_years)에 적용한 결과만 이어붙여 표본 외(out-of-sample) 수익 곡선을 만듭니다.
+# 검증 구간만큼 앞으로 이동하며 반복합니다 (--anchored: 학습 시작일 고정, 확장 윈도우).
+#
+# 신호는 backtest.py / signal_core 와 같은 로직(get_daily_signals_and_report 와 동일)입니다.
+#   * 이동평균은 전체 이력에 대해 부모 프로세스에서 한 번만 계산하여 공유 메모리로 전달
+#     (이동평균은 과거 값만 사용하므로 전체 이력 계산 후 구간을 잘라도 미래 정보가 섞이지 않음)
+#   * 폴드(fold)는 프로세스 풀에서 병렬로 실행되고, 워커는 신호 조합별 스케일러 이력을 캐시하여
+#     겹치는 폴드 사이에서 재사용
+#   * 검증 구간 첫날 수익률은 학습 구간 마지막 날 종가에 새 파라미터로 맞춘 비중을 기준으로 함
+
+MINIMIZE = ('volatility', 'annual_turnover')
+
+_worker = {}
+
+
+def make_folds(dates, start, end, train_years=5, test_years=1, anchored=False):
+    """[(train_start, train_end, test_start, test_end), ...] (각 구간은 [시작, 끝) 날짜)."""
+    start, end = pd.Timestamp(start), pd.Timestamp(end) + pd.Timedelta(days=1)
+    train = pd.DateOffset(years=train_years)
+    test = pd.DateOffset(years=test_years)
+    folds = []
+    train_start = start
+    while train_start + train < end:
+        test_start = train_start + train
+        test_end = min(test_start + test, end)
+        folds.append((start if anchored else train_start, test_start, test_start, test_end))
+        train_start = train_start + test
+    if not folds:
+        raise ValueError(f"기간이 학습 구간({train_years}년)보다 짧습니다: {start.date()} ~ {end.date()}")
+    return folds
+
+
+def _init_worker(price_spec, ma_spec, ma_keys, dates, options):
+    price_shm, prices = _attach(price_spec)
+    ma_shm, ma = _attach(ma_spec)
+    close_df = pd.DataFrame(prices, index=pd.DatetimeIndex(dates), columns=PRICE_COLUMNS, copy=False)
+    _worker.update({
+        'shm': (price_shm, ma_shm), # 워커가 살아있는 동안 매핑 유지
+        'close_df': close_df,
+        'returns': asset_returns(close_df),
+        'ma_cache': {key: ma[i] for i, key in enumerate(ma_keys)},
+        'signals': {}, # (n_band, ma_windows, scalar_map) -> 전체 이력 스케일러 (폴드 간 재사용)
+        'options': options,
+    })
+
+
+def _signal(n_band, ma_windows, scalar_map):
+    key = (n_band, tuple(ma_windows), json.dumps(scalar_map, sort_keys=True))
+    if key not in _worker['signals']:
+        opts = _worker['options']
+        _worker['signals'][key] = signal_history(
+            _worker['close_df'], ma_windows, n_band, scalar_map, opts['rate_ma_window'], opts['bond_mode'],
+            ma_cache=_worker['ma_cache'],
+        )
+    return _worker['signals'][key]
+
+
+def window_returns(history, base_weights, returns, lo, hi):
+    """[lo, hi) 봉의 일별 수익률 (lo 일 수익률은 lo-1 일 종가 비중 기준) 과 (4, n) 비중."""
+    weights = target_weights(history['scalars'][:, lo - 1:hi], history['is_rising'][lo - 1:hi], base_weights)
+    daily = portfolio_returns(weights, returns[:, lo - 1:hi])
+    return daily[1:], weights[:, 1:]
+
+
+def _score(metrics, objective):
+    value = metrics[objective]
+    if not np.isfinite(value):
+        return -np.inf
+    return -value if objective in MINIMIZE else value
+
+
+def _evaluate_fold(task):
+    fold_index, (train_start, train_end, test_start, test_end), grid, weight_sets = task
+    opts = _worker['options']
+    dates = _worker['close_df'].index
+    returns = _worker['returns']
+    train_lo, train_hi = dates.searchsorted(train_start), dates.searchsorted(train_end)
+    test_lo, test_hi = dates.searchsorted(test_start), dates.searchsorted(test_end)
+    train_lo = max(train_lo, 1)
+
+    best = None
+    for n_band, ma_windows, scalar_map in grid:
+        history = _signal(n_band, ma_windows, scalar_map)
+        for w_qqq, w_gld, w_bond in weight_sets:
+            base_weights = {'QQQ': w_qqq, 'GLD': w_gld, 'Tactical_Bond': w_bond}
+            daily, weights = window_returns(history, base_weights, returns, train_lo, train_hi)
+            daily[0] = 0.0 # run_backtest 와 같이 구간 첫날은 시작점
+            metrics = performance_metrics(daily, weights, dates[train_lo:train_hi])
+            score = _score(metrics, opts['objective'])
+            if best is None or score > best[0]:
+                best = (score, (n_band, ma_windows, scalar_map, w_qqq, w_gld, w_bond), metrics)
+
+    _, params, train_metrics = best
+    n_band, ma_windows, scalar_map, w_qqq, w_gld, w_bond = params
+    history = _signal(n_band, ma_windows, scalar_map)
+    base_weights = {'QQQ': w_qqq, 'GLD': w_gld, 'Tactical_Bond': w_bond}
+    test_daily, test_weights = window_returns(history, base_weights, returns, test_lo, test_hi)
+    return {
+        'fold': fold_index,
+        'train_start': dates[train_lo], 'train_end': dates[train_hi - 1],
+        'test_start': dates[test_lo], 'test_end': dates[test_hi - 1],
+        'n_band': n_band, 'ma_windows': '/'.join(map(str, ma_windows)),
+        'scalar_map': json.dumps(scalar_map, sort_keys=True),
+        'w_qqq': w_qqq, 'w_gld': w_gld, 'w_bond': w_bond,
+        **{f"train_{col}": float(train_metrics[col]) for col in METRIC_COLUMNS},
+        **{f"test_{col}": float(value) for col, value in
+           performance_metrics(test_daily, test_weights, dates[test_lo:test_hi]).items()},
+        'daily': test_daily,
+        'weights': test_weights,
+    }
+
+
+def run_walk_forward(close_df, folds, grid, weight_sets, rate_ma_window=200, bond_mode='synthetic',
+                     objective='sharpe', workers=None):
+    """폴드별 최적 파라미터와 이어붙인 표본 외 결과를 반환합니다."""
+    close_df = close_df[PRICE_COLUMNS]
+    window_union = sorted({w for _, ma_windows, _ in grid for w in ma_windows})
+    ma_keys, ma = precompute_ma(close_df, window_union, rate_ma_window, bond_mode)
+
+    price_shm, price_spec = _to_shared(np.ascontiguousarray(close_df.to_numpy(dtype=np.float64)))
+    ma_shm, ma_spec = _to_shared(ma)
+    options = {'rate_ma_window': rate_ma_window, 'bond_mode': bond_mode, 'objective': objective}
+    tasks = [(i, fold, grid, weight_sets) for i, fold in enumerate(folds)]
+    try:
+        with Pool(workers, _init_worker, (price_spec, ma_spec, ma_keys, close_df.index.values, options)) as pool:
+            results = sorted(pool.imap_unordered(_evaluate_fold, tasks), key=lambda r: r['fold'])
+    finally:
+        for shm in (price_shm, ma_shm):
+            shm.close()
+            shm.unlink()
+
+    # 검증 구간 이어붙이기 (폴드 경계의 파라미터 변경에 따른 매매도 회전율에 포함)
+    dates = close_df.index
+    oos_dates = dates[np.concatenate([np.arange(*dates.searchsorted([r['test_start'], r['test_end']]) + [0, 1])
+                                      for r in results])]
+    daily = np.concatenate([r['daily'] for r in results])
+    daily[0] = 0.0
+    weights = np.concatenate([r['weights'] for r in results], axis=1)
+    oos = pd.DataFrame({
+        'returns': daily,
+        'equity': np.cumprod(1.0 + daily),
+        'fold': np.concatenate([np.full(len(r['daily']), r['fold']) for r in results]),
+    }, index=oos_dates)
+    fold_table = pd.DataFrame([{k: v for k, v in r.items() if k not in ('daily', 'weights')} for r in results])
+    return {
+        'folds': fold_table,
+        'oos': oos,
+        'metrics': performance_metrics(daily, weights, oos_dates),
+    }
+
+
+# --- [메인 실행] ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adaptive-Hysteresis-TAA 워크포워드 최적화")
+    parser.add_argument('--prices', default=os.environ.get('TAA_PRICE_FILE', 'prices.csv'))
+    parser.add_argument('--mode', choices=['synthetic', 'real'], default='synthetic')
+    parser.add_argument('--start', default='2005-09-06')
+    parser.add_argument('--end', default='2024-12-31')
+    parser.add_argument('--train-years', type=int, default=5)
+    parser.add_argument('--test-years', type=int, default=1)
+    parser.add_argument('--anchored', action='store_true', help="학습 시작일 고정 (확장 윈도우)")
+    parser.add_argument('--n-bands', default='0.01,0.02,0.03,0.04,0.05')
+    parser.add_argument('--windows', default='20,120,200;20,60,200;10,120,200;50,120,200')
+    parser.add_argument('--scalar-maps', default=None, help="SCALAR_MAP 목록 JSON 파일 (param_sweep.py 와 같음)")
+    parser.add_argument('--weight-step', type=float, default=0.05)
+    parser.add_argument('--objective', choices=METRIC_COLUMNS, default='sharpe')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', default='walk_forward.csv', help="폴드별 결과 CSV (수익 곡선은 *_equity.csv)")
+    args = parser.parse_args()
+
+    try:
+        defaults = _strategy_params(args.mode)
+        if args.scalar_maps:
+            with open(args.scalar_maps, 'r', encoding='utf-8') as f:
+                scalar_maps = [{int(k): float(v) for k, v in m.items()} for m in json.load(f)]
+        else:
+            scalar_maps = [defaults['scalar_map']]
+        grid = [(n_band, ma_windows, scalar_map) for n_band in _parse_floats(args.n_bands)
+                for ma_windows in _parse_window_sets(args.windows) for scalar_map in scalar_maps]
+        weight_sets = simplex_weights(args.weight_step)
+
+        close_df = load_price_file(args.prices)
+        folds = make_folds(close_df.index, args.start, args.end, args.train_years, args.test_years, args.anchored)
+        print(f"... 폴드 {len(folds)}개 × 조합 {len(grid) * len(weight_sets)}개 평가 중 ...", file=sys.stderr)
+
+        result = run_walk_forward(close_df, folds, grid, weight_sets, defaults['rate_ma_window'], args.mode,
+                                  args.objective, args.workers)
+        equity_path = os.path.splitext(args.out)[0] + '_equity.csv'
+        result['folds'].to_csv(args.out, index=False)
+        result['oos'].to_csv(equity_path, index_label='date')
+
+        oos = result['oos']
+        fixed = run_backtest(close_df, bond_mode=args.mode, start=oos.index[0], end=oos.index[-1], **defaults)
+        columns = ['train_start', 'test_start', 'test_end', 'n_band', 'ma_windows', 'w_qqq', 'w_gld', 'w_bond',
+                   f"train_{args.objective}", 'test_sharpe', 'test_cagr', 'test_mdd']
+        print(result['folds'][columns].to_string(index=False))
+        print(f"\n워크포워드 표본 외 ({oos.index[0].date()} ~ {oos.index[-1].date()})")
+        print(format_metrics(result['metrics']))
+        print(f"\n고정 파라미터 (현재 설정, 같은 구간)")
+        print(format_metrics(fixed['metrics']))
+        print(f"\n결과: {args.out} / 수익 곡선: {equity_path}")
+    except Exception as e:
+        print(f"오류가 발생했습니다: {e}", file=sys.stderr)
+        sys.exit(1)
@@ -0,0 +1,245 @@
+import argparse
+import itertools
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from backtest import (
+    TRADING_DAYS, _strategy_params, asset_returns, format_metrics, load_price_file, period_mask, run_backtest,
+    signal_history,
+)
+from metrics import session, stage
+from param_sweep import METRIC_COLUMNS, simplex_weights
+from walk_forward import MINIMIZE
+
+# --- [기본 비중(BASE_WEIGHTS) 최적화] ---
+# 이격도 스케일러와 채권 선택은 BASE_WEIGHTS 와 무관하므로, 전략을 후보 비중마다 다시 돌리지 않고
+# 자산별 "스케일 수익률" 행렬 C (3, T) 를 한 번만 만듭니다.
+#   C[QQQ, t] = 스케일러[QQQ, t-1] × QQQ 수익률[t]
+#   C[GLD, t] = 스케일러[GLD, t-1] × GLD 수익률[t]
+#   C[Tactical_Bond, t] = 스케일러[Tactical_Bond, t-1] × (t-1 일에 선택된 IEF / TLT 의 수익률[t])
+# 그러면 전략 일별 수익률은 비중 w (3,) 에 대해 w @ C (backtest.portfolio_returns 와 같은 값)이고,
+# 연간 회전율도 w 에 대한 1차식입니다 (비중 >= 0 이므로 |Δ(w × 스케일러)| = w × |Δ스케일러|).
+#
+# 탐색:
+#   * 단체(simplex) 격자 전체를 (K, 3) @ (3, T) 행렬곱으로 한 번에 평가한 뒤, 최적점 주변을 더 촘촘한
+#     격자로 refine 회 재탐색
+#   * sharpe 는 해석해도 계산: 롱온리 최대 샤프 해는 자신의 지지 집합(0 이 아닌 자산)에서 Σ⁻¹μ 에
+#     비례하므로, 지지 집합 7 가지를 모두 풀어 실행 가능한 해 중 최고를 고름 (비중 상/하한이 없을 때)
+
+OBJECTIVES = METRIC_COLUMNS + ['calmar']
+WEIGHT_COLUMNS = ['w_qqq', 'w_gld', 'w_bond']
+BATCH_ROWS = 1024 # 한 번에 행렬곱할 후보 수 (메모리 상한: BATCH_ROWS × T)
+
+
+# --- [1. 스케일 수익률 행렬] ---
+
+def scaled_returns(close_df, params, bond_mode='synthetic', start=None, end=None):
+    """[start, end] 구간의 C (3, n), 자산별 연간 회전율 계수 (3,), 날짜.
+
+    run_backtest 와 같이 구간 첫날 수익률은 0 (시작점) 입니다.
+    """
+    history = signal_history(close_df, params['ma_windows'], params['n_band'], params['scalar_map'],
+                             params['rate_ma_window'], bond_mode)
+    returns = asset_returns(close_df)
+    scalars, is_rising = history['scalars'], history['is_rising']
+
+    bond_returns = np.where(is_rising[:-1], returns[2, 1:], returns[3, 1:])
+    contributions = np.zeros(scalars.shape)
+    contributions[:, 1:] = scalars[:, :-1] * np.stack([returns[0, 1:], returns[1, 1:], bond_returns])
+    contributions = np.nan_to_num(contributions, nan=0.0) # portfolio_returns 의 nansum 과 같게
+
+    dates = close_df.index
+    mask = period_mask(dates, start, end)
+    dates_in = dates[mask]
+    contributions = contributions[:, mask]
+    contributions[:, 0] = 0.0
+
+    # 보유 비중 = 기본 비중 × 노출 (IEF / TLT 는 Tactical_Bond 비중을 나눠 가짐)
+    exposure = scalars[:, mask]
+    rising = is_rising[mask]
+    moves = np.abs(np.diff(np.stack([
+        exposure[0], exposure[1], np.where(rising, exposure[2], 0.0), np.where(rising, 0.0, exposure[2]),
+    ]), axis=1)).sum(axis=1)
+    years = (dates_in[-1] - dates_in[0]).days / 365.25
+    turnover = np.array([moves[0], moves[1], moves[2] + moves[3]]) / 2.0 / years
+    return contributions, turnover, dates_in
+
+
+# --- [2. 후보 일괄 평가] ---
+
+def batch_metrics(weights, contributions, turnover, dates, batch=BATCH_ROWS):
+    """후보 비중 (K, 3) 의 성과 DataFrame (backtest.performance_metrics 와 같은 정의)."""
+    weights = np.asarray(weights, dtype=np.float64).reshape(-1, 3)
+    years = (dates[-1] - dates[0]).days / 365.25
+    columns = {col: np.empty(len(weights)) for col in ('sharpe', 'cagr', 'mdd', 'volatility')}
+    for lo in range(0, len(weights), batch):
+        daily = weights[lo:lo + batch] @ contributions # (k, n)
+        std = daily.std(axis=1, ddof=1)
+        equity = np.cumprod(1.0 + daily, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            columns['sharpe'][lo:lo + batch] = daily.mean(axis=1) / std * np.sqrt(TRADING_DAYS)
+        columns['cagr'][lo:lo + batch] = equity[:, -1] ** (1.0 / years) - 1.0
+        columns['mdd'][lo:lo + batch] = (equity / np.maximum.accumulate(equity, axis=1) - 1.0).min(axis=1)
+        columns['volatility'][lo:lo + batch] = std * np.sqrt(TRADING_DAYS)
+
+    frame = pd.DataFrame(weights, columns=WEIGHT_COLUMNS)
+    for col, values in columns.items():
+        frame[col] = values
+    frame['annual_turnover'] = weights @ turnover
+    with np.errstate(divide='ignore', invalid='ignore'):
+        frame['calmar'] = frame['cagr'] / -frame['mdd']
+    return frame
+
+
+def max_sharpe_weights(contributions):
+    """롱온리 최대 샤프 비중 (3,) (지지 집합별 Σ⁻¹μ 중 최고). 양의 해가 없으면 None."""
+    mean = contributions.mean(axis=1)
+    cov = np.cov(contributions)
+    best, best_sharpe = None, -np.inf
+    for size in (1, 2, 3):
+        for support in itertools.combinations(range(3), size):
+            idx = list(support)
+            try:
+                x = np.linalg.solve(cov[np.ix_(idx, idx)], mean[idx])
+            except np.linalg.LinAlgError:
+                continue
+            if not (x > 0).all():
+                continue
+            w = np.zeros(3)
+            w[idx] = x / x.sum()
+            sharpe = w @ mean / np.sqrt(w @ cov @ w)
+            if sharpe > best_sharpe:
+                best, best_sharpe = w, sharpe
+    return best
+
+
+# --- [3. 최적화] ---
+
+def _scores(frame, objective, min_cagr=None):
+    values = frame[objective].to_numpy(dtype=np.float64)
+    scores = -values if objective in MINIMIZE else values.copy()
+    scores[~np.isfinite(scores)] = -np.inf
+    if min_cagr is not None:
+        scores[~(frame['cagr'].to_numpy() >= min_cagr)] = -np.inf
+    return scores
+
+
+def _feasible(weights, min_weight, max_weight):
+    weights = np.round(np.asarray(weights, dtype=np.float64).reshape(-1, 3), 10)
+    keep = ((weights >= min_weight - 1e-12) & (weights <= max_weight + 1e-12)).all(axis=1)
+    return weights[keep]
+
+
+def _local_grid(center, step, radius=5):
+    """center 주변 ±radius × step 의 단체 격자 (합 1)."""
+    offsets = np.arange(-radius, radius + 1) * step
+    qqq, gld = np.meshgrid(center[0] + offsets, center[1] + offsets, indexing='ij')
+    qqq, gld = qqq.ravel(), gld.ravel()
+    return np.column_stack([qqq, gld, 1.0 - qqq - gld])
+
+
+def optimize_weights(contributions, turnover, dates, objective='sharpe', step=0.05, refine=2,
+                     min_weight=0.0, max_weight=1.0, min_cagr=None):
+    """평가한 모든 후보를 점수 순으로 정렬한 DataFrame (첫 행이 최적, source: grid / refine / analytic)."""
+    if objective not in OBJECTIVES:
+        raise ValueError(f"지원하지 않는 목표입니다: {objective} (가능: {', '.join(OBJECTIVES)})")
+    if min_weight * 3 > 1.0 + 1e-12 or max_weight * 3 < 1.0 - 1e-12:
+        raise ValueError(f"비중 범위 [{min_weight}, {max_weight}] 로는 합이 1 이 될 수 없습니다.")
+
+    candidates = _feasible(simplex_weights(step), min_weight, max_weight)
+    if not len(candidates):
+        raise ValueError(f"비중 범위 [{min_weight}, {max_weight}] 안에 격자점이 없습니다 (step={step}).")
+    frame = batch_metrics(candidates, contributions, turnover, dates)
+    frame['source'] = 'grid'
+    frames = [frame]
+
+    best = frame.loc[np.argmax(_scores(frame, objective, min_cagr)), WEIGHT_COLUMNS].to_numpy(dtype=np.float64)
+    for _ in range(refine):
+        step /= 5.0
+        local = _feasible(_local_grid(best, step), min_weight, max_weight)
+        frame = batch_metrics(local, contributions, turnover, dates)
+        frame['source'] = 'refine'
+        frames.append(frame)
+        scores = _scores(frame, objective, min_cagr)
+        if np.isfinite(scores.max()):
+            best = frame.loc[np.argmax(scores), WEIGHT_COLUMNS].to_numpy(dtype=np.float64)
+
+    if objective == 'sharpe':
+        analytic = max_sharpe_weights(contributions)
+        if analytic is not None and len(_feasible(analytic, min_weight, max_weight)):
+            frame = batch_metrics(analytic, contributions, turnover, dates)
+            frame['source'] = 'analytic'
+            frames.append(frame)
+
+    results = pd.concat(frames, ignore_index=True)
+    results = results.drop_duplicates(subset=WEIGHT_COLUMNS, keep='last').reset_index(drop=True)
+    results['score'] = _scores(results, objective, min_cagr)
+    if not np.isfinite(results['score'].max()):
+        raise ValueError(f"조건(min_cagr={min_cagr})을 만족하는 비중이 없습니다.")
+    return results.sort_values('score', ascending=False, kind='mergesort').reset_index(drop=True)
+
+
+def to_base_weights(row):
+    return {'QQQ': float(row['w_qqq']), 'GLD': float(row['w_gld']), 'Tactical_Bond': float(row['w_bond'])}
+
+
+# --- [메인 실행] ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adaptive-Hysteresis-TAA 기본 비중(BASE_WEIGHTS) 최적화")
+    parser.add_argument('--prices', default=os.environ.get('TAA_PRICE_FILE', 'prices.csv'),
+                        help="종가 파일 (CSV/Parquet, 컬럼: QQQ, GLD, IEF, TLT, ^TNX)")
+    parser.add_argument('--mode', choices=['synthetic', 'real'], default='synthetic')
+    parser.add_argument('--start', default='2005-09-06')
+    parser.add_argument('--end', default='2024-12-31')
+    parser.add_argument('--objective', choices=OBJECTIVES, default='sharpe',
+                        help="mdd: 낙폭 최소화, calmar: CAGR / |MDD|")
+    parser.add_argument('--step', type=float, default=0.05, help="1차 격자 간격")
+    parser.add_argument('--refine', type=int, default=2, help="최적점 주변 재탐색 횟수 (매번 간격 1/5)")
+    parser.add_argument('--min-weight', type=float, default=0.0, help="자산별 최소 비중")
+    parser.add_argument('--max-weight', type=float, default=1.0, help="자산별 최대 비중")
+    parser.add_argument('--min-cagr', type=float, default=None, help="CAGR 하한 (예: 0.08, mdd 목표와 함께 사용)")
+    parser.add_argument('--top', type=int, default=10)
+    parser.add_argument('--out', default=None, help="평가한 전체 후보 CSV")
+    args = parser.parse_args()
+
+    try:
+        params = _strategy_params(args.mode)
+        close_df = load_price_file(args.prices)
+        with session('weight_optimizer'):
+            started = time.perf_counter()
+            with stage('scaled_returns', rows=len(close_df)):
+                contributions, turnover, dates = scaled_returns(close_df, params, args.mode, args.start, args.end)
+            with stage('optimize') as m:
+                results = optimize_weights(contributions, turnover, dates, args.objective, args.step, args.refine,
+                                           args.min_weight, args.max_weight, args.min_cagr)
+                m['rows'] = len(results)
+            elapsed = time.perf_counter() - started
+        if args.out:
+            results.to_csv(args.out, index_label='rank')
+
+        current = params['base_weights']
+        current_row = batch_metrics([current[k] for k in ('QQQ', 'GLD', 'Tactical_Bond')],
+                                    contributions, turnover, dates).iloc[0]
+        columns = WEIGHT_COLUMNS + OBJECTIVES + ['source']
+        print(f"비중 최적화 ({args.mode}) {dates[0].date()} ~ {dates[-1].date()}, 목표: {args.objective}, "
+              f"후보 {len(results)}개, {elapsed:.2f}초")
+        with pd.option_context('display.width', 160, 'display.float_format', '{:.4f}'.format):
+            print(results[columns].head(args.top).to_string())
+        print(f"\n현재 BASE_WEIGHTS {current}: sharpe {current_row['sharpe']:.4f}, "
+              f"cagr {current_row['cagr']:.2%}, mdd {current_row['mdd']:.2%}")
+
+        # 최적 비중은 전체 백테스트로 한 번 더 확인
+        best = to_base_weights(results.iloc[0])
+        check = run_backtest(close_df, best, params['ma_windows'], params['n_band'], params['scalar_map'],
+                             params['rate_ma_window'], args.mode, args.start, args.end)
+        print(f"\n최적 비중 백테스트 확인:\n{format_metrics(check['metrics'])}")
+        print("\nBASE_WEIGHTS = {")
+        print(",\n".join(f"    '{key}': {value:.4f}" for key, value in best.items()))
+        print("}")
+    except Exception as e:
+        print(f"오류가 발생했습니다: {e}", file=sys.stderr)
+        sys.exit(1)